@@ -1,80 +1,53 @@
 import logging
-from datetime import datetime
-from io import StringIO
 from typing import Dict, Literal
 
 from rq import get_current_job
-from sqlalchemy import delete, select, Sequence
+from sqlalchemy import insert, select, Sequence
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.analyzer.analyzer import Analyzer
 from app.analyzer.critiquer import Critiquer
-from app.analyzer.dto import ReviewResult
+from app.analyzer.dto import CritiquerResult, ReviewResult
 from app.analyzer.servers import get_default_openai_server_id
 from app.database.db import SessionLocal
-from app.database.models import Submit, Issue, IssueRating, SubmitRating, AnalysisJob, AIIssueRating, AISubmitRating
+from app.database.models import (
+    Submit,
+    Issue,
+    AIIssueRating,
+    AISubmitRating,
+)
+from app.database.rq_queue import get_redis_connection
 from app.settings import settings
-from app.utils.files import find_prompt_file, save_job_error_log, find_source_files_or_extract
+from app.utils.dashboard_cache import bump_dashboard_version
+from app.utils.deletion import delete_submits
+from app.utils.files import files_content_hash, find_source_files_or_extract
+from app.utils.job_artifacts import JobArtifactStore
+from app.utils.job_checkpoints import JobCheckpoints, resume_or_run
+from app.utils.job_coalescing import analysis_lock_key, release_job_locks
+from app.utils.job_events import update_job
+from app.utils.job_logs import configure_job_log_capture, finish_job_log
+from app.utils.prompt_registry import load_prompt_version, read_prompt, register_prompt_version
+from app.utils.rating_rollups import apply_rating_to_rollups
 
 logger = logging.getLogger(__name__)
 
 
-class InMemoryLogHandler(logging.StreamHandler):
-    def __init__(self) -> None:
-        self.stream = StringIO()
-        super().__init__(self.stream)
-
-    def get_value(self) -> str:
-        return self.stream.getvalue()
-
-
-def configure_job_log_capture(job_id: str | None) -> InMemoryLogHandler | None:
-    if not job_id:
-        return None
-
-    handler = InMemoryLogHandler()
-    handler.setLevel(logging.INFO)
-    handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(name)s - %(message)s'))
-
-    root_logger = logging.getLogger()
-    root_logger.addHandler(handler)
-    return handler
-
-
-def store_job_log(job_id: str | None, log_handler: InMemoryLogHandler | None, stack_trace: str | None = None) -> None:
-    if not job_id:
-        return
-
-    captured_log = log_handler.get_value() if log_handler else ''
-
-    log_parts: list[str] = []
-    if captured_log.strip():
-        log_parts.append(captured_log.rstrip())
-
-    persisted_log = '\n\n'.join(log_parts)
-    if not persisted_log and stack_trace:
-        persisted_log = stack_trace
-
-    if not persisted_log:
-        return
-
-    try:
-        save_job_error_log(job_id, persisted_log)
-    except Exception:
-        logger.exception("Failed to store job log for job '%s'", job_id)
-
-
 def delete_previous_submit(
         session: Session,
         source_path: str,
         prompt_path: str,
         model: str,
+        analysis_mode: str,
+        openai_server: str,
         rater_id: int | None = None,
 ) -> None:
     conditions = [
         Submit.source_path == source_path,
         Submit.prompt_path == prompt_path,
         Submit.model == model,
+        Submit.analysis_mode == analysis_mode,
+        Submit.openai_server == openai_server,
     ]
 
     if rater_id is not None:
@@ -88,30 +61,7 @@ def delete_previous_submit(
         .all()
     )
 
-    if len(submit_identifier_list) == 0:
-        return
-
-    issue_identifier_list: Sequence[int] = (
-        session.execute(
-            select(Issue.id).where(Issue.submit_id.in_(submit_identifier_list))
-        )
-        .scalars()
-        .all()
-    )
-
-    session.query(AnalysisJob).filter(AnalysisJob.submit_id.in_(submit_identifier_list)).update(
-        {AnalysisJob.submit_id: None},
-        synchronize_session=False,
-    )
-    session.execute(delete(AISubmitRating).where(AISubmitRating.submit_id.in_(submit_identifier_list)))
-    session.execute(delete(SubmitRating).where(SubmitRating.submit_id.in_(submit_identifier_list)))
-
-    if len(issue_identifier_list) > 0:
-        session.execute(delete(AIIssueRating).where(AIIssueRating.issue_id.in_(issue_identifier_list)))
-        session.execute(delete(IssueRating).where(IssueRating.issue_id.in_(issue_identifier_list)))
-
-    session.execute(delete(Issue).where(Issue.submit_id.in_(submit_identifier_list)))
-    session.execute(delete(Submit).where(Submit.id.in_(submit_identifier_list)))
+    delete_submits(session, list(submit_identifier_list))
 
 
 def run_submit_analysis(
@@ -123,105 +73,147 @@ def run_submit_analysis(
         analysis_mode: Literal["chain_of_thought", "one_shot"] = "chain_of_thought",
         openai_server: str | None = None,
         run_critiquer: bool = True,
+        prompt_hash: str | None = None,
+        resume_from_job_id: str | None = None,
 ) -> None:
+    """Analyze a source with a prompt and store the submit.
+
+    With `resume_from_job_id`, stages that job completed on the same inputs are taken from its checkpoints.
+    """
     session: Session = SessionLocal()
 
     job = get_current_job()
     job_id = job.id if job else None
     job_log_handler = configure_job_log_capture(job_id)
+    # Taken at enqueue time; computed before `prompt_hash` can be filled in below, like the enqueued spec's.
+    lock_key = analysis_lock_key(
+        source_path,
+        prompt_path,
+        prompt_hash,
+        model,
+        analysis_mode,
+        openai_server or get_default_openai_server_id(),
+        run_critiquer,
+        rater_id,
+    )
 
-    def update_job_status(status: str, error: str | None = None, submit_id: int | None = None) -> None:
-        if not job_id:
-            return
-
-        job_session: Session = SessionLocal()
+    job_session: Session = SessionLocal()
+    artifacts = JobArtifactStore(job_id)
+    analyzer: Analyzer | None = None
+    critiquer: Critiquer | None = None
+
+    def used_tokens() -> dict[str, int]:
+        # Only calls made by this job count; stages resumed from checkpoints were paid for by the earlier job.
+        clients = [client for client in (analyzer, critiquer) if client is not None]
+        return {
+            "input_tokens": sum(client.total_input_tokens for client in clients),
+            "output_tokens": sum(client.total_output_tokens for client in clients),
+        }
+
+    def report_stage(stage: str) -> None:
+        # Stage updates are informational, so a failed write must not fail the analysis.
         try:
-            record = job_session.execute(
-                select(AnalysisJob).where(AnalysisJob.job_id == job_id)
-            ).scalar_one_or_none()
-
-            if not record:
-                return
-
-            record.status = status
-            record.error = error
-            record.submit_id = submit_id
-            record.updated_at = datetime.now()
-            job_session.commit()
-        finally:
-            job_session.close()
-
-    # Detele previous analysis results for the same source_path and prompt_path if any
-    try:
-        delete_previous_submit(session, source_path, prompt_path, model, rater_id)
-    except Exception as exc:
-        logger.exception(
-            "Failed to delete previous analysis results for source_path='%s', prompt_path='%s', and model='%s'",
-            source_path, prompt_path, model
-        )
-
-        session.rollback()
-        store_job_log(job_id, job_log_handler)
-
-        update_job_status("failed", error=str(exc) or "Failed to clean previous submit")
-        session.close()
-        raise
+            update_job(job_session, job_id, status="running", stage=stage)
+        except SQLAlchemyError:
+            logger.warning("Failed to record stage '%s' of job '%s'", stage, job_id, exc_info=True)
+            job_session.rollback()
 
     try:
-        draft_prompt: str = find_prompt_file(prompt_path)
+        # Prefer the exact prompt version recorded at enqueue time, so later edits don't change this job.
+        draft_prompt: str | None = load_prompt_version(session, prompt_hash) if prompt_hash else None
+        if draft_prompt is None:
+            draft_prompt, _ = read_prompt(prompt_path)
+            prompt_hash = register_prompt_version(session, prompt_path, draft_prompt)
+        # End the transaction so it is not held open while the model runs.
+        session.commit()
+
         submit_files: Dict[str, str] = find_source_files_or_extract(source_path)
 
-        review_result: ReviewResult = Analyzer(
+        checkpoint_inputs = {
+            "source_hash": files_content_hash(submit_files),
+            "prompt_hash": prompt_hash,
+            "model": model,
+            "analysis_mode": analysis_mode,
+            "openai_server": openai_server,
+        }
+        checkpoints = JobCheckpoints(job_id, checkpoint_inputs)
+        if resume_from_job_id:
+            checkpoints.inherit(resume_from_job_id)
+
+        analyzer = Analyzer(
             model,
             submit_files,
             draft_prompt,
             language=None,
             analysis_mode=analysis_mode,
             openai_server_id=openai_server,
-        ).summarize()
+            on_stage=report_stage,
+            artifacts=artifacts,
+            checkpoints=checkpoints,
+        )
+        review_result: ReviewResult = analyzer.summarize()
 
-        critiquer_result = None
+        critiquer_result: CritiquerResult | None = None
         if run_critiquer:
             critiquer_model = settings.critiquer_model or model
             critiquer_server = settings.critiquer_openai_server or openai_server
-            critiquer_result = Critiquer(
-                model=critiquer_model,
-                files=submit_files,
-                openai_server_id=critiquer_server,
-            ).rate_review(review_result)
+
+            def rate_review() -> CritiquerResult:
+                nonlocal critiquer
+                report_stage("critiquer")
+                critiquer = Critiquer(
+                    model=critiquer_model,
+                    files=submit_files,
+                    openai_server_id=critiquer_server,
+                    artifacts=artifacts,
+                )
+                return critiquer.rate_review(review_result)
+
+            critiquer_checkpoints = JobCheckpoints(
+                job_id,
+                {**checkpoint_inputs, "critiquer_model": critiquer_model, "critiquer_server": critiquer_server},
+            )
+            critiquer_result = resume_or_run(critiquer_checkpoints, "critiquer", CritiquerResult, rate_review)
+
+        report_stage("persisting")
+        # Previous results are replaced in the same transaction that stores the new ones.
+        submit_openai_server = openai_server or get_default_openai_server_id()
+        delete_previous_submit(session, source_path, prompt_path, model, analysis_mode, submit_openai_server, rater_id)
 
         submit: Submit = Submit(
             source_path=source_path,
             prompt_path=prompt_path,
+            prompt_hash=prompt_hash,
             model=model,
             analysis_mode=analysis_mode,
-            openai_server=(openai_server or get_default_openai_server_id()),
+            openai_server=submit_openai_server,
             created_by_id=rater_id,
             published=published,
+            total_issues=len(review_result.issues),
         )
 
         session.add(submit)
         session.flush()  # To get the submit.id
 
-        summary_issue = Issue(
-            submit_id=submit.id,
-            file=None,
-            line=None,
-            severity="summary",
-            explanation=review_result.summary,
-        )
-        session.add(summary_issue)
-        session.flush()
-
         issue_rating_map: dict[tuple[str, int], tuple[int, int, str]] = {}
 
         if critiquer_result is not None:
-            session.add(AISubmitRating(
+            ai_summary_rating = AISubmitRating(
                 submit_id=submit.id,
                 relevance_rating=critiquer_result.summary_rating.relevance_rating,
                 quality_rating=critiquer_result.summary_rating.quality_rating,
                 comment=critiquer_result.summary_rating.comment,
-            ))
+            )
+            session.add(ai_summary_rating)
+            session.flush()
+            apply_rating_to_rollups(
+                session,
+                submit,
+                "ai",
+                ai_summary_rating.created_at,
+                None,
+                (ai_summary_rating.relevance_rating, ai_summary_rating.quality_rating),
+            )
 
             issue_rating_map = {
                 (rating.file, rating.line): (
@@ -232,35 +224,55 @@ def run_submit_analysis(
                 for rating in critiquer_result.issue_ratings
             }
 
-        for issue in review_result.issues:
-            created_issue = Issue(
-                submit_id=submit.id,
-                file=issue.file,
-                line=issue.line,
-                severity=issue.severity.value,
-                explanation=issue.explanation,
-            )
-            session.add(created_issue)
-            session.flush()
+        # One batched INSERT ... RETURNING for all issues; ids come back in the order of the rows.
+        issue_rows: list[dict] = [{
+            "submit_id": submit.id,
+            "file": None,
+            "line": None,
+            "severity": "summary",
+            "explanation": review_result.summary,
+        }]
+        issue_rows.extend(
+            {
+                "submit_id": submit.id,
+                "file": issue.file,
+                "line": issue.line,
+                "severity": issue.severity.value,
+                "explanation": issue.explanation,
+            }
+            for issue in review_result.issues
+        )
+        issue_identifier_list: Sequence[int] = session.scalars(
+            insert(Issue).returning(Issue.id, sort_by_parameter_order=True),
+            issue_rows,
+        ).all()
 
+        ai_issue_rating_rows: list[dict] = []
+        for issue, issue_id in zip(review_result.issues, issue_identifier_list[1:]):
             rating_key = (issue.file, issue.line)
             if rating_key in issue_rating_map:
                 relevance, quality, comment = issue_rating_map[rating_key]
-                session.add(AIIssueRating(
-                    issue_id=created_issue.id,
-                    relevance_rating=relevance,
-                    quality_rating=quality,
-                    comment=comment,
-                ))
+                ai_issue_rating_rows.append({
+                    "issue_id": issue_id,
+                    "relevance_rating": relevance,
+                    "quality_rating": quality,
+                    "comment": comment,
+                })
+
+        if ai_issue_rating_rows:
+            session.execute(insert(AIIssueRating), ai_issue_rating_rows)
 
         logger.info(
             "Model '%s' analysis with prompt '%s' completed for files at '%s'. Issues found: %d",
             model, prompt_path, source_path, len(review_result.issues)
         )
         session.commit()
+        bump_dashboard_version()
+        checkpoints.clear()
 
-        store_job_log(job_id, job_log_handler)
-        update_job_status("succeeded", submit_id=submit.id)
+        update_job(
+            job_session, job_id, status="succeeded", stage=None, error=None, submit_id=submit.id, **used_tokens()
+        )
     except Exception as exc:
         logger.exception(
             "Model '%s' analysis with prompt '%s' failed for files at '%s'",
@@ -268,12 +280,23 @@ def run_submit_analysis(
         )
         session.rollback()
 
-        store_job_log(job_id, job_log_handler)
-        update_job_status("failed", error=str(exc) or "Analysis failed")
+        # Recording the failure must not replace the exception that caused it.
+        try:
+            update_job(
+                job_session,
+                job_id,
+                status="failed",
+                error=str(exc) or "Analysis failed",
+                submit_id=None,
+                **used_tokens(),
+            )
+        except SQLAlchemyError:
+            logger.exception("Failed to record failure of job '%s'", job_id)
+            job_session.rollback()
         raise
     finally:
-        if job_log_handler is not None:
-            logging.getLogger().removeHandler(job_log_handler)
-            job_log_handler.close()
-
+        finish_job_log(job_log_handler)
+        if job_id:
+            release_job_locks(get_redis_connection(), [lock_key], [job_id])
+        job_session.close()
         session.close()
@@ -2,6 +2,7 @@ import json
 import logging
 import re
 from pathlib import Path
+from collections.abc import Callable
 from time import time
 from typing import List, TypeVar, Any, Dict, Tuple, Literal
 
@@ -17,6 +18,8 @@ from app.analyzer.dto import DraftResult, EmbeddedFile, ReviewResult, ReviewIssu
 from app.analyzer.prompt import CRITIQUE_PROMPT, REVIEW_ANALYSIS_PROMPT
 from app.analyzer.scheme import DRAFT_RESULT_SCHEME, CRITIQUE_RESULT_SCHEME, REVIEW_RESULT_SCHEME
 from app.analyzer.servers import get_openai_server
+from app.utils.job_artifacts import JobArtifactStore
+from app.utils.job_checkpoints import JobCheckpoints, resume_or_run
 
 logger = logging.getLogger(__name__)
 
@@ -78,12 +81,18 @@ class Analyzer:
             language: str | None = None,
             analysis_mode: AnalysisMode = "chain_of_thought",
             openai_server_id: str | None = None,
+            on_stage: Callable[[str], None] | None = None,
+            artifacts: JobArtifactStore | None = None,
+            checkpoints: JobCheckpoints | None = None,
     ) -> None:
         self.model = model
         self.files = embed_text_files(files)
         self.draft_prompt = draft_prompt
         self.language = language
         self.analysis_mode = analysis_mode
+        self.on_stage = on_stage
+        self.artifacts = artifacts if artifacts is not None else JobArtifactStore(None)
+        self.checkpoints = checkpoints if checkpoints is not None else JobCheckpoints(None, {})
         self.total_input_tokens: int = 0
         self.total_output_tokens: int = 0
         openai_server = get_openai_server(openai_server_id)
@@ -96,16 +105,22 @@ class Analyzer:
         logger.info("Starting analysis on %d files...", len(self.files))
         analysis_start_time = time()
 
-
         user_content: str = self.build_user_content()
-        logger.warning(f"User content: {user_content}")
 
         if self.analysis_mode == "one_shot":
-            review_result: ReviewResult = self.run_one_shot_review(user_content)
+            review_result: ReviewResult = self.run_stage(
+                "review", ReviewResult, lambda: self.run_one_shot_review(user_content)
+            )
         else:
-            draft_result: DraftResult = self.run_draft_analysis(user_content)
-            critique_result: DraftResult = self.run_critique_analysis(user_content, draft_result)
-            review_result = self.run_review_analysis(user_content, critique_result)
+            draft_result: DraftResult = self.run_stage(
+                "draft", DraftResult, lambda: self.run_draft_analysis(user_content)
+            )
+            critique_result: DraftResult = self.run_stage(
+                "critique", DraftResult, lambda: self.run_critique_analysis(user_content, draft_result)
+            )
+            review_result = self.run_stage(
+                "review", ReviewResult, lambda: self.run_review_analysis(user_content, critique_result)
+            )
 
         # Post-process: normalize filenames to match known paths exactly
         review_result = self.normalize_issue_filenames(review_result)
@@ -121,6 +136,18 @@ class Analyzer:
         )
         return review_result
 
+    def report_stage(self, stage: str) -> None:
+        if self.on_stage is not None:
+            self.on_stage(stage)
+
+    def run_stage(self, stage: str, result_type: type[ResultType], run: Callable[[], ResultType]) -> ResultType:
+        """Run a pipeline stage, unless a checkpoint of a previous attempt already holds its result."""
+        def report_and_run() -> ResultType:
+            self.report_stage(stage)
+            return run()
+
+        return resume_or_run(self.checkpoints, stage, result_type, report_and_run)
+
     # -------------------------
     # Pipeline steps
     # -------------------------
@@ -128,6 +155,7 @@ class Analyzer:
     def run_one_shot_review(self, user_content: str) -> ReviewResult:
         elapsed, review_text = self.timed_chat_completion(
             step_name="One-shot analysis",
+            artifact_name="one_shot",
             messages=[
                 ChatCompletionSystemMessageParam(content=self.draft_prompt, role="system"),
                 ChatCompletionSystemMessageParam(content=REVIEW_ANALYSIS_PROMPT, role="system"),
@@ -148,12 +176,12 @@ class Analyzer:
             elapsed,
             len(review_result.issues),
         )
-        logger.warning(json.dumps(to_dict(review_result), indent=2))
         return review_result
 
     def run_draft_analysis(self, user_content: str) -> DraftResult:
         elapsed, draft_text = self.timed_chat_completion(
             step_name="Draft analysis",
+            artifact_name="draft",
             messages=[
                 ChatCompletionSystemMessageParam(content=self.draft_prompt, role="system"),
                 ChatCompletionUserMessageParam(content=user_content, role="user"),
@@ -173,7 +201,6 @@ class Analyzer:
             elapsed,
             len(draft_result.candidate_issues),
         )
-        logger.warning(json.dumps(to_dict(draft_result), indent=2))
         return draft_result
 
     def run_critique_analysis(self, user_content: str, draft_result: DraftResult) -> DraftResult:
@@ -187,6 +214,7 @@ class Analyzer:
 
         elapsed, critique_text = self.timed_chat_completion(
             step_name="Critique analysis",
+            artifact_name="critique",
             messages=[
                 ChatCompletionSystemMessageParam(content=CRITIQUE_PROMPT, role="system"),
                 ChatCompletionUserMessageParam(content=user_content, role="user"),
@@ -209,7 +237,6 @@ class Analyzer:
             len(critique_result.candidate_issues),
             len(draft_result.candidate_issues),
         )
-        logger.warning(json.dumps(to_dict(critique_result), indent=2))
         return critique_result
 
     def run_review_analysis(self, user_content: str, critique_result: DraftResult) -> ReviewResult:
@@ -227,6 +254,7 @@ class Analyzer:
 
         elapsed, review_text = self.timed_chat_completion(
             step_name="Review analysis",
+            artifact_name="review",
             messages=[
                 ChatCompletionSystemMessageParam(content=REVIEW_ANALYSIS_PROMPT, role="system"),
                 ChatCompletionUserMessageParam(content=user_content, role="user"),
@@ -248,7 +276,6 @@ class Analyzer:
             elapsed,
             len(review_result.issues),
         )
-        logger.warning(json.dumps(to_dict(review_result), indent=2))
         return review_result
 
     def normalize_issue_filenames(self, review_result: ReviewResult) -> ReviewResult:
@@ -332,6 +359,7 @@ class Analyzer:
     def timed_chat_completion(
             self,
             step_name: str,
+            artifact_name: str,
             messages: List[
                 ChatCompletionSystemMessageParam
                 | ChatCompletionUserMessageParam
@@ -359,9 +387,23 @@ class Analyzer:
             "Step '%s' tokens — input: %d, output: %d",
             step_name, input_tokens, output_tokens,
         )
-        self.total_input_tokens = self.total_output_tokens + input_tokens
+        self.total_input_tokens = self.total_input_tokens + input_tokens
         self.total_output_tokens = self.total_output_tokens + output_tokens
 
+        artifact_reference = self.artifacts.save(artifact_name, {
+            "model": self.model,
+            "temperature": temperature,
+            "messages": messages,
+            "response": message_content,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "elapsed_seconds": elapsed_seconds,
+        })
+        if artifact_reference is not None:
+            logger.debug("Step '%s' artifact: %s", step_name, artifact_reference)
+        else:
+            logger.debug("Step '%s' response: %s", step_name, message_content)
+
         if message_content is None:
             raise ValueError(f"{step_name} returned empty message content.")
 
@@ -11,6 +11,7 @@ from app.analyzer.analyzer import embed_text_files, enumerate_file_lines
 from app.analyzer.prompt import CRITIQUER_RATING_PROMPT
 from app.analyzer.scheme import CRITIQUER_RESULT_SCHEME
 from app.analyzer.servers import get_openai_server
+from app.utils.job_artifacts import JobArtifactStore
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +22,13 @@ class Critiquer:
         model: str,
         files: Dict[str, str],
         openai_server_id: str | None = None,
+        artifacts: JobArtifactStore | None = None,
     ) -> None:
         self.model = model
+        self.artifacts = artifacts if artifacts is not None else JobArtifactStore(None)
         self.files = embed_text_files(files)
+        self.total_input_tokens: int = 0
+        self.total_output_tokens: int = 0
         openai_server = get_openai_server(openai_server_id)
         self.client = OpenAI(
             api_key=openai_server.api_key,
@@ -58,18 +63,31 @@ class Critiquer:
             + "\n".join(source_lines)
         )
 
+        messages = [
+            ChatCompletionSystemMessageParam(content=CRITIQUER_RATING_PROMPT, role="system"),
+            ChatCompletionUserMessageParam(content=user_content, role="user"),
+        ]
         response = self.client.chat.completions.create(
             model=self.model,
-            messages=[
-                ChatCompletionSystemMessageParam(content=CRITIQUER_RATING_PROMPT, role="system"),
-                ChatCompletionUserMessageParam(content=user_content, role="user"),
-            ],
+            messages=messages,
             response_format=CRITIQUER_RESULT_SCHEME,
             temperature=0.1,
             timeout=180,
         )
 
         content = response.choices[0].message.content
+        artifact_reference = self.artifacts.save("critiquer", {
+            "model": self.model,
+            "temperature": 0.1,
+            "messages": messages,
+            "response": content,
+            "input_tokens": response.usage.prompt_tokens,
+            "output_tokens": response.usage.completion_tokens,
+        })
+        if artifact_reference is not None:
+            logger.debug("Critiquer artifact: %s", artifact_reference)
+        else:
+            logger.debug("Critiquer response: %s", content)
         if content is None:
             raise ValueError("Critiquer returned empty message content")
 
@@ -78,6 +96,8 @@ class Critiquer:
             response.usage.prompt_tokens,
             response.usage.completion_tokens,
         )
+        self.total_input_tokens += response.usage.prompt_tokens
+        self.total_output_tokens += response.usage.completion_tokens
 
         result_json = json.loads(content)
         critiquer_result: CritiquerResult = from_dict(CritiquerResult, result_json)
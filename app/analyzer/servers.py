@@ -10,6 +10,8 @@ class OpenAIServer(BaseModel):
     base_url: str = Field(min_length=1)
     api_key: str = ""
     models: list[str] = Field(default_factory=list)
+    # Jobs the server accepts at once across all workers; 0 means no limit.
+    max_concurrency: int = Field(default=0, ge=0)
 
 
 class OpenAIServerConfig(BaseModel):
@@ -1,16 +1,106 @@
+"""Write-behind recording of rater logins.
+
+Requests only note the login time in a process-local buffer. A background thread flushes the buffer to
+`rater_login_event` every `LOGIN_ACTIVITY_FLUSH_SECONDS` with one batched upsert, and once more on shutdown.
+Readers merge the buffer over the stored values. Logins buffered in another API process become visible there after
+its next flush.
+"""
+import logging
+import threading
 from datetime import datetime
 
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from app.database.models import RaterLoginEvent
+from app.database.db import SessionLocal, dialect_insert, greatest
+from app.database.models import Rater, RaterLoginEvent
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+pending_logins: dict[int, datetime] = {}
+pending_logins_lock = threading.Lock()
+
+
+def touch_last_login(rater_id: int) -> None:
+    with pending_logins_lock:
+        pending_logins[rater_id] = datetime.now()
+
+
+def merged_last_login(rater_id: int, stored_last_login_at: datetime | None) -> datetime | None:
+    with pending_logins_lock:
+        pending_last_login_at = pending_logins.get(rater_id)
+
+    if pending_last_login_at is None:
+        return stored_last_login_at
+    if stored_last_login_at is None:
+        return pending_last_login_at
+    return max(pending_last_login_at, stored_last_login_at)
+
+
+def upsert_last_logins(session: Session, last_logins: dict[int, datetime]) -> None:
+    # Raters deleted since their login was buffered would violate the foreign key.
+    existing_rater_ids = set(session.scalars(select(Rater.id).where(Rater.id.in_(last_logins))))
+    rows = [
+        {"rater_id": rater_id, "last_login_at": last_login_at}
+        for rater_id, last_login_at in last_logins.items()
+        if rater_id in existing_rater_ids
+    ]
+    if not rows:
+        return
+
+    statement = dialect_insert(session)(RaterLoginEvent).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[RaterLoginEvent.rater_id],
+        set_={"last_login_at": greatest(session, RaterLoginEvent.last_login_at, statement.excluded.last_login_at)},
+    )
+    session.execute(statement)
+
+
+def flush_login_activity() -> int:
+    with pending_logins_lock:
+        last_logins = dict(pending_logins)
+    if not last_logins:
+        return 0
+
+    session: Session = SessionLocal()
+    try:
+        upsert_last_logins(session, last_logins)
+        session.commit()
+    except SQLAlchemyError:
+        logger.exception("Failed to flush %d login events, keeping them for the next flush", len(last_logins))
+        session.rollback()
+        return 0
+    finally:
+        session.close()
+
+    with pending_logins_lock:
+        for rater_id, last_login_at in last_logins.items():
+            # Keep logins that arrived while the flush was running.
+            if pending_logins.get(rater_id) == last_login_at:
+                del pending_logins[rater_id]
+
+    return len(last_logins)
+
+
+def flush_login_activity_periodically(stop_event: threading.Event) -> None:
+    while not stop_event.wait(settings.login_activity_flush_seconds):
+        flush_login_activity()
+
+    flush_login_activity()
+
 
+def start_login_activity_flusher() -> tuple[threading.Event, threading.Thread]:
+    """Flush buffered logins in a background thread; set the event and join the thread to flush the rest."""
+    stop_event = threading.Event()
 
-def touch_last_login(session: Session, rater_id: int) -> None:
-    login_event = session.query(RaterLoginEvent).filter(RaterLoginEvent.rater_id == rater_id).one_or_none()
-    if login_event is None:
-        login_event = RaterLoginEvent(rater_id=rater_id, last_login_at=datetime.now())
-    else:
-        login_event.last_login_at = datetime.now()
+    thread = threading.Thread(
+        target=flush_login_activity_periodically,
+        args=(stop_event,),
+        name="login-activity-flusher",
+        daemon=True,
+    )
+    thread.start()
 
-    session.add(login_event)
-    session.commit()
+    return stop_event, thread
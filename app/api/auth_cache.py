@@ -0,0 +1,134 @@
+"""Process-local cache from API key hash to rater identity.
+
+Entries expire after `AUTH_CACHE_TTL_SECONDS`. Rater updates and deletes drop entries locally and publish the rater
+id on a Redis channel so every other API process drops them too. While a process is not subscribed, it cannot hear
+about changes made elsewhere, so it bypasses the cache until the subscription is back.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from redis.exceptions import RedisError
+
+from app.database.rq_queue import get_redis_connection
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+AUTH_INVALIDATION_CHANNEL = "auth:invalidate"
+AUTH_LISTENER_RETRY_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class CachedRater:
+    id: int
+    name: str
+    admin: bool
+
+
+class RaterCache:
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[str, tuple[float, CachedRater]] = OrderedDict()
+        self.lock = threading.Lock()
+        # Bumped by every invalidation so a lookup that raced with one does not store what it read.
+        self.generation = 0
+        self.subscribed = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.subscribed and self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key_hash: str) -> CachedRater | None:
+        if not self.enabled:
+            return None
+
+        with self.lock:
+            entry = self.entries.get(key_hash)
+            if entry is None:
+                return None
+
+            expires_at, rater = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key_hash]
+                return None
+
+            self.entries.move_to_end(key_hash)
+            return rater
+
+    def put(self, key_hash: str, rater: CachedRater, generation: int) -> None:
+        if not self.enabled:
+            return
+
+        with self.lock:
+            if generation != self.generation:
+                return
+
+            self.entries[key_hash] = (time.monotonic() + self.ttl_seconds, rater)
+            self.entries.move_to_end(key_hash)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def discard_rater(self, rater_id: int) -> None:
+        with self.lock:
+            self.generation += 1
+            for key_hash in [key_hash for key_hash, (_, rater) in self.entries.items() if rater.id == rater_id]:
+                del self.entries[key_hash]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+
+rater_cache = RaterCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+
+
+def invalidate_cached_rater(rater_id: int) -> None:
+    """Drop a rater's cached keys in every API process. Call after committing a rater update or delete."""
+    rater_cache.discard_rater(rater_id)
+
+    try:
+        get_redis_connection().publish(AUTH_INVALIDATION_CHANNEL, str(rater_id))
+    except RedisError as exc:
+        logger.warning("Failed to publish auth cache invalidation: %s", exc)
+
+
+def listen_for_invalidations(stop_event: threading.Event) -> None:
+    while not stop_event.is_set():
+        try:
+            pubsub = get_redis_connection().pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(AUTH_INVALIDATION_CHANNEL)
+                # Invalidations published while this process was not listening are lost, so start from scratch.
+                rater_cache.clear()
+                rater_cache.subscribed = True
+
+                while not stop_event.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        rater_cache.discard_rater(int(message["data"]))
+            finally:
+                rater_cache.subscribed = False
+                rater_cache.clear()
+                pubsub.close()
+        except RedisError as exc:
+            logger.warning("Auth cache invalidation listener disconnected, bypassing the cache: %s", exc)
+            stop_event.wait(AUTH_LISTENER_RETRY_SECONDS)
+
+
+def start_auth_cache_listener() -> threading.Event:
+    """Subscribe to rater invalidations in a background thread until the returned event is set."""
+    stop_event = threading.Event()
+
+    threading.Thread(
+        target=listen_for_invalidations,
+        args=(stop_event,),
+        name="auth-cache-listener",
+        daemon=True,
+    ).start()
+
+    return stop_event
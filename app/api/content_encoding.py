@@ -0,0 +1,25 @@
+def accepts_encoding(accept_encoding: str | None, encoding: str) -> bool:
+    """Whether an `Accept-Encoding` header allows `encoding`, honouring q-values (`gzip;q=0` refuses gzip).
+
+    The encoding's own entry takes precedence over `*`; encodings the header does not mention are not accepted.
+    """
+    wildcard_quality: float | None = None
+
+    for entry in (accept_encoding or "").split(","):
+        token, *parameters = (part.strip() for part in entry.split(";"))
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value.strip())
+                except ValueError:
+                    quality = 0.0
+
+        token = token.lower()
+        if token == encoding:
+            return quality > 0
+        if token == "*":
+            wildcard_quality = quality
+
+    return wildcard_quality is not None and wildcard_quality > 0
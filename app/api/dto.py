@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
@@ -32,6 +32,15 @@ class SubmitRatingRequest(BaseModel):
     comment: Optional[str] = None
 
 
+class BulkIssueRatingRequest(IssueRatingRequest):
+    issue_id: int
+
+
+class BulkRatingRequest(BaseModel):
+    issues: list[BulkIssueRatingRequest] = Field(default_factory=list)
+    summary: Optional[SubmitRatingRequest] = None
+
+
 class LoginRequest(BaseModel):
     key: str = Field(min_length=1)
 
@@ -78,6 +87,7 @@ class PromptNamesResponse(BaseModel):
 class PromptContentResponse(BaseModel):
     prompt_path: str
     content: str
+    content_hash: Optional[str] = None
 
 
 class PromptUpdateRequest(BaseModel):
@@ -88,6 +98,7 @@ class PromptUpdateRequest(BaseModel):
 class PromptDeleteResponse(BaseModel):
     prompt_path: str
     deleted: bool
+    job_id: Optional[str] = None
 
 
 class PromptAnalysisJob(BaseModel):
@@ -99,6 +110,7 @@ class PromptAnalysisResponse(BaseModel):
     ok: bool
     model: str
     prompt_path: str
+    batch_id: str
     jobs: list[PromptAnalysisJob]
 
 
@@ -175,6 +187,7 @@ class AnalyzeSourceResponse(BaseModel):
     source_path: str
     model: str
     prompt_path: str
+    prompt_hash: Optional[str] = None
     analysis_mode: AnalysisMode = "chain_of_thought"
     openai_server: str
     run_critiquer: bool = True
@@ -184,24 +197,91 @@ class JobResponse(BaseModel):
     id: int
     job_id: str
     status: str
+    stage: Optional[str] = None
     job_type: str
     source_path: Optional[str]
     prompt_path: Optional[str]
+    prompt_hash: Optional[str] = None
     model: Optional[str]
     analysis_mode: str
     openai_server: str
+    run_critiquer: bool = True
+    batch_id: Optional[str] = None
     submit_id: Optional[int]
     error: Optional[str]
     error_log: Optional[str] = None
+    progress_current: Optional[int] = None
+    progress_total: Optional[int] = None
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
 
 class JobListResponse(BaseModel):
     items: list[JobResponse]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+
+
+class JobBatchResponse(BaseModel):
+    batch_id: str
+    total: int
+    status_counts: dict[str, int]
+    finished: bool
+
+
+class ExperimentCreateRequest(BaseModel):
+    name: str = Field(min_length=1)
+    sources: list[str] = Field(min_length=1)
+    prompt_paths: list[str] = Field(min_length=1)
+    models: list[str] = Field(min_length=1)
+    openai_servers: list[str] = Field(default_factory=list)
+    analysis_modes: list[AnalysisMode] = Field(default_factory=lambda: ["chain_of_thought"])
+    run_critiquer: bool = True
+    priority: Literal["batch", "backfill"] = "batch"
+
+
+class ExperimentResponse(BaseModel):
+    id: int
+    name: str
+    batch_id: str
+    sources: list[str]
+    prompt_paths: list[str]
+    models: list[str]
+    openai_servers: list[str]
+    analysis_modes: list[str]
+    total_cells: int
+    reused_cells: int
+    completed_cells: int
+    failed_cells: int
+    status_counts: dict[str, int]
+    finished: bool
+    input_tokens: int
+    output_tokens: int
+    dashboard_url: str
+    created_at: datetime
+
+
+class ExperimentListResponse(BaseModel):
+    items: list[ExperimentResponse]
+
+
+class QueueStatsResponse(BaseModel):
+    priority: str
+    name: str
+    weight: int
+    depth: int
+    running: int
+    oldest_wait_seconds: Optional[float]
+    average_wait_seconds: Optional[float]
+    p95_wait_seconds: Optional[float]
+
+
+class QueueStatsListResponse(BaseModel):
+    queues: list[QueueStatsResponse]
 
 
 class JobErrorLogRequest(BaseModel):
@@ -213,6 +293,25 @@ class JobErrorLogResponse(BaseModel):
     error_log: str
 
 
+class JobLogResponse(BaseModel):
+    job_id: str
+    lines: list[str]
+    # Stream entry id of the last returned line; pass it as `after` to continue. None once the log is only on disk.
+    cursor: Optional[str] = None
+    finished: bool
+
+
+class JobArtifactResponse(BaseModel):
+    name: str
+    size: int
+    created_at: datetime
+
+
+class JobArtifactListResponse(BaseModel):
+    job_id: str
+    items: list[JobArtifactResponse]
+
+
 class SubmitResponse(BaseModel):
     id: int
     model: str
@@ -220,6 +319,7 @@ class SubmitResponse(BaseModel):
     openai_server: str
     source_path: str
     prompt_path: str
+    prompt_hash: Optional[str] = None
     source_tag: Optional[str] = None
     files: dict[str, str]
     rating_state: Literal["not_rated", "partially_rated", "rated"]
@@ -243,9 +343,10 @@ class SubmitListItemResponse(BaseModel):
 
 class SubmitListResponse(BaseModel):
     items: list[SubmitListItemResponse]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class SubmitDetailsIssue(BaseModel):
@@ -308,6 +409,12 @@ class RatingResponse(BaseModel):
     issue_id: Optional[int]
 
 
+class BulkRatingResponse(BaseModel):
+    submit_id: int
+    issue_ratings: list[RatingResponse]
+    summary_rating: Optional[RatingResponse]
+
+
 class SubmitRaterSuggestionRating(BaseModel):
     issue_id: int
     file: str
@@ -397,3 +504,24 @@ class DashboardStatsResponse(BaseModel):
     prompt_model_stats: list[DashboardPromptModelStat]
     source_rating_trends: list[DashboardSourceRatingTrend]
     prompt_performance: list[DashboardPromptPerformance]
+    computed_at: Optional[datetime] = None
+    age_seconds: float = 0.0
+
+
+class DashboardTimeSeriesPoint(BaseModel):
+    bucket_start: date
+    prompt_path: Optional[str] = None
+    model: Optional[str] = None
+    source_path: Optional[str] = None
+    avg_relevance_rating: Optional[float]
+    avg_quality_rating: Optional[float]
+    complex_rating: Optional[float]
+    ratings_count: int
+    last_rated_at: Optional[datetime]
+
+
+class DashboardTimeSeriesResponse(BaseModel):
+    bucket: Literal["day", "week"]
+    group_by: Literal["prompt_model", "source", "prompt"]
+    rating_source: Literal["teacher", "ai"]
+    points: list[DashboardTimeSeriesPoint]
@@ -0,0 +1,121 @@
+"""Fan-out of job events to server-sent event streams.
+
+Each API process keeps one Redis subscription to `jobs:events` in a background thread and copies every event into
+the queue of each connected client. A client whose queue overflows, and every client after the subscription is
+(re)established, gets a `resync` event instead of the events it missed and reloads the job list.
+"""
+import asyncio
+import logging
+import threading
+from collections.abc import AsyncIterator
+
+from redis.exceptions import RedisError
+from starlette.requests import Request
+
+from app.database.rq_queue import get_redis_connection
+from app.utils.job_events import JOB_EVENTS_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+JOB_EVENT_LISTENER_RETRY_SECONDS = 5.0
+JOB_EVENT_KEEPALIVE_SECONDS = 15.0
+JOB_EVENT_QUEUE_SIZE = 256
+RESYNC = None
+
+
+class JobEventBroker:
+    def __init__(self) -> None:
+        self.subscribers: set[tuple[asyncio.AbstractEventLoop, asyncio.Queue[str | None]]] = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self) -> tuple[asyncio.AbstractEventLoop, asyncio.Queue[str | None]]:
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=JOB_EVENT_QUEUE_SIZE))
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: tuple[asyncio.AbstractEventLoop, asyncio.Queue[str | None]]) -> None:
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def broadcast(self, data: str | None) -> None:
+        """Hand an event (or `RESYNC`) to every subscriber. Safe to call from any thread."""
+        with self.lock:
+            subscribers = list(self.subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(offer_job_event, queue, data)
+            except RuntimeError:
+                # The subscriber's event loop is already closed.
+                self.unsubscribe((loop, queue))
+
+
+def offer_job_event(queue: asyncio.Queue[str | None], data: str | None) -> None:
+    if queue.full():
+        # The client fell behind; drop its backlog and let it reload instead.
+        while not queue.empty():
+            queue.get_nowait()
+        data = RESYNC
+
+    queue.put_nowait(data)
+
+
+job_event_broker = JobEventBroker()
+
+
+def listen_for_job_events(stop_event: threading.Event) -> None:
+    while not stop_event.is_set():
+        try:
+            pubsub = get_redis_connection().pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(JOB_EVENTS_CHANNEL)
+                # Events published while this process was not listening are lost.
+                job_event_broker.broadcast(RESYNC)
+
+                while not stop_event.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        job_event_broker.broadcast(message["data"].decode())
+            finally:
+                pubsub.close()
+        except RedisError as exc:
+            logger.warning("Job event listener disconnected: %s", exc)
+            stop_event.wait(JOB_EVENT_LISTENER_RETRY_SECONDS)
+
+
+def start_job_event_listener() -> threading.Event:
+    """Relay job events to connected clients in a background thread until the returned event is set."""
+    stop_event = threading.Event()
+
+    threading.Thread(
+        target=listen_for_job_events,
+        args=(stop_event,),
+        name="job-event-listener",
+        daemon=True,
+    ).start()
+
+    return stop_event
+
+
+async def stream_job_events(request: Request) -> AsyncIterator[str]:
+    """Server-sent events: `job` events carry a job id and its changed fields, `resync` asks for a reload."""
+    subscriber = job_event_broker.subscribe()
+    _, queue = subscriber
+
+    try:
+        yield f"retry: {int(JOB_EVENT_LISTENER_RETRY_SECONDS * 1000)}\n\n"
+
+        while not await request.is_disconnected():
+            try:
+                data = await asyncio.wait_for(queue.get(), timeout=JOB_EVENT_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            if data is RESYNC:
+                yield "event: resync\ndata: {}\n\n"
+            else:
+                yield f"event: job\ndata: {data}\n\n"
+    finally:
+        job_event_broker.unsubscribe(subscriber)
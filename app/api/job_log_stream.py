@@ -0,0 +1,102 @@
+"""Reading job logs: from the job's Redis Stream while it exists, otherwise from the log file written at the end."""
+import asyncio
+import json
+from collections import deque
+from collections.abc import AsyncIterator
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+from starlette.requests import Request
+
+from app.api.dto import JobLogResponse
+from app.settings import settings
+from app.utils.files import job_log_path
+from app.utils.job_logs import JOB_LOG_END_FIELD, job_log_stream_key
+
+JOB_LOG_FOLLOW_BLOCK_MS = 15000
+
+
+def read_log_file_tail(job_id: str, limit: int) -> list[str]:
+    log_file_path = job_log_path(job_id)
+    if not log_file_path.is_file():
+        return []
+
+    with log_file_path.open(encoding="utf-8", errors="replace") as log_file:
+        return [line.rstrip("\n") for line in deque(log_file, maxlen=limit)]
+
+
+def stream_entries_to_response(job_id: str, entries: list, stream_finished: bool) -> JobLogResponse:
+    lines = [fields[b"line"].decode("utf-8", errors="replace") for _, fields in entries if b"line" in fields]
+    finished = stream_finished or any(JOB_LOG_END_FIELD in fields for _, fields in entries)
+    cursor = entries[-1][0].decode() if entries else None
+    return JobLogResponse(job_id=job_id, lines=lines, cursor=cursor, finished=finished)
+
+
+def tail_job_log(
+        redis_connection: Redis,
+        job_id: str,
+        job_running: bool,
+        after: str | None,
+        limit: int,
+) -> JobLogResponse:
+    """The last `limit` lines, or with `after`, up to `limit` lines that follow that stream entry."""
+    stream_key = job_log_stream_key(job_id)
+
+    try:
+        if after is not None:
+            entries = redis_connection.xrange(stream_key, min=f"({after}", count=limit)
+            if entries or redis_connection.exists(stream_key):
+                return stream_entries_to_response(job_id, entries, stream_finished=False)
+        else:
+            # One extra entry, in case the last one is the end marker rather than a line.
+            entries = list(reversed(redis_connection.xrevrange(stream_key, count=limit + 1)))
+            if entries:
+                response = stream_entries_to_response(job_id, entries, stream_finished=False)
+                response.lines = response.lines[-limit:]
+                return response
+    except RedisError:
+        pass
+
+    # A job that has not logged yet has neither a stream nor a file.
+    lines = [] if job_running else read_log_file_tail(job_id, limit)
+    return JobLogResponse(job_id=job_id, lines=lines, cursor=None, finished=not job_running)
+
+
+def sse_message(event: str, data: object) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def follow_job_log(request: Request, job_id: str, job_running: bool, after: str | None) -> AsyncIterator[str]:
+    """Server-sent `line` events as the job logs, then one `end` event.
+
+    Without `after`, the stream starts with the lines already logged. Logs of finished jobs that are only on disk are
+    sent as a whole, followed by `end`.
+    """
+    stream_key = job_log_stream_key(job_id)
+    redis_connection = AsyncRedis.from_url(settings.redis_url)
+    cursor = after or "0-0"
+
+    try:
+        if not job_running and not await redis_connection.exists(stream_key):
+            for line in await asyncio.to_thread(read_log_file_tail, job_id, settings.job_log_max_lines):
+                yield sse_message("line", line)
+            yield sse_message("end", {})
+            return
+
+        while not await request.is_disconnected():
+            response = await redis_connection.xread({stream_key: cursor}, count=500, block=JOB_LOG_FOLLOW_BLOCK_MS)
+            if not response:
+                yield ": keepalive\n\n"
+                continue
+
+            for entry_id, fields in response[0][1]:
+                cursor = entry_id.decode()
+                if JOB_LOG_END_FIELD in fields:
+                    yield sse_message("end", {"cursor": cursor})
+                    return
+                yield f"id: {cursor}\n" + sse_message("line", fields[b"line"].decode("utf-8", errors="replace"))
+    except RedisError:
+        yield sse_message("error", {"detail": "Job log stream is unavailable"})
+    finally:
+        await redis_connection.aclose()
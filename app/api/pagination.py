@@ -0,0 +1,54 @@
+import base64
+import json
+import threading
+from collections.abc import Callable, Hashable
+from datetime import datetime
+from time import monotonic
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+# Totals are only used to size the pager, so a few seconds of staleness is fine.
+COUNT_CACHE_TTL_SECONDS = 15.0
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+_count_cache_lock = threading.Lock()
+_count_cache: dict[Hashable, tuple[float, int]] = {}
+
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    raw_cursor = json.dumps([sort_value.isoformat(), row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw_cursor).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded_cursor = cursor + "=" * (-len(cursor) % 4)
+        sort_value_raw, row_id = json.loads(base64.urlsafe_b64decode(padded_cursor.encode("ascii")))
+        return datetime.fromisoformat(sort_value_raw), int(row_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def keyset_after(sort_column, id_column, cursor: str):
+    """Condition selecting rows after `cursor` for an `ORDER BY sort_column DESC, id_column DESC` listing."""
+    sort_value, row_id = decode_cursor(cursor)
+    return or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < row_id))
+
+
+def cached_count(key: Hashable, compute: Callable[[], int]) -> int:
+    now = monotonic()
+
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+        if cached is not None and now - cached[0] < COUNT_CACHE_TTL_SECONDS:
+            return cached[1]
+
+    total = compute()
+
+    with _count_cache_lock:
+        if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+            _count_cache.clear()
+        _count_cache[key] = (now, total)
+
+    return total
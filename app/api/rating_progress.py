@@ -0,0 +1,80 @@
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.database.models import Issue, IssueRating, SubmitRaterProgress, SubmitRating
+
+
+def derive_rating_state(
+        total_issues: int,
+        started_issues: int,
+        fully_rated_issues: int,
+        summary_started: bool,
+        summary_fully_rated: bool,
+) -> str:
+    if fully_rated_issues >= total_issues and summary_fully_rated:
+        return "rated"
+
+    if (
+            started_issues > 0
+            or summary_started
+            or (total_issues > 0 and fully_rated_issues >= total_issues and not summary_fully_rated)
+    ):
+        return "partially_rated"
+
+    return "not_rated"
+
+
+def refresh_submit_rater_progress(session: Session, submit_id: int, rater_id: int) -> SubmitRaterProgress:
+    """Recompute one (submit, rater) progress row. Call it in the same transaction as the rating write."""
+    session.flush()
+
+    total_issues: int = session.execute(
+        select(func.count(Issue.id))
+        .where(Issue.submit_id == submit_id)
+        .where(Issue.severity != "summary")
+    ).scalar_one()
+
+    started_issues, fully_rated_issues = session.execute(
+        select(
+            func.count(func.distinct(IssueRating.issue_id)),
+            func.count(func.distinct(IssueRating.issue_id)).filter(
+                IssueRating.relevance_rating.is_not(None),
+                IssueRating.quality_rating.is_not(None),
+            ),
+        )
+        .join(Issue, Issue.id == IssueRating.issue_id)
+        .where(Issue.submit_id == submit_id)
+        .where(IssueRating.rater_id == rater_id)
+        .where(or_(IssueRating.relevance_rating.is_not(None), IssueRating.quality_rating.is_not(None)))
+    ).one()
+
+    summary_rating: SubmitRating | None = session.execute(
+        select(SubmitRating)
+        .where(SubmitRating.submit_id == submit_id, SubmitRating.rater_id == rater_id)
+    ).scalar_one_or_none()
+
+    summary_started = summary_rating is not None and (
+            summary_rating.relevance_rating is not None or summary_rating.quality_rating is not None
+    )
+    summary_fully_rated = summary_rating is not None and (
+            summary_rating.relevance_rating is not None and summary_rating.quality_rating is not None
+    )
+
+    progress: SubmitRaterProgress | None = session.get(SubmitRaterProgress, (submit_id, rater_id))
+    if progress is None:
+        progress = SubmitRaterProgress(submit_id=submit_id, rater_id=rater_id)
+        session.add(progress)
+
+    progress.total_issues = total_issues
+    progress.started_issues = started_issues
+    progress.fully_rated_issues = fully_rated_issues
+    progress.summary_started = summary_started
+    progress.summary_fully_rated = summary_fully_rated
+    progress.rating_state = derive_rating_state(
+        total_issues,
+        started_issues,
+        fully_rated_issues,
+        summary_started,
+        summary_fully_rated,
+    )
+    return progress
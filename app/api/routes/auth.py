@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 
 from app.api.dto import LoginRequest, RaterResponse
 from app.api.auth_activity import touch_last_login
-from app.api.security import get_current_rater
+from app.api.security import get_current_rater, hash_api_key
 from app.database.db import get_database
 from app.database.models import Rater
 
@@ -20,19 +20,16 @@ def login(
     if not key:
         raise HTTPException(status_code=400, detail="API key is required")
 
-    rater: Rater | None = session.query(Rater).filter(Rater.key == key).one_or_none()
+    rater: Rater | None = session.query(Rater).filter(Rater.key_hash == hash_api_key(key)).one_or_none()
     if rater is None:
         raise HTTPException(status_code=401, detail="Invalid API key")
 
-    touch_last_login(session, rater.id)
+    touch_last_login(rater.id)
 
     return RaterResponse(id=rater.id, name=rater.name, admin=rater.admin)
 
 
 @router.get("/me")
-def get_me(
-        current_rater: Rater = Depends(get_current_rater),
-        session: Session = Depends(get_database),
-) -> RaterResponse:
-    touch_last_login(session, current_rater.id)
+def get_me(current_rater: Rater = Depends(get_current_rater)) -> RaterResponse:
+    touch_last_login(current_rater.id)
     return RaterResponse(id=current_rater.id, name=current_rater.name, admin=current_rater.admin)
@@ -1,7 +1,9 @@
+import time
+from datetime import date, datetime
 from typing import Literal
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func
+from sqlalchemy import CompoundSelect, Subquery, func, literal, select, union_all
 from sqlalchemy.orm import Session
 
 from app.api.dto import (
@@ -11,6 +13,8 @@ from app.api.dto import (
     DashboardPromptModelStat,
     DashboardSourceRatingTrend,
     DashboardPromptPerformance,
+    DashboardTimeSeriesPoint,
+    DashboardTimeSeriesResponse,
 )
 from app.api.security import require_admin
 from app.database.db import get_database
@@ -19,13 +23,67 @@ from app.database.models import (
     AISubmitRating,
     Issue,
     IssueRating,
+    RatingRollup,
     Rater,
     Submit,
     SubmitRating,
 )
+from app.utils.dashboard_cache import get_or_compute_dashboard
+from app.utils.experiments import experiment_submit_ids
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
+RATING_EVENTS_LIMIT = 200
+
+TIME_SERIES_GROUP_COLUMNS = {
+    "prompt_model": (RatingRollup.prompt_path, RatingRollup.model),
+    "source": (RatingRollup.source_path,),
+    "prompt": (RatingRollup.prompt_path,),
+}
+
+
+def submit_filter_conditions(
+        source_path: str | None,
+        prompt_path: str | None,
+        model: str | None,
+        experiment_id: int | None = None,
+) -> list:
+    conditions = []
+
+    if source_path and source_path.strip():
+        conditions.append(Submit.source_path == source_path.strip())
+    if prompt_path and prompt_path.strip():
+        conditions.append(Submit.prompt_path == prompt_path.strip())
+    if model and model.strip():
+        conditions.append(Submit.model == model.strip())
+    if experiment_id is not None:
+        conditions.append(Submit.id.in_(experiment_submit_ids(experiment_id)))
+
+    return conditions
+
+
+def rank_latest_ratings(rating_rows_statement: CompoundSelect) -> Subquery:
+    """Per (submit, rater): the latest rating values, their time and the average over all summary and issue ratings."""
+    rating_rows = rating_rows_statement.subquery("rating_rows")
+    group = (rating_rows.c.submit_id, rating_rows.c.rater_id)
+
+    return (
+        select(
+            rating_rows.c.submit_id,
+            rating_rows.c.rater_id,
+            rating_rows.c.relevance_rating,
+            rating_rows.c.quality_rating,
+            func.row_number().over(
+                partition_by=group,
+                order_by=(rating_rows.c.rated_at.desc(), rating_rows.c.rating_kind.asc(), rating_rows.c.rating_id.asc()),
+            ).label("position"),
+            func.max(rating_rows.c.rated_at).over(partition_by=group).label("rated_at"),
+            func.avg(rating_rows.c.relevance_rating).over(partition_by=group).label("avg_relevance_rating"),
+            func.avg(rating_rows.c.quality_rating).over(partition_by=group).label("avg_quality_rating"),
+        )
+        .subquery("latest_ratings")
+    )
+
 
 @router.get("/stats")
 def get_dashboard_stats(
@@ -34,96 +92,41 @@ def get_dashboard_stats(
     source_path: str | None = Query(None),
     prompt_path: str | None = Query(None),
     model: str | None = Query(None),
+    experiment_id: int | None = Query(None),
     rating_source: Literal["teacher", "ai"] = Query("teacher"),
 ) -> DashboardStatsResponse:
     del current_rater
 
-    is_ai = rating_source == "ai"
-
-    if is_ai:
-        summary_rows = (
-            session.query(
-                AISubmitRating.submit_id,
-                AISubmitRating.relevance_rating,
-                AISubmitRating.quality_rating,
-                AISubmitRating.created_at,
-            )
-            .all()
-        )
-        issue_rows = (
-            session.query(
-                Issue.submit_id,
-                AIIssueRating.relevance_rating,
-                AIIssueRating.quality_rating,
-                AIIssueRating.created_at,
-            )
-            .join(Issue, Issue.id == AIIssueRating.issue_id)
-            .all()
-        )
-
-        rating_event_map: dict[int, dict] = {}
-        for submit_id, relevance_rating, quality_rating, rated_at in summary_rows:
-            event = rating_event_map.setdefault(
-                submit_id,
-                {
-                    "submit_id": submit_id,
-                    "rated_at": rated_at,
-                    "latest_relevance_rating": relevance_rating,
-                    "latest_quality_rating": quality_rating,
-                    "relevance_sum": 0.0,
-                    "relevance_count": 0,
-                    "quality_sum": 0.0,
-                    "quality_count": 0,
-                },
-            )
-
-            if rated_at > event["rated_at"]:
-                event["rated_at"] = rated_at
-                event["latest_relevance_rating"] = relevance_rating
-                event["latest_quality_rating"] = quality_rating
-
-            if relevance_rating is not None:
-                event["relevance_sum"] += float(relevance_rating)
-                event["relevance_count"] += 1
-
-            if quality_rating is not None:
-                event["quality_sum"] += float(quality_rating)
-                event["quality_count"] += 1
-
-        for submit_id, relevance_rating, quality_rating, rated_at in issue_rows:
-            event = rating_event_map.setdefault(
-                submit_id,
-                {
-                    "submit_id": submit_id,
-                    "rated_at": rated_at,
-                    "latest_relevance_rating": relevance_rating,
-                    "latest_quality_rating": quality_rating,
-                    "relevance_sum": 0.0,
-                    "relevance_count": 0,
-                    "quality_sum": 0.0,
-                    "quality_count": 0,
-                },
-            )
-
-            if rated_at > event["rated_at"]:
-                event["rated_at"] = rated_at
-                event["latest_relevance_rating"] = relevance_rating
-                event["latest_quality_rating"] = quality_rating
+    parameters = {
+        "source_path": source_path.strip() if source_path and source_path.strip() else None,
+        "prompt_path": prompt_path.strip() if prompt_path and prompt_path.strip() else None,
+        "model": model.strip() if model and model.strip() else None,
+        "experiment_id": experiment_id,
+        "rating_source": rating_source,
+    }
+    payload, computed_at = get_or_compute_dashboard(
+        parameters,
+        lambda: compute_dashboard_stats(session, **parameters).model_dump(mode="json"),
+    )
 
-            if relevance_rating is not None:
-                event["relevance_sum"] += float(relevance_rating)
-                event["relevance_count"] += 1
+    response = DashboardStatsResponse.model_validate(payload)
+    response.computed_at = datetime.fromtimestamp(computed_at)
+    response.age_seconds = round(max(time.time() - computed_at, 0.0), 3)
+    return response
 
-            if quality_rating is not None:
-                event["quality_sum"] += float(quality_rating)
-                event["quality_count"] += 1
 
-        submit_ids = {item["submit_id"] for item in rating_event_map.values()}
-        submits = {
-            submit.id: submit
-            for submit in session.query(Submit).filter(Submit.id.in_(submit_ids)).all()
-        } if submit_ids else {}
+def compute_dashboard_stats(
+    session: Session,
+    source_path: str | None,
+    prompt_path: str | None,
+    model: str | None,
+    experiment_id: int | None,
+    rating_source: Literal["teacher", "ai"],
+) -> DashboardStatsResponse:
+    is_ai = rating_source == "ai"
+    submit_conditions = submit_filter_conditions(source_path, prompt_path, model, experiment_id)
 
+    if is_ai:
         total_submits = session.query(func.count(Submit.id)).filter(Submit.published.is_(True)).scalar() or 0
         ai_rated_submits = (
             session.query(func.count(AISubmitRating.id))
@@ -144,40 +147,48 @@ def get_dashboard_stats(
             )
         ]
 
-        rating_events = []
-        for item in rating_event_map.values():
-            submit = submits.get(item["submit_id"])
-            if submit is None:
-                continue
-
-            if source_path and source_path.strip() and submit.source_path != source_path.strip():
-                continue
-            if prompt_path and prompt_path.strip() and submit.prompt_path != prompt_path.strip():
-                continue
-            if model and model.strip() and submit.model != model.strip():
-                continue
-
-            avg_relevance = None if item["relevance_count"] == 0 else round(item["relevance_sum"] / item["relevance_count"], 2)
-            avg_quality = None if item["quality_count"] == 0 else round(item["quality_sum"] / item["quality_count"], 2)
-
-            rating_events.append(
-                DashboardRatingEvent(
-                    submit_id=submit.id,
-                    rater_id=0,
-                    rater_name="Critiquer",
-                    source_path=submit.source_path,
-                    prompt_path=submit.prompt_path,
-                    model=submit.model,
-                    relevance_rating=item["latest_relevance_rating"],
-                    quality_rating=item["latest_quality_rating"],
-                    submit_avg_relevance_rating=avg_relevance,
-                    submit_avg_quality_rating=avg_quality,
-                    rated_at=item["rated_at"],
-                )
+        summary_ratings = (
+            select(
+                AISubmitRating.submit_id.label("submit_id"),
+                literal(0).label("rater_id"),
+                AISubmitRating.relevance_rating.label("relevance_rating"),
+                AISubmitRating.quality_rating.label("quality_rating"),
+                AISubmitRating.created_at.label("rated_at"),
+                literal(0).label("rating_kind"),
+                AISubmitRating.id.label("rating_id"),
+            )
+            .join(Submit, Submit.id == AISubmitRating.submit_id)
+            .where(*submit_conditions)
+        )
+        issue_ratings = (
+            select(
+                Issue.submit_id,
+                literal(0),
+                AIIssueRating.relevance_rating,
+                AIIssueRating.quality_rating,
+                AIIssueRating.created_at,
+                literal(1),
+                AIIssueRating.id,
             )
+            .join(Issue, Issue.id == AIIssueRating.issue_id)
+            .join(Submit, Submit.id == Issue.submit_id)
+            .where(*submit_conditions)
+        )
 
-        rating_events.sort(key=lambda event: event.rated_at, reverse=True)
-        rating_events = rating_events[:200]
+        latest_ratings = rank_latest_ratings(union_all(summary_ratings, issue_ratings))
+        rating_event_rows = session.execute(
+            select(
+                latest_ratings,
+                Submit.source_path,
+                Submit.prompt_path,
+                Submit.model,
+                literal("Critiquer").label("rater_name"),
+            )
+            .join(Submit, Submit.id == latest_ratings.c.submit_id)
+            .where(latest_ratings.c.position == 1)
+            .order_by(latest_ratings.c.rated_at.desc())
+            .limit(RATING_EVENTS_LIMIT)
+        ).all()
 
         complex_rating_expr = ((func.avg(AISubmitRating.relevance_rating) + func.avg(AISubmitRating.quality_rating)) / 2)
 
@@ -249,127 +260,49 @@ def get_dashboard_stats(
             for rater_id, rater_name, rated_submits in raters_rows
         ]
 
-        summary_rows = (
-            session.query(
-                SubmitRating.submit_id,
-                SubmitRating.rater_id,
-                SubmitRating.relevance_rating,
-                SubmitRating.quality_rating,
-                SubmitRating.created_at,
+        summary_ratings = (
+            select(
+                SubmitRating.submit_id.label("submit_id"),
+                SubmitRating.rater_id.label("rater_id"),
+                SubmitRating.relevance_rating.label("relevance_rating"),
+                SubmitRating.quality_rating.label("quality_rating"),
+                SubmitRating.created_at.label("rated_at"),
+                literal(0).label("rating_kind"),
+                SubmitRating.id.label("rating_id"),
             )
-            .all()
+            .join(Submit, Submit.id == SubmitRating.submit_id)
+            .where(*submit_conditions)
         )
-        issue_rows = (
-            session.query(
+        issue_ratings = (
+            select(
                 Issue.submit_id,
                 IssueRating.rater_id,
                 IssueRating.relevance_rating,
                 IssueRating.quality_rating,
                 IssueRating.created_at,
+                literal(1),
+                IssueRating.id,
             )
             .join(Issue, Issue.id == IssueRating.issue_id)
-            .all()
+            .join(Submit, Submit.id == Issue.submit_id)
+            .where(*submit_conditions)
         )
 
-        rating_event_map: dict[tuple[int, int], dict] = {}
-        for submit_id, rater_id, relevance_rating, quality_rating, rated_at in summary_rows:
-            key = (submit_id, rater_id)
-            event = rating_event_map.setdefault(
-                key,
-                {
-                    "submit_id": submit_id,
-                    "rater_id": rater_id,
-                    "rated_at": rated_at,
-                    "latest_relevance_rating": relevance_rating,
-                    "latest_quality_rating": quality_rating,
-                    "relevance_sum": 0.0,
-                    "relevance_count": 0,
-                    "quality_sum": 0.0,
-                    "quality_count": 0,
-                },
-            )
-            if rated_at > event["rated_at"]:
-                event["rated_at"] = rated_at
-                event["latest_relevance_rating"] = relevance_rating
-                event["latest_quality_rating"] = quality_rating
-            if relevance_rating is not None:
-                event["relevance_sum"] += float(relevance_rating)
-                event["relevance_count"] += 1
-            if quality_rating is not None:
-                event["quality_sum"] += float(quality_rating)
-                event["quality_count"] += 1
-
-        for submit_id, rater_id, relevance_rating, quality_rating, rated_at in issue_rows:
-            key = (submit_id, rater_id)
-            event = rating_event_map.setdefault(
-                key,
-                {
-                    "submit_id": submit_id,
-                    "rater_id": rater_id,
-                    "rated_at": rated_at,
-                    "latest_relevance_rating": relevance_rating,
-                    "latest_quality_rating": quality_rating,
-                    "relevance_sum": 0.0,
-                    "relevance_count": 0,
-                    "quality_sum": 0.0,
-                    "quality_count": 0,
-                },
-            )
-            if rated_at > event["rated_at"]:
-                event["rated_at"] = rated_at
-                event["latest_relevance_rating"] = relevance_rating
-                event["latest_quality_rating"] = quality_rating
-            if relevance_rating is not None:
-                event["relevance_sum"] += float(relevance_rating)
-                event["relevance_count"] += 1
-            if quality_rating is not None:
-                event["quality_sum"] += float(quality_rating)
-                event["quality_count"] += 1
-
-        if rating_event_map:
-            submit_ids = {item["submit_id"] for item in rating_event_map.values()}
-            rater_ids = {item["rater_id"] for item in rating_event_map.values()}
-            submits = {submit.id: submit for submit in session.query(Submit).filter(Submit.id.in_(submit_ids)).all()}
-            raters_map = {rater.id: rater for rater in session.query(Rater).filter(Rater.id.in_(rater_ids)).all()}
-        else:
-            submits = {}
-            raters_map = {}
-
-        rating_events = []
-        for item in rating_event_map.values():
-            submit = submits.get(item["submit_id"])
-            rater = raters_map.get(item["rater_id"])
-            if submit is None or rater is None:
-                continue
-
-            if source_path and source_path.strip() and submit.source_path != source_path.strip():
-                continue
-            if prompt_path and prompt_path.strip() and submit.prompt_path != prompt_path.strip():
-                continue
-            if model and model.strip() and submit.model != model.strip():
-                continue
-
-            avg_relevance = None if item["relevance_count"] == 0 else round(item["relevance_sum"] / item["relevance_count"], 2)
-            avg_quality = None if item["quality_count"] == 0 else round(item["quality_sum"] / item["quality_count"], 2)
-
-            rating_events.append(
-                DashboardRatingEvent(
-                    submit_id=submit.id,
-                    rater_id=rater.id,
-                    rater_name=rater.name,
-                    source_path=submit.source_path,
-                    prompt_path=submit.prompt_path,
-                    model=submit.model,
-                    relevance_rating=item["latest_relevance_rating"],
-                    quality_rating=item["latest_quality_rating"],
-                    submit_avg_relevance_rating=avg_relevance,
-                    submit_avg_quality_rating=avg_quality,
-                    rated_at=item["rated_at"],
-                )
+        latest_ratings = rank_latest_ratings(union_all(summary_ratings, issue_ratings))
+        rating_event_rows = session.execute(
+            select(
+                latest_ratings,
+                Submit.source_path,
+                Submit.prompt_path,
+                Submit.model,
+                Rater.name.label("rater_name"),
             )
-
-        rating_events.sort(key=lambda event: event.rated_at, reverse=True)
-        rating_events = rating_events[:200]
+            .join(Submit, Submit.id == latest_ratings.c.submit_id)
+            .join(Rater, Rater.id == latest_ratings.c.rater_id)
+            .where(latest_ratings.c.position == 1)
+            .order_by(latest_ratings.c.rated_at.desc())
+            .limit(RATING_EVENTS_LIMIT)
+        ).all()
 
         complex_rating_expr = ((func.avg(SubmitRating.relevance_rating) + func.avg(SubmitRating.quality_rating)) / 2)
 
@@ -406,20 +339,26 @@ def get_dashboard_stats(
             .join(SubmitRating, SubmitRating.submit_id == Submit.id)
         )
 
-    if source_path and source_path.strip():
-        prompt_model_query = prompt_model_query.filter(Submit.source_path == source_path.strip())
-        source_trend_query = source_trend_query.filter(Submit.source_path == source_path.strip())
-        prompt_performance_query = prompt_performance_query.filter(Submit.source_path == source_path.strip())
-
-    if prompt_path and prompt_path.strip():
-        prompt_model_query = prompt_model_query.filter(Submit.prompt_path == prompt_path.strip())
-        source_trend_query = source_trend_query.filter(Submit.prompt_path == prompt_path.strip())
-        prompt_performance_query = prompt_performance_query.filter(Submit.prompt_path == prompt_path.strip())
-
-    if model and model.strip():
-        prompt_model_query = prompt_model_query.filter(Submit.model == model.strip())
-        source_trend_query = source_trend_query.filter(Submit.model == model.strip())
-        prompt_performance_query = prompt_performance_query.filter(Submit.model == model.strip())
+    prompt_model_query = prompt_model_query.filter(*submit_conditions)
+    source_trend_query = source_trend_query.filter(*submit_conditions)
+    prompt_performance_query = prompt_performance_query.filter(*submit_conditions)
+
+    rating_events = [
+        DashboardRatingEvent(
+            submit_id=row.submit_id,
+            rater_id=row.rater_id,
+            rater_name=row.rater_name,
+            source_path=row.source_path,
+            prompt_path=row.prompt_path,
+            model=row.model,
+            relevance_rating=row.relevance_rating,
+            quality_rating=row.quality_rating,
+            submit_avg_relevance_rating=None if row.avg_relevance_rating is None else round(float(row.avg_relevance_rating), 2),
+            submit_avg_quality_rating=None if row.avg_quality_rating is None else round(float(row.avg_quality_rating), 2),
+            rated_at=row.rated_at,
+        )
+        for row in rating_event_rows
+    ]
 
     prompt_model_rows = (
         prompt_model_query
@@ -482,3 +421,77 @@ def get_dashboard_stats(
         source_rating_trends=source_rating_trends,
         prompt_performance=prompt_performance,
     )
+
+
+@router.get("/timeseries")
+def get_dashboard_timeseries(
+    session: Session = Depends(get_database),
+    current_rater: Rater = Depends(require_admin),
+    bucket: Literal["day", "week"] = Query("week"),
+    group_by: Literal["prompt_model", "source", "prompt"] = Query("prompt_model"),
+    rating_source: Literal["teacher", "ai"] = Query("teacher"),
+    source_path: str | None = Query(None),
+    prompt_path: str | None = Query(None),
+    model: str | None = Query(None),
+    start: date | None = Query(None),
+    end: date | None = Query(None),
+) -> DashboardTimeSeriesResponse:
+    del current_rater
+
+    group_columns = TIME_SERIES_GROUP_COLUMNS[group_by]
+    relevance_sum = func.sum(RatingRollup.relevance_sum)
+    relevance_count = func.sum(RatingRollup.relevance_count)
+    quality_sum = func.sum(RatingRollup.quality_sum)
+    quality_count = func.sum(RatingRollup.quality_count)
+
+    statement = (
+        select(
+            RatingRollup.bucket_start,
+            *group_columns,
+            relevance_sum.label("relevance_sum"),
+            relevance_count.label("relevance_count"),
+            quality_sum.label("quality_sum"),
+            quality_count.label("quality_count"),
+            func.sum(RatingRollup.ratings_count).label("ratings_count"),
+            func.max(RatingRollup.last_rated_at).label("last_rated_at"),
+        )
+        .where(RatingRollup.bucket_size == bucket, RatingRollup.rating_source == rating_source)
+        .group_by(RatingRollup.bucket_start, *group_columns)
+        .order_by(RatingRollup.bucket_start.asc(), *group_columns)
+    )
+
+    if source_path and source_path.strip():
+        statement = statement.where(RatingRollup.source_path == source_path.strip())
+    if prompt_path and prompt_path.strip():
+        statement = statement.where(RatingRollup.prompt_path == prompt_path.strip())
+    if model and model.strip():
+        statement = statement.where(RatingRollup.model == model.strip())
+    if start is not None:
+        statement = statement.where(RatingRollup.bucket_start >= start)
+    if end is not None:
+        statement = statement.where(RatingRollup.bucket_start <= end)
+
+    points: list[DashboardTimeSeriesPoint] = []
+    for row in session.execute(statement).mappings():
+        if row["ratings_count"] <= 0:
+            continue
+
+        avg_relevance = None if row["relevance_count"] == 0 else row["relevance_sum"] / row["relevance_count"]
+        avg_quality = None if row["quality_count"] == 0 else row["quality_sum"] / row["quality_count"]
+        complex_rating = None if avg_relevance is None or avg_quality is None else (avg_relevance + avg_quality) / 2
+
+        points.append(
+            DashboardTimeSeriesPoint(
+                bucket_start=row["bucket_start"],
+                prompt_path=row.get("prompt_path"),
+                model=row.get("model"),
+                source_path=row.get("source_path"),
+                avg_relevance_rating=None if avg_relevance is None else round(avg_relevance, 2),
+                avg_quality_rating=None if avg_quality is None else round(avg_quality, 2),
+                complex_rating=None if complex_rating is None else round(complex_rating, 2),
+                ratings_count=row["ratings_count"],
+                last_rated_at=row["last_rated_at"],
+            )
+        )
+
+    return DashboardTimeSeriesResponse(bucket=bucket, group_by=group_by, rating_source=rating_source, points=points)
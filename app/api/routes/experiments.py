@@ -0,0 +1,125 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.analyzer.servers import ensure_openai_servers_config
+from app.api.dto import ExperimentCreateRequest, ExperimentListResponse, ExperimentResponse
+from app.api.security import get_current_rater
+from app.database.db import get_database
+from app.database.models import Experiment, Rater
+from app.utils.experiments import ExperimentGrid, ExperimentProgress, create_experiment, load_experiment_progress
+from app.utils.prompt_registry import register_current_prompt
+
+router = APIRouter(prefix="/experiments", tags=["experiments"])
+
+EXPERIMENT_MAX_CELLS = 20000
+
+
+def unique_values(values: list[str]) -> list[str]:
+    return list(dict.fromkeys(value.strip() for value in values if value.strip()))
+
+
+def to_experiment_response(experiment: Experiment, progress: ExperimentProgress) -> ExperimentResponse:
+    grid = ExperimentGrid.from_json(experiment.grid)
+    succeeded_count = progress.status_counts.get("succeeded", 0)
+    running_count = progress.status_counts.get("running", 0)
+
+    return ExperimentResponse(
+        id=experiment.id,
+        name=experiment.name,
+        batch_id=experiment.batch_id,
+        sources=grid.sources,
+        prompt_paths=grid.prompt_paths,
+        models=grid.models,
+        openai_servers=grid.openai_servers,
+        analysis_modes=grid.analysis_modes,
+        total_cells=experiment.total_cells,
+        reused_cells=experiment.reused_cells,
+        completed_cells=experiment.reused_cells + succeeded_count,
+        failed_cells=progress.status_counts.get("failed", 0),
+        status_counts=progress.status_counts,
+        finished=running_count == 0,
+        input_tokens=progress.input_tokens,
+        output_tokens=progress.output_tokens,
+        dashboard_url=f"/dashboard?experiment_id={experiment.id}",
+        created_at=experiment.created_at,
+    )
+
+
+@router.post("")
+def start_experiment(
+        request: ExperimentCreateRequest,
+        session: Session = Depends(get_database),
+        current_rater: Rater = Depends(get_current_rater),
+) -> ExperimentResponse:
+    server_ids = [server.id for server in ensure_openai_servers_config().servers]
+    grid = ExperimentGrid(
+        sources=unique_values(request.sources),
+        prompt_paths=unique_values(request.prompt_paths),
+        models=unique_values(request.models),
+        openai_servers=unique_values(request.openai_servers) or server_ids[:1],
+        analysis_modes=unique_values(request.analysis_modes),
+    )
+    if not grid.cell_count:
+        raise HTTPException(status_code=400, detail="Sources, prompts and models are required")
+    if grid.cell_count > EXPERIMENT_MAX_CELLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Experiment has {grid.cell_count} cells; at most {EXPERIMENT_MAX_CELLS} are allowed",
+        )
+
+    unknown_servers = [server_id for server_id in grid.openai_servers if server_id not in server_ids]
+    if unknown_servers:
+        raise HTTPException(status_code=400, detail=f"Unknown OpenAI server: {', '.join(unknown_servers)}")
+
+    prompt_hashes: dict[str, str] = {}
+    for prompt_path in grid.prompt_paths:
+        try:
+            prompt_hashes[prompt_path] = register_current_prompt(session, prompt_path)
+        except FileNotFoundError as exc:
+            raise HTTPException(status_code=404, detail=f"Prompt not found: {prompt_path}") from exc
+
+    experiment = create_experiment(
+        session,
+        request.name.strip(),
+        grid,
+        prompt_hashes,
+        rater_id=current_rater.id,
+        run_critiquer=request.run_critiquer,
+        priority=request.priority,
+    )
+
+    progress = load_experiment_progress(session, [experiment.batch_id])
+    return to_experiment_response(experiment, progress[experiment.batch_id])
+
+
+@router.get("")
+def list_experiments(
+        session: Session = Depends(get_database),
+        current_rater: Rater = Depends(get_current_rater),
+        limit: int = Query(50, ge=1, le=200),
+) -> ExperimentListResponse:
+    del current_rater
+    experiments = list(session.execute(
+        select(Experiment).order_by(Experiment.id.desc()).limit(limit)
+    ).scalars().all())
+    progress = load_experiment_progress(session, [experiment.batch_id for experiment in experiments])
+
+    return ExperimentListResponse(
+        items=[to_experiment_response(experiment, progress[experiment.batch_id]) for experiment in experiments],
+    )
+
+
+@router.get("/{experiment_id}")
+def get_experiment(
+        experiment_id: int,
+        session: Session = Depends(get_database),
+        current_rater: Rater = Depends(get_current_rater),
+) -> ExperimentResponse:
+    del current_rater
+    experiment = session.get(Experiment, experiment_id)
+    if experiment is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+
+    progress = load_experiment_progress(session, [experiment.batch_id])
+    return to_experiment_response(experiment, progress[experiment.batch_id])
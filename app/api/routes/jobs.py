@@ -1,17 +1,43 @@
-from datetime import datetime
-from typing import Optional
+import gzip
+import re
+from dataclasses import asdict
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from redis.exceptions import RedisError
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.analyzer.analyze_job import run_submit_analysis
-from app.api.dto import AnalyzeSourceResponse, JobErrorLogRequest, JobErrorLogResponse, JobListResponse, JobResponse
+from app.api.content_encoding import accepts_encoding
+from app.api.dto import (
+    AnalyzeSourceResponse,
+    JobErrorLogRequest,
+    JobArtifactListResponse,
+    JobArtifactResponse,
+    JobBatchResponse,
+    JobErrorLogResponse,
+    JobListResponse,
+    JobLogResponse,
+    JobResponse,
+    QueueStatsListResponse,
+    QueueStatsResponse,
+)
+from app.api.job_event_stream import stream_job_events
+from app.api.job_log_stream import follow_job_log, tail_job_log
+from app.api.pagination import cached_count, encode_cursor, keyset_after
 from app.api.routes.auth import get_current_rater
 from app.database.db import get_database
 from app.database.models import AnalysisJob, Rater
-from app.database.rq_queue import get_analysis_queue
+from app.database.rq_queue import ANALYSIS_QUEUES, QueuePriority, get_redis_connection
+from app.utils.analysis_jobs import AnalysisJobSpec, batch_priority, enqueue_analysis_jobs
+from app.utils.experiments import EXPERIMENT_JOB_TYPE
 from app.utils.files import load_job_error_log, save_job_error_log
+from app.utils.job_artifacts import job_artifact_path, list_job_artifacts
+from app.utils.job_events import publish_job_event
+from app.utils.job_queues import read_queue_stats
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
@@ -21,32 +47,62 @@ def list_jobs(
         session: Session = Depends(get_database),
         current_rater: Rater = Depends(get_current_rater),
         status: Optional[str] = Query(None),
+        batch_id: Optional[str] = Query(None),
         page: int = Query(1, ge=1),
         page_size: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None),
+        total_mode: Literal["exact", "cached", "none"] = Query("exact"),
 ) -> JobListResponse:
-    statement = select(AnalysisJob).order_by(AnalysisJob.updated_at.desc())
-    if status:
-        statement = statement.where(AnalysisJob.status == status)
+    conditions = [AnalysisJob.status == status] if status else []
+    if batch_id:
+        conditions.append(AnalysisJob.batch_id == batch_id)
 
-    total_count = session.execute(
-        select(func.count()).select_from(statement.order_by(None).subquery())
-    ).scalar_one()
-    offset = (page - 1) * page_size
-    jobs = session.execute(statement.limit(page_size).offset(offset)).scalars().all()
+    def count_jobs() -> int:
+        return session.execute(select(func.count(AnalysisJob.id)).where(*conditions)).scalar_one()
+
+    total_count: int | None = None
+    if total_mode == "exact":
+        total_count = count_jobs()
+    elif total_mode == "cached":
+        total_count = cached_count(("jobs", status, batch_id), count_jobs)
+
+    statement = (
+        select(AnalysisJob)
+        .where(*conditions)
+        .order_by(AnalysisJob.updated_at.desc(), AnalysisJob.id.desc())
+    )
+    if cursor:
+        statement = statement.where(keyset_after(AnalysisJob.updated_at, AnalysisJob.id, cursor))
+    else:
+        statement = statement.offset((page - 1) * page_size)
+
+    jobs = list(session.execute(statement.limit(page_size + 1)).scalars().all())
+    next_cursor: str | None = None
+    if len(jobs) > page_size:
+        jobs = jobs[:page_size]
+        next_cursor = encode_cursor(jobs[-1].updated_at, jobs[-1].id)
     items = [
         JobResponse(
             id=job.id,
             job_id=job.job_id,
             status=job.status,
+            stage=job.stage,
             job_type=job.job_type,
             source_path=job.source_path,
             prompt_path=job.prompt_path,
+            prompt_hash=job.prompt_hash,
             model=job.model,
             analysis_mode=job.analysis_mode,
             openai_server=job.openai_server,
+            run_critiquer=job.run_critiquer,
+            batch_id=job.batch_id,
             submit_id=job.submit_id,
             error=job.error,
             error_log=None,
+            progress_current=job.progress_current,
+            progress_total=job.progress_total,
+            input_tokens=job.input_tokens,
+            output_tokens=job.output_tokens,
             created_at=job.created_at,
             updated_at=job.updated_at,
         )
@@ -57,6 +113,55 @@ def list_jobs(
         total=total_count,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/events")
+def get_job_events(
+        request: Request,
+        session: Session = Depends(get_database),
+        current_rater: Rater = Depends(get_current_rater),
+) -> StreamingResponse:
+    """Server-sent job events. Browsers' `EventSource` cannot send headers, so it authenticates with `api_key`."""
+    del current_rater
+    # Authentication is done; do not hold a pooled connection for as long as the stream stays open.
+    session.close()
+
+    return StreamingResponse(
+        stream_job_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/queues")
+def get_queue_stats(current_rater: Rater = Depends(get_current_rater)) -> QueueStatsListResponse:
+    del current_rater
+    return QueueStatsListResponse(
+        queues=[QueueStatsResponse(**asdict(stats)) for stats in read_queue_stats(get_redis_connection())],
+    )
+
+
+@router.get("/batches/{batch_id}")
+def get_job_batch(
+        batch_id: str,
+        session: Session = Depends(get_database),
+        current_rater: Rater = Depends(get_current_rater),
+) -> JobBatchResponse:
+    status_counts = dict(session.execute(
+        select(AnalysisJob.status, func.count(AnalysisJob.id))
+        .where(AnalysisJob.batch_id == batch_id)
+        .group_by(AnalysisJob.status)
+    ).tuples().all())
+    if not status_counts:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return JobBatchResponse(
+        batch_id=batch_id,
+        total=sum(status_counts.values()),
+        status_counts=status_counts,
+        finished=status_counts.get("running", 0) == 0,
     )
 
 
@@ -75,20 +180,122 @@ def get_job(
         id=job.id,
         job_id=job.job_id,
         status=job.status,
+        stage=job.stage,
         job_type=job.job_type,
         source_path=job.source_path,
         prompt_path=job.prompt_path,
+        prompt_hash=job.prompt_hash,
         model=job.model,
         analysis_mode=job.analysis_mode,
         openai_server=job.openai_server,
+        run_critiquer=job.run_critiquer,
+        batch_id=job.batch_id,
         submit_id=job.submit_id,
         error=job.error,
         error_log=load_job_error_log(job_id),
+        progress_current=job.progress_current,
+        progress_total=job.progress_total,
+        input_tokens=job.input_tokens,
+        output_tokens=job.output_tokens,
         created_at=job.created_at,
         updated_at=job.updated_at,
     )
 
 
+@router.get("/{job_id}/log")
+def get_job_log(
+        job_id: str,
+        session: Session = Depends(get_database),
+        current_rater: Rater = Depends(get_current_rater),
+        after: Optional[str] = Query(None, pattern=r"^\d+-\d+$"),
+        limit: int = Query(200, ge=1, le=1000),
+) -> JobLogResponse:
+    del current_rater
+
+    job_status = session.execute(select(AnalysisJob.status).where(AnalysisJob.job_id == job_id)).scalar_one_or_none()
+    if job_status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return tail_job_log(get_redis_connection(), job_id, job_status == "running", after, limit)
+
+
+@router.get("/{job_id}/log/follow")
+def follow_job_log_events(
+        job_id: str,
+        request: Request,
+        session: Session = Depends(get_database),
+        current_rater: Rater = Depends(get_current_rater),
+        after: Optional[str] = Query(None, pattern=r"^\d+-\d+$"),
+) -> StreamingResponse:
+    """Server-sent log lines of a job until it ends. Reconnects resume after `Last-Event-ID`."""
+    del current_rater
+
+    job_status = session.execute(select(AnalysisJob.status).where(AnalysisJob.job_id == job_id)).scalar_one_or_none()
+    if job_status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    session.close()
+
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and re.fullmatch(r"\d+-\d+", last_event_id):
+        after = last_event_id
+
+    return StreamingResponse(
+        follow_job_log(request, job_id, job_status == "running", after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{job_id}/artifacts")
+def get_job_artifacts(
+        job_id: str,
+        session: Session = Depends(get_database),
+        current_rater: Rater = Depends(get_current_rater),
+) -> JobArtifactListResponse:
+    del current_rater
+
+    job = session.execute(
+        select(AnalysisJob.id).where(AnalysisJob.job_id == job_id)
+    ).scalar_one_or_none()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return JobArtifactListResponse(
+        job_id=job_id,
+        items=[
+            JobArtifactResponse(name=artifact.name, size=artifact.size, created_at=artifact.created_at)
+            for artifact in list_job_artifacts(job_id)
+        ],
+    )
+
+
+@router.get("/{job_id}/artifacts/{name}")
+def get_job_artifact(
+        job_id: str,
+        name: str,
+        request: Request,
+        current_rater: Rater = Depends(get_current_rater),
+) -> Response:
+    """The artifact's JSON, sent still gzip-compressed to clients that accept it."""
+    del current_rater
+
+    try:
+        artifact_path = job_artifact_path(job_id, name)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if not artifact_path.is_file():
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    compressed = artifact_path.read_bytes()
+    if accepts_encoding(request.headers.get("accept-encoding"), "gzip"):
+        return Response(
+            compressed,
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return Response(gzip.decompress(compressed), media_type="application/json", headers={"Vary": "Accept-Encoding"})
+
+
 @router.get("/{job_id}/error-log")
 def get_job_error_log(
         job_id: str,
@@ -136,10 +343,33 @@ def upload_job_error_log(
         first_line = request.error_log.splitlines()[0] if request.error_log.splitlines() else "Job failed"
         job.error = first_line.strip() or "Job failed"
     session.commit()
+    publish_job_event(job_id, {"status": job.status, "error": job.error, "updated_at": job.updated_at})
 
     return JobErrorLogResponse(job_id=job_id, error_log=request.error_log)
 
 
+def original_priority(session: Session, job: AnalysisJob) -> QueuePriority:
+    """Priority of the queue a job was sent to, so a restarted experiment cell or batch job does not jump ahead."""
+    try:
+        origin = Job.fetch(job.job_id, connection=get_redis_connection()).origin
+    except (NoSuchJobError, RedisError):
+        origin = None
+
+    for priority, queue_name in ANALYSIS_QUEUES.items():
+        if queue_name == origin:
+            return priority
+
+    # The RQ job has expired; derive the priority the way the routes that created the job did.
+    if job.job_type == EXPERIMENT_JOB_TYPE:
+        return "batch"
+    if job.batch_id is None:
+        return "interactive"
+    batch_size = session.execute(
+        select(func.count(AnalysisJob.id)).where(AnalysisJob.batch_id == job.batch_id)
+    ).scalar_one()
+    return batch_priority(batch_size)
+
+
 @router.post("/{job_id}/restart")
 def restart_failed_job(
         job_id: str,
@@ -158,41 +388,36 @@ def restart_failed_job(
     if not job.source_path or not job.prompt_path or not job.model:
         raise HTTPException(status_code=400, detail="Job is missing source, prompt, or model")
 
-    analysis_queue = get_analysis_queue()
-    new_job = analysis_queue.enqueue(
-        run_submit_analysis,
-        job.source_path,
-        job.prompt_path,
-        job.model,
-        current_rater.id,
-        False,
-        job.analysis_mode,
-        job.openai_server,
-        job_timeout=1800,
-    )
-
-    now = datetime.now()
+    # The submit belongs to whoever started the original job; jobs from before that was recorded go to the restarter.
+    rater_id = job.created_by_id if job.created_by_id is not None else current_rater.id
 
-    session.add(AnalysisJob(
-        job_id=new_job.id,
-        status="running",
+    [new_job_id] = enqueue_analysis_jobs(
+        session,
+        [AnalysisJobSpec(
+            source_path=job.source_path,
+            prompt_path=job.prompt_path,
+            prompt_hash=job.prompt_hash,
+            model=job.model,
+            analysis_mode=job.analysis_mode,
+            openai_server=job.openai_server,
+            run_critiquer=job.run_critiquer,
+            resume_from_job_id=job.job_id,
+        )],
         job_type=job.job_type,
-        source_path=job.source_path,
-        prompt_path=job.prompt_path,
-        model=job.model,
-        analysis_mode=job.analysis_mode,
-        openai_server=job.openai_server,
-        created_at=now,
-        updated_at=now,
-    ))
-    session.commit()
+        rater_id=rater_id,
+        # Keeps the restarted job in its experiment's or batch's progress and submits.
+        batch_id=job.batch_id,
+        priority=original_priority(session, job),
+    )
 
     return AnalyzeSourceResponse(
         ok=True,
-        job_id=new_job.id,
+        job_id=new_job_id,
         source_path=job.source_path,
         prompt_path=job.prompt_path,
+        prompt_hash=job.prompt_hash,
         model=job.model,
         analysis_mode=job.analysis_mode,
         openai_server=job.openai_server,
+        run_critiquer=job.run_critiquer,
     )
@@ -1,6 +1,5 @@
 from datetime import datetime
 from pathlib import Path
-from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
@@ -19,7 +18,26 @@ from app.api.security import get_current_rater, require_admin
 from app.database.db import get_database
 from app.database.models import AnalysisJob, Rater, Submit
 from app.database.rq_queue import get_analysis_queue
-from app.utils.files import PROMPTS_ROOT, find_prompt_file
+from app.utils.analysis_jobs import AnalysisJobSpec, batch_priority, enqueue_analysis_jobs, new_batch_id
+from app.utils.dashboard_cache import bump_dashboard_version
+from app.utils.deletion import (
+    BACKGROUND_DELETE_MIN_SUBMITS,
+    PROMPT_DELETE_JOB_TYPE,
+    count_submits,
+    delete_prompt_file,
+    delete_prompt_records,
+)
+from app.utils.files import PROMPTS_ROOT
+from app.utils.job_events import publish_created_job
+from app.utils.prompt_registry import (
+    invalidate_prompt_cache,
+    list_prompt_paths as list_registered_prompt_paths,
+    read_prompt,
+    register_current_prompt,
+    register_prompt_version,
+    rename_prompt_versions,
+)
+from app.utils.rating_rollups import rename_rollup_dimension
 
 router = APIRouter(prefix="/prompts", tags=["prompts"])
 
@@ -45,6 +63,7 @@ def write_prompt_file(prompt_path: str, content: str) -> str:
     prompt_file_path = find_prompt_file_path(normalized_prompt_path)
     prompt_file_path.parent.mkdir(parents=True, exist_ok=True)
     prompt_file_path.write_text(content, encoding="utf-8")
+    invalidate_prompt_cache(normalized_prompt_path)
     return normalized_prompt_path
 
 
@@ -70,34 +89,27 @@ def move_prompt_file(old_prompt_path: str, new_prompt_path: str) -> str:
 
     new_prompt_file_path.parent.mkdir(parents=True, exist_ok=True)
     old_prompt_file_path.rename(new_prompt_file_path)
+    invalidate_prompt_cache(normalized_old_prompt_path)
+    invalidate_prompt_cache(normalized_new_prompt_path)
 
     return normalized_new_prompt_path
 
 
-
 @router.get("")
 def list_prompt_paths() -> PromptNamesResponse:
-    prompt_paths: List[str] = []
-
-    for path in PROMPTS_ROOT.rglob("*.txt"):
-        relative_path: Path = path.relative_to(PROMPTS_ROOT)
-        prompt_paths.append(relative_path.as_posix())
-
-    # Remove extensions
-    prompt_paths = [name[:-4] for name in prompt_paths]
-
     return PromptNamesResponse(
-        prompt_paths=sorted(prompt_paths)
+        prompt_paths=list_registered_prompt_paths()
     )
 
 
 @router.get("/{prompt_path:path}")
 def get_prompt_content(prompt_path: str) -> PromptContentResponse:
-    content: str = find_prompt_file(prompt_path)
+    content, content_hash = read_prompt(prompt_path)
 
     return PromptContentResponse(
         prompt_path=prompt_path,
-        content=content
+        content=content,
+        content_hash=content_hash,
     )
 
 
@@ -108,49 +120,41 @@ def analyze_sources_with_prompt(
         session: Session = Depends(get_database),
         current_rater: Rater = Depends(get_current_rater),
 ) -> PromptAnalysisResponse:
-    analysis_queue = get_analysis_queue()
-
-    jobs: list[PromptAnalysisJob] = []
-    for source_path in request.sources:
-        job = analysis_queue.enqueue(
-            "app.analyzer.analyze_job.run_submit_analysis",
-            source_path,
-            prompt_path,
-            request.model,
-            current_rater.id,
-            False,
-            "chain_of_thought",
-            get_default_openai_server_id(),
-            job_timeout=1800,
-        )
-
-        now = datetime.now()
-
-        session.add(AnalysisJob(
-            job_id=job.id,
-            status="running",
-            job_type="prompt_review",
-            source_path=source_path,
-            prompt_path=prompt_path,
-            model=request.model,
-            analysis_mode="chain_of_thought",
-            openai_server=get_default_openai_server_id(),
-            created_at=now,
-            updated_at=now,
-        ))
-
-        jobs.append(PromptAnalysisJob(
-            job_id=job.id,
-            source_path=source_path)
-        )
-
-    session.commit()
+    try:
+        prompt_hash = register_current_prompt(session, prompt_path)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Prompt not found") from exc
+
+    openai_server = get_default_openai_server_id()
+    batch_id = new_batch_id()
+    job_ids = enqueue_analysis_jobs(
+        session,
+        [
+            AnalysisJobSpec(
+                source_path=source_path,
+                prompt_path=prompt_path,
+                prompt_hash=prompt_hash,
+                model=request.model,
+                analysis_mode="chain_of_thought",
+                openai_server=openai_server,
+            )
+            for source_path in request.sources
+        ],
+        job_type="prompt_review",
+        rater_id=current_rater.id,
+        batch_id=batch_id,
+        priority=batch_priority(len(request.sources)),
+    )
 
     return PromptAnalysisResponse(
         ok=True,
         model=request.model,
         prompt_path=prompt_path,
-        jobs=jobs,
+        batch_id=batch_id,
+        jobs=[
+            PromptAnalysisJob(job_id=job_id, source_path=source_path)
+            for job_id, source_path in zip(job_ids, request.sources)
+        ],
     )
 
 
@@ -175,13 +179,19 @@ def update_prompt_content(
         session.query(AnalysisJob).filter(AnalysisJob.prompt_path == normalized_prompt_path).update({
             AnalysisJob.prompt_path: normalized_target_prompt_path
         })
+        rename_prompt_versions(session, normalized_prompt_path, normalized_target_prompt_path)
+        rename_rollup_dimension(session, "prompt_path", normalized_prompt_path, normalized_target_prompt_path)
         session.commit()
+        bump_dashboard_version()
 
     normalized_saved_prompt_path = write_prompt_file(normalized_target_prompt_path, request.content)
+    content_hash = register_prompt_version(session, normalized_saved_prompt_path, request.content)
+    session.commit()
 
     return PromptContentResponse(
         prompt_path=normalized_saved_prompt_path,
         content=request.content,
+        content_hash=content_hash,
     )
 
 
@@ -198,17 +208,36 @@ def delete_prompt(
     if not prompt_file_path.exists() or not prompt_file_path.is_file():
         raise HTTPException(status_code=404, detail="Prompt not found")
 
-    session.query(AnalysisJob).filter(AnalysisJob.prompt_path == normalized_prompt_path).update({AnalysisJob.submit_id: None})
-
-    related_submits = session.query(Submit).filter(Submit.prompt_path == normalized_prompt_path).all()
-    for submit in related_submits:
-        session.delete(submit)
+    deletion_job_id: str | None = None
+    deletion_job_record: AnalysisJob | None = None
+    submit_count = count_submits(session, Submit.prompt_path == normalized_prompt_path)
+    if submit_count >= BACKGROUND_DELETE_MIN_SUBMITS:
+        deletion_job = get_analysis_queue("backfill").enqueue(
+            "app.utils.deletion.run_prompt_deletion",
+            normalized_prompt_path,
+            job_timeout=3600,
+        )
+        deletion_job_id = deletion_job.id
 
-    related_jobs = session.query(AnalysisJob).filter(AnalysisJob.prompt_path == normalized_prompt_path).all()
-    for job in related_jobs:
-        session.delete(job)
+        now = datetime.now()
+        deletion_job_record = AnalysisJob(
+            job_id=deletion_job.id,
+            status="running",
+            job_type=PROMPT_DELETE_JOB_TYPE,
+            prompt_path=normalized_prompt_path,
+            progress_current=0,
+            progress_total=submit_count,
+            created_at=now,
+            updated_at=now,
+        )
+        session.add(deletion_job_record)
+    else:
+        delete_prompt_records(session, normalized_prompt_path)
+        delete_prompt_file(normalized_prompt_path)
 
-    prompt_file_path.unlink()
     session.commit()
+    bump_dashboard_version()
+    if deletion_job_record is not None:
+        publish_created_job(deletion_job_record)
 
-    return PromptDeleteResponse(prompt_path=normalized_prompt_path, deleted=True)
+    return PromptDeleteResponse(prompt_path=normalized_prompt_path, deleted=True, job_id=deletion_job_id)
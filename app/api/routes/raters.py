@@ -2,9 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.dto import AdminRaterResponse, RaterCreateRequest, RaterDeleteResponse, RatersResponse, RaterUpdateRequest
-from app.api.security import get_current_rater, require_admin
+from app.api.auth_activity import merged_last_login
+from app.api.auth_cache import invalidate_cached_rater
+from app.api.security import get_current_rater, hash_api_key, require_admin
 from app.database.db import get_database
 from app.database.models import Rater, RaterLoginEvent, Submit
+from app.utils.dashboard_cache import bump_dashboard_version
+from app.utils.rating_rollups import retract_rater_ratings
 
 router = APIRouter(prefix="/raters", tags=["raters"])
 
@@ -29,7 +33,7 @@ def list_raters(
                 name=rater.name,
                 key=rater.key,
                 admin=rater.admin,
-                last_login_at=login_event.last_login_at if login_event else None,
+                last_login_at=merged_last_login(rater.id, login_event.last_login_at if login_event else None),
             )
             for rater, login_event in rows
         ]
@@ -49,13 +53,14 @@ def create_rater(
     if not name or not key:
         raise HTTPException(status_code=400, detail="Name and key are required")
 
-    existing_rater = session.query(Rater).filter(Rater.key == key).one_or_none()
+    existing_rater = session.query(Rater).filter(Rater.key_hash == hash_api_key(key)).one_or_none()
     if existing_rater is not None:
         raise HTTPException(status_code=409, detail="Rater with this key already exists")
 
-    rater = Rater(name=name, key=key, admin=request.admin)
+    rater = Rater(name=name, key=key, key_hash=hash_api_key(key), admin=request.admin)
     session.add(rater)
     session.commit()
+    bump_dashboard_version()
     session.refresh(rater)
 
     return AdminRaterResponse(id=rater.id, name=rater.name, key=rater.key, admin=rater.admin, last_login_at=None)
@@ -78,7 +83,11 @@ def update_rater(
         raise HTTPException(status_code=400, detail="Name is required")
 
     if key:
-        existing_rater = session.query(Rater).filter(Rater.key == key, Rater.id != rater_id).one_or_none()
+        existing_rater = (
+            session.query(Rater)
+            .filter(Rater.key_hash == hash_api_key(key), Rater.id != rater_id)
+            .one_or_none()
+        )
         if existing_rater is not None:
             raise HTTPException(status_code=409, detail="Rater with this key already exists")
 
@@ -88,10 +97,13 @@ def update_rater(
     rater.name = name
     if key:
         rater.key = key
+        rater.key_hash = hash_api_key(key)
     rater.admin = request.admin
 
     session.add(rater)
     session.commit()
+    invalidate_cached_rater(rater_id)
+    bump_dashboard_version()
     session.refresh(rater)
 
     login_event = session.query(RaterLoginEvent).filter(RaterLoginEvent.rater_id == rater.id).one_or_none()
@@ -100,7 +112,7 @@ def update_rater(
         name=rater.name,
         key=rater.key,
         admin=rater.admin,
-        last_login_at=login_event.last_login_at if login_event else None,
+        last_login_at=merged_last_login(rater.id, login_event.last_login_at if login_event else None),
     )
 
 
@@ -124,7 +136,10 @@ def delete_rater(
     if has_created_submits:
         raise HTTPException(status_code=400, detail="Cannot delete rater who created submits")
 
+    retract_rater_ratings(session, rater_id)
     session.delete(rater)
     session.commit()
+    invalidate_cached_rater(rater_id)
+    bump_dashboard_version()
 
     return RaterDeleteResponse(id=rater_id, deleted=True)
@@ -1,10 +1,16 @@
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
-from app.api.dto import IssueRatingRequest, RatingResponse, SubmitRatingRequest
+from app.api.dto import BulkRatingRequest, BulkRatingResponse, IssueRatingRequest, RatingResponse, SubmitRatingRequest
+from app.api.rating_progress import refresh_submit_rater_progress
 from app.api.security import get_current_rater
-from app.database.db import get_database
+from app.database.db import dialect_insert, get_database
 from app.database.models import Issue, IssueRating, Rater, Submit, SubmitRating
+from app.utils.dashboard_cache import bump_dashboard_version
+from app.utils.rating_rollups import apply_rating_to_rollups
 
 router = APIRouter(prefix="/ratings", tags=["ratings"])
 
@@ -17,6 +23,11 @@ def validate_rating_value(value: int | None, label: str) -> None:
         raise HTTPException(status_code=400, detail=f"{label} must be between 1 and 10")
 
 
+def normalize_comment(comment: str | None) -> str | None:
+    comment = comment.strip() if comment is not None else None
+    return comment or None
+
+
 def upsert_issue_rating(
         session: Session,
         *,
@@ -44,15 +55,13 @@ def upsert_issue_rating(
             comment=comment,
         )
         session.add(rating)
-        session.commit()
-        session.refresh(rating)
+        session.flush()
         return rating
 
     existing_rating.relevance_rating = relevance_rating
     existing_rating.quality_rating = quality_rating
     existing_rating.comment = comment
-    session.commit()
-    session.refresh(existing_rating)
+    session.flush()
     return existing_rating
 
 
@@ -77,9 +86,7 @@ def rate_issue(
     validate_rating_value(request.relevance_rating, "Relevance rating")
     validate_rating_value(request.quality_rating, "Quality rating")
 
-    comment: str | None = request.comment.strip() if request.comment is not None else None
-    if comment == "":
-        comment = None
+    comment: str | None = normalize_comment(request.comment)
 
     rating: IssueRating = upsert_issue_rating(
         session,
@@ -89,6 +96,10 @@ def rate_issue(
         comment=comment,
         issue_id=issue_id,
     )
+    refresh_submit_rater_progress(session, submit.id, current_rater.id)
+    session.commit()
+    bump_dashboard_version()
+    session.refresh(rating)
 
     return RatingResponse(
         id=rating.id,
@@ -117,9 +128,7 @@ def rate_submit_summary(
     validate_rating_value(request.relevance_rating, "Relevance rating")
     validate_rating_value(request.quality_rating, "Quality rating")
 
-    comment: str | None = request.comment.strip() if request.comment is not None else None
-    if comment == "":
-        comment = None
+    comment: str | None = normalize_comment(request.comment)
 
     existing_rating: SubmitRating | None = (
         session.query(SubmitRating)
@@ -130,6 +139,7 @@ def rate_submit_summary(
         .one_or_none()
     )
 
+    previous_ratings: tuple[int | None, int | None] | None = None
     if existing_rating is None:
         summary_rating = SubmitRating(
             submit_id=submit_id,
@@ -137,18 +147,29 @@ def rate_submit_summary(
             relevance_rating=request.relevance_rating,
             quality_rating=request.quality_rating,
             comment=comment,
+            created_at=datetime.now(),
         )
         session.add(summary_rating)
-        session.commit()
-        session.refresh(summary_rating)
     else:
+        previous_ratings = (existing_rating.relevance_rating, existing_rating.quality_rating)
         existing_rating.relevance_rating = request.relevance_rating
         existing_rating.quality_rating = request.quality_rating
         existing_rating.comment = comment
-        session.commit()
-        session.refresh(existing_rating)
         summary_rating = existing_rating
 
+    refresh_submit_rater_progress(session, submit_id, current_rater.id)
+    apply_rating_to_rollups(
+        session,
+        submit,
+        "teacher",
+        summary_rating.created_at,
+        previous_ratings,
+        (summary_rating.relevance_rating, summary_rating.quality_rating),
+    )
+    session.commit()
+    bump_dashboard_version()
+    session.refresh(summary_rating)
+
     return RatingResponse(
         id=summary_rating.id,
         issue_id=None,
@@ -157,3 +178,132 @@ def rate_submit_summary(
         quality_rating=summary_rating.quality_rating,
         created_at=summary_rating.created_at,
     )
+
+
+@router.post("/submits/{submit_id}/bulk")
+def rate_submit_bulk(
+        submit_id: int,
+        request: BulkRatingRequest,
+        session: Session = Depends(get_database),
+        current_rater: Rater = Depends(get_current_rater),
+) -> BulkRatingResponse:
+    """Rate any number of issues of a submit and optionally its summary in one transaction."""
+    submit: Submit | None = session.get(Submit, submit_id)
+    if submit is None:
+        raise HTTPException(status_code=404, detail="Submit not found")
+
+    if not submit.published and not current_rater.admin and submit.created_by_id != current_rater.id:
+        raise HTTPException(status_code=403, detail="Submit not available for rating")
+
+    if not request.issues and request.summary is None:
+        raise HTTPException(status_code=400, detail="Nothing to rate")
+
+    for item in request.issues:
+        validate_rating_value(item.relevance_rating, "Relevance rating")
+        validate_rating_value(item.quality_rating, "Quality rating")
+    if request.summary is not None:
+        validate_rating_value(request.summary.relevance_rating, "Relevance rating")
+        validate_rating_value(request.summary.quality_rating, "Quality rating")
+
+    issue_ids: list[int] = [item.issue_id for item in request.issues]
+    if len(set(issue_ids)) != len(issue_ids):
+        raise HTTPException(status_code=400, detail="Each issue can only be rated once per request")
+
+    if issue_ids:
+        submit_issue_ids = set(
+            session.scalars(select(Issue.id).where(Issue.submit_id == submit_id, Issue.id.in_(issue_ids)))
+        )
+        missing_issue_ids = [issue_id for issue_id in issue_ids if issue_id not in submit_issue_ids]
+        if missing_issue_ids:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Issues not found in this submit: {', '.join(str(issue_id) for issue_id in missing_issue_ids)}",
+            )
+
+    insert = dialect_insert(session)
+    rated_at = datetime.now()
+    issue_ratings: list[RatingResponse] = []
+    summary_response: RatingResponse | None = None
+
+    if request.issues:
+        issue_statement = insert(IssueRating).values([
+            {
+                "issue_id": item.issue_id,
+                "rater_id": current_rater.id,
+                "relevance_rating": item.relevance_rating,
+                "quality_rating": item.quality_rating,
+                "comment": normalize_comment(item.comment),
+                "created_at": rated_at,
+            }
+            for item in request.issues
+        ])
+        issue_statement = issue_statement.on_conflict_do_update(
+            index_elements=[IssueRating.issue_id, IssueRating.rater_id],
+            set_={
+                "relevance_rating": issue_statement.excluded.relevance_rating,
+                "quality_rating": issue_statement.excluded.quality_rating,
+                "comment": issue_statement.excluded.comment,
+            },
+        ).returning(
+            IssueRating.id,
+            IssueRating.issue_id,
+            IssueRating.rater_id,
+            IssueRating.relevance_rating,
+            IssueRating.quality_rating,
+            IssueRating.created_at,
+        )
+        issue_ratings = [RatingResponse(**row._mapping) for row in session.execute(issue_statement)]
+        request_positions = {issue_id: position for position, issue_id in enumerate(issue_ids)}
+        issue_ratings.sort(key=lambda rating: request_positions[rating.issue_id])
+
+    if request.summary is not None:
+        summary_values = {
+            "relevance_rating": request.summary.relevance_rating,
+            "quality_rating": request.summary.quality_rating,
+            "comment": normalize_comment(request.summary.comment),
+        }
+        summary_columns = (
+            SubmitRating.id,
+            SubmitRating.rater_id,
+            SubmitRating.relevance_rating,
+            SubmitRating.quality_rating,
+            SubmitRating.created_at,
+        )
+        previous_ratings: tuple[int | None, int | None] | None = None
+
+        # Writing before reading the previous values takes the row lock (the database lock on SQLite) first, so
+        # concurrent saves of the same rating read each other's values and the rollups count the change once.
+        summary_row = session.execute(
+            insert(SubmitRating)
+            .values(submit_id=submit_id, rater_id=current_rater.id, created_at=rated_at, **summary_values)
+            .on_conflict_do_nothing(index_elements=[SubmitRating.submit_id, SubmitRating.rater_id])
+            .returning(*summary_columns)
+        ).one_or_none()
+
+        if summary_row is None:
+            rating_filter = (SubmitRating.submit_id == submit_id, SubmitRating.rater_id == current_rater.id)
+            previous_ratings = tuple(session.execute(
+                select(SubmitRating.relevance_rating, SubmitRating.quality_rating)
+                .where(*rating_filter)
+                .with_for_update()
+            ).one())
+            summary_row = session.execute(
+                update(SubmitRating).where(*rating_filter).values(**summary_values).returning(*summary_columns)
+            ).one()
+
+        summary_response = RatingResponse(issue_id=None, **summary_row._mapping)
+
+        apply_rating_to_rollups(
+            session,
+            submit,
+            "teacher",
+            summary_response.created_at,
+            previous_ratings,
+            (summary_response.relevance_rating, summary_response.quality_rating),
+        )
+
+    refresh_submit_rater_progress(session, submit_id, current_rater.id)
+    session.commit()
+    bump_dashboard_version()
+
+    return BulkRatingResponse(submit_id=submit_id, issue_ratings=issue_ratings, summary_rating=summary_response)
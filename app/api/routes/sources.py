@@ -1,12 +1,11 @@
-import os
-from datetime import datetime
+import gzip
 from pathlib import Path
-from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.analyzer.analyze_job import run_submit_analysis
+from app.api.content_encoding import accepts_encoding
 from app.api.dto import (
     AnalyzeRequest,
     SourcePathsResponse,
@@ -25,9 +24,13 @@ from app.api.dto import (
 )
 from app.api.security import get_current_rater, require_admin
 from app.database.db import get_database
-from app.database.models import AnalysisJob, Rater, SourceTag, Submit
-from app.database.rq_queue import get_analysis_queue
-from app.utils.files import PROMPTS_ROOT, find_source_comments, find_source_files_or_extract, SOURCES_ROOT, safe_join
+from app.database.models import AnalysisJob, Rater, SourceCatalogEntry, SourceTag, Submit
+from app.utils.analysis_jobs import AnalysisJobSpec, enqueue_analysis_jobs
+from app.utils.dashboard_cache import bump_dashboard_version
+from app.utils.files import PROMPTS_ROOT, SOURCES_ROOT, load_source_bundle, safe_join
+from app.utils.prompt_registry import invalidate_prompt_cache, register_current_prompt
+from app.utils.rating_rollups import rename_rollup_dimension
+from app.utils.source_catalog import set_source_catalog_tag, sync_source_catalog_path
 
 router = APIRouter(prefix="/sources", tags=["sources"])
 
@@ -50,6 +53,7 @@ def store_prompt_content(prompt_path: str, content: str) -> str:
     prompt_file_path = safe_join(PROMPTS_ROOT, f"{normalized_prompt_path}.txt")
     prompt_file_path.parent.mkdir(parents=True, exist_ok=True)
     prompt_file_path.write_text(content, encoding="utf-8")
+    invalidate_prompt_cache(normalized_prompt_path)
     return normalized_prompt_path
 
 
@@ -60,14 +64,6 @@ def get_source_tag(session: Session, source_path: str) -> str | None:
     return record.tag
 
 
-def source_name_sort_key(name: str) -> tuple[int, int | str]:
-    stripped_name = name.strip()
-    if stripped_name.isdigit():
-        return 0, int(stripped_name)
-
-    return 1, stripped_name.lower()
-
-
 def normalize_source_path(source_path: str) -> str:
     candidate = source_path.strip()
 
@@ -101,49 +97,39 @@ def list_source_paths(
         tag: str | None = Query(None),
         session: Session = Depends(get_database),
 ) -> SourcePathsResponse:
-    file_paths: List[str] = []
-
-    for directory_path, _, file_names in os.walk(SOURCES_ROOT):
-        for file_name in file_names:
-            if file_name == "src.zip":
-                full_path: Path = Path(directory_path).resolve()
-                relative_path: Path = full_path.relative_to(SOURCES_ROOT)
-                file_paths.append(relative_path.as_posix())
+    conditions = [SourceCatalogEntry.has_source.is_(True)]
 
     if tag is not None and tag.strip():
-        tag_value = tag.strip()
-        tagged_paths = {record.source_path for record in
-                        session.query(SourceTag).filter(SourceTag.tag == tag_value).all()}
-        file_paths = [path for path in file_paths if path in tagged_paths]
-
-    sorted_paths = sorted(file_paths, key=lambda path: tuple(source_name_sort_key(part) for part in path.split("/")))
-    total = len(sorted_paths)
-    paged_paths = sorted_paths[offset:offset + limit] if limit is not None else sorted_paths[offset:]
-    next_offset = offset + limit if limit is not None and offset + limit < total else None
+        conditions.append(SourceCatalogEntry.tag == tag.strip())
 
-    return SourcePathsResponse(source_paths=paged_paths, total=total, next_offset=next_offset)
+    total = session.execute(select(func.count()).select_from(SourceCatalogEntry).where(*conditions)).scalar_one()
 
+    statement = (
+        select(SourceCatalogEntry.path)
+        .where(*conditions)
+        .order_by(SourceCatalogEntry.sort_key.asc())
+        .offset(offset)
+    )
+    if limit is not None:
+        statement = statement.limit(limit)
 
-@router.get("/folders")
-def list_source_folders() -> SourceFoldersResponse:
-    folders: dict[str, bool] = {}
+    paged_paths = list(session.execute(statement).scalars().all())
+    next_offset = offset + limit if limit is not None and offset + limit < total else None
 
-    for directory_path, _, file_names in os.walk(SOURCES_ROOT):
-        full_path: Path = Path(directory_path).resolve()
-        relative_path: Path = full_path.relative_to(SOURCES_ROOT)
-        folder_path = relative_path.as_posix()
-        if folder_path == ".":
-            continue
+    return SourcePathsResponse(source_paths=paged_paths, total=total, next_offset=next_offset)
 
-        if folder_path not in folders:
-            folders[folder_path] = False
 
-        if "src.zip" in file_names:
-            folders[folder_path] = True
+@router.get("/folders")
+def list_source_folders(
+        session: Session = Depends(get_database),
+) -> SourceFoldersResponse:
+    rows = session.execute(
+        select(SourceCatalogEntry.path, SourceCatalogEntry.has_source).order_by(SourceCatalogEntry.path.asc())
+    ).all()
 
     folder_entries = [
         SourceFolderEntry(path=path, has_source=has_source)
-        for path, has_source in sorted(folders.items())
+        for path, has_source in rows
     ]
 
     return SourceFoldersResponse(folders=folder_entries)
@@ -157,40 +143,32 @@ def list_source_folder_children(
         session: Session = Depends(get_database),
 ) -> SourceFolderChildrenResponse:
     normalized_folder_path = normalize_folder_path(folder_path or "")
-    base_path = SOURCES_ROOT if not normalized_folder_path else safe_join(SOURCES_ROOT, normalized_folder_path)
 
-    if not base_path.exists() or not base_path.is_dir():
+    if normalized_folder_path and session.get(SourceCatalogEntry, normalized_folder_path) is None:
         raise HTTPException(status_code=404, detail="Folder not found")
 
-    child_directories: list[tuple[str, Path]] = []
-    with os.scandir(base_path) as entries:
-        for entry in entries:
-            if entry.is_dir():
-                child_directories.append((entry.name, Path(entry.path)))
-
-    child_paths = [entry_path.relative_to(SOURCES_ROOT).as_posix() for _, entry_path in child_directories]
-    source_tags: dict[str, str] = {
-        tag.source_path: tag.tag
-        for tag in session.query(SourceTag).filter(SourceTag.source_path.in_(child_paths)).all()
-    } if child_paths else {}
-
-    children: list[SourceFolderChildEntry] = []
-    for entry_name, entry_path in child_directories:
-        relative_path = entry_path.relative_to(SOURCES_ROOT).as_posix()
-        has_source = (entry_path / "src.zip").exists()
-        with os.scandir(entry_path) as child_entries:
-            has_children = any(child.is_dir() for child in child_entries)
-        children.append(SourceFolderChildEntry(
-            name=entry_name,
-            path=relative_path,
-            has_source=has_source,
-            has_children=has_children,
-            source_tag=source_tags.get(relative_path),
-        ))
-
-    children.sort(key=lambda child: source_name_sort_key(child.name))
-    total = len(children)
-    paged_children = children[offset:offset + limit] if limit is not None else children[offset:]
+    condition = SourceCatalogEntry.parent_path == normalized_folder_path
+    total = session.execute(select(func.count()).select_from(SourceCatalogEntry).where(condition)).scalar_one()
+
+    statement = (
+        select(SourceCatalogEntry)
+        .where(condition)
+        .order_by(SourceCatalogEntry.sort_key.asc())
+        .offset(offset)
+    )
+    if limit is not None:
+        statement = statement.limit(limit)
+
+    paged_children = [
+        SourceFolderChildEntry(
+            name=entry.name,
+            path=entry.path,
+            has_source=entry.has_source,
+            has_children=entry.has_children,
+            source_tag=entry.tag,
+        )
+        for entry in session.execute(statement).scalars().all()
+    ]
     next_offset = offset + limit if limit is not None and offset + limit < total else None
 
     return SourceFolderChildrenResponse(children=paged_children, total=total, next_offset=next_offset)
@@ -232,6 +210,7 @@ def set_source_path_tag(
     else:
         record.tag = tag
 
+    set_source_catalog_tag(session, source_path, tag)
     session.commit()
     return SourceTagResponse(source_path=source_path, tag=tag)
 
@@ -246,16 +225,34 @@ def delete_source_path_tag(
     record = session.query(SourceTag).filter(SourceTag.source_path == source_path).one_or_none()
     if record is not None:
         session.delete(record)
+        set_source_catalog_tag(session, source_path, None)
         session.commit()
 
     return SourceTagDeleteResponse(source_path=source_path, deleted=True)
 
 
-@router.get("/{source_path:path}")
-def get_source_file(source_path: str) -> SourceFilesResponse:
-    content: dict = find_source_files_or_extract(source_path)
-    comments = find_source_comments(source_path)
-    return SourceFilesResponse(source_path=source_path, files=content, comments=comments)
+@router.get("/{source_path:path}", response_model=SourceFilesResponse)
+def get_source_file(source_path: str, request: Request) -> Response:
+    bundle = load_source_bundle(source_path)
+    etag = f'"{bundle.content_hash}"'
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "private, no-cache"}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    # The bundle is stored gzip-compressed, so compatible clients get it as-is without recompression.
+    if accepts_encoding(request.headers.get("accept-encoding"), "gzip"):
+        return Response(
+            content=bundle.path.read_bytes(),
+            media_type="application/json",
+            headers={**headers, "Content-Encoding": "gzip"},
+        )
+
+    return Response(
+        content=gzip.decompress(bundle.path.read_bytes()),
+        media_type="application/json",
+        headers=headers,
+    )
 
 
 @router.post("/{source_path:path}")
@@ -265,7 +262,6 @@ def analyze_source_file(
         session: Session = Depends(get_database),
         current_rater: Rater = Depends(get_current_rater),
 ) -> AnalyzeSourceResponse:
-    analysis_queue = get_analysis_queue()
     prompt_path = request.prompt_path
 
     if request.prompt_content is not None:
@@ -273,41 +269,33 @@ def analyze_source_file(
             raise HTTPException(status_code=400, detail="Prompt content is required")
         prompt_path = store_prompt_content(prompt_path, request.prompt_content)
 
-    job = analysis_queue.enqueue(
-        run_submit_analysis,
-        source_path,
-        prompt_path,
-        request.model,
-        current_rater.id,
-        False,
-        request.analysis_mode,
-        request.openai_server,
-        request.run_critiquer,
-        job_timeout=1800,
-    )
-
-    now = datetime.now()
-
-    session.add(AnalysisJob(
-        job_id=job.id,
-        status="running",
+    try:
+        prompt_hash = register_current_prompt(session, prompt_path)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Prompt not found") from exc
+
+    [job_id] = enqueue_analysis_jobs(
+        session,
+        [AnalysisJobSpec(
+            source_path=source_path,
+            prompt_path=prompt_path,
+            prompt_hash=prompt_hash,
+            model=request.model,
+            analysis_mode=request.analysis_mode,
+            openai_server=request.openai_server,
+            run_critiquer=request.run_critiquer,
+        )],
         job_type="source_review",
-        source_path=source_path,
-        prompt_path=prompt_path,
-        model=request.model,
-        analysis_mode=request.analysis_mode,
-        openai_server=request.openai_server,
-        created_at=now,
-        updated_at=now,
-    ))
-    session.commit()
+        rater_id=current_rater.id,
+    )
 
     return AnalyzeSourceResponse(
         ok=True,
-        job_id=job.id,
+        job_id=job_id,
         source_path=source_path,
         model=request.model,
         prompt_path=prompt_path,
+        prompt_hash=prompt_hash,
         analysis_mode=request.analysis_mode,
         openai_server=request.openai_server,
         run_critiquer=request.run_critiquer,
@@ -348,6 +336,12 @@ def update_source_path(
     source_tag_record = session.query(SourceTag).filter(SourceTag.source_path == normalized_source_path).one_or_none()
     if source_tag_record is not None:
         source_tag_record.source_path = normalized_target_source_path
+    session.flush()
+
+    sync_source_catalog_path(session, normalized_source_path)
+    sync_source_catalog_path(session, normalized_target_source_path)
+    rename_rollup_dimension(session, "source_path", normalized_source_path, normalized_target_source_path)
     session.commit()
+    bump_dashboard_version()
 
     return SourceUpdateResponse(source_path=normalized_target_source_path)
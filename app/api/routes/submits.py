@@ -1,13 +1,11 @@
 import shutil
-from datetime import datetime
 from pathlib import Path
 from typing import Literal
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
-from sqlalchemy import select, and_, func, case, Select, or_
+from sqlalchemy import select, and_, func, Select, or_
 from sqlalchemy.orm import Session
 
-from app.analyzer.analyze_job import run_submit_analysis
 from app.api.dto import (
     SubmitResponse,
     SubmitSummary,
@@ -23,16 +21,32 @@ from app.api.dto import (
     SubmitRaterRating,
     SubmitRaterSuggestionRating,
 )
+from app.api.pagination import cached_count, encode_cursor, keyset_after
 from app.api.security import get_current_rater, require_admin
 from app.database.db import get_database
-from app.database.models import Issue, Submit, Rater, IssueRating, AnalysisJob, SourceTag, SubmitRating, AIIssueRating, AISubmitRating
-from app.database.rq_queue import get_analysis_queue
+from app.database.models import (
+    Issue,
+    Submit,
+    Rater,
+    IssueRating,
+    SourceTag,
+    SubmitRating,
+    SubmitRaterProgress,
+    AIIssueRating,
+    AISubmitRating,
+)
+from app.database.search import SearchMatch, submit_search_condition
+from app.utils.analysis_jobs import AnalysisJobSpec, enqueue_analysis_jobs
+from app.utils.dashboard_cache import bump_dashboard_version
+from app.utils.deletion import delete_submits
 from app.utils.files import (
     PROMPTS_ROOT,
     SOURCES_ROOT,
-    find_source_files_or_extract,
+    load_source_files,
     safe_join,
 )
+from app.utils.prompt_registry import invalidate_prompt_cache, register_current_prompt
+from app.utils.source_catalog import sync_source_catalog_path
 
 router = APIRouter(prefix="/submits", tags=["submits"])
 
@@ -81,6 +95,7 @@ def store_uploaded_prompt(prompt_file: UploadFile, prompt_path: str | None) -> s
     with prompt_path.open("wb") as output_handle:
         shutil.copyfileobj(prompt_file.file, output_handle)
 
+    invalidate_prompt_cache(f"upload/{normalized_name}")
     return f"upload/{normalized_name}"
 
 
@@ -102,8 +117,8 @@ def upload_submit(
     if not openai_server.strip():
         raise HTTPException(status_code=400, detail="OpenAI server is required")
 
-    analysis_queue = get_analysis_queue()
     stored_source_path = store_uploaded_source(source_file, source_path)
+    sync_source_catalog_path(session, stored_source_path)
 
     if prompt_file is not None:
         stored_prompt_path = store_uploaded_prompt(prompt_file, prompt_path)
@@ -113,40 +128,32 @@ def upload_submit(
 
         stored_prompt_path = prompt_path.strip()
 
-    job = analysis_queue.enqueue(
-        run_submit_analysis,
-        stored_source_path,
-        stored_prompt_path,
-        model.strip(),
-        current_rater.id,
-        False,
-        analysis_mode,
-        openai_server.strip(),
-        run_critiquer,
-        job_timeout=1800,
-    )
-
-    now = datetime.now()
-
-    session.add(AnalysisJob(
-        job_id=job.id,
-        status="running",
+    try:
+        prompt_hash = register_current_prompt(session, stored_prompt_path)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Prompt not found") from exc
+
+    [job_id] = enqueue_analysis_jobs(
+        session,
+        [AnalysisJobSpec(
+            source_path=stored_source_path,
+            prompt_path=stored_prompt_path,
+            prompt_hash=prompt_hash,
+            model=model.strip(),
+            analysis_mode=analysis_mode,
+            openai_server=openai_server.strip(),
+            run_critiquer=run_critiquer,
+        )],
         job_type="submit_upload",
-        source_path=stored_source_path,
-        prompt_path=stored_prompt_path,
-        model=model.strip(),
-        analysis_mode=analysis_mode,
-        openai_server=openai_server.strip(),
-        created_at=now,
-        updated_at=now,
-    ))
-    session.commit()
+        rater_id=current_rater.id,
+    )
 
     return AnalyzeSourceResponse(
         ok=True,
-        job_id=job.id,
+        job_id=job_id,
         source_path=stored_source_path,
         prompt_path=stored_prompt_path,
+        prompt_hash=prompt_hash,
         model=model.strip(),
         analysis_mode=analysis_mode,
         openai_server=openai_server.strip(),
@@ -165,127 +172,75 @@ def get_submits(
         source_path: str | None = Query(None),
         prompt_path: str | None = Query(None),
         source_tag: str | None = Query(None),
+        match: SearchMatch = Query("contains"),
+        cursor: str | None = Query(None),
+        total_mode: Literal["exact", "cached", "none"] = Query("exact"),
 ) -> SubmitListResponse:
-    total_issues_subquery = (
-        select(
-            Issue.submit_id.label("submit_id"),
-            func.count(Issue.id).label("total_issues"),
-        )
-        .where(Issue.severity != "summary")
-        .group_by(Issue.submit_id)
-        .subquery()
-    )
-
-    started_issues_subquery = (
-        select(
-            Issue.submit_id.label("submit_id"),
-            func.count(func.distinct(IssueRating.issue_id)).label("started_issues"),
-        )
-        .join(Issue, Issue.id == IssueRating.issue_id)
-        .where(IssueRating.rater_id == current_rater.id)
-        .where(IssueRating.issue_id.is_not(None))
-        .where(or_(IssueRating.relevance_rating.is_not(None), IssueRating.quality_rating.is_not(None)))
-        .group_by(Issue.submit_id)
-        .subquery()
-    )
-
-    fully_rated_issues_subquery = (
-        select(
-            Issue.submit_id.label("submit_id"),
-            func.count(func.distinct(IssueRating.issue_id)).label("fully_rated_issues"),
-        )
-        .join(Issue, Issue.id == IssueRating.issue_id)
-        .where(IssueRating.rater_id == current_rater.id)
-        .where(IssueRating.issue_id.is_not(None))
-        .where(IssueRating.relevance_rating.is_not(None))
-        .where(IssueRating.quality_rating.is_not(None))
-        .group_by(Issue.submit_id)
-        .subquery()
-    )
-
-    summary_started_subquery = (
-        select(
-            SubmitRating.submit_id.label("submit_id"),
-            func.count(SubmitRating.id).label("summary_started"),
-        )
-        .where(SubmitRating.rater_id == current_rater.id)
-        .where(or_(SubmitRating.relevance_rating.is_not(None), SubmitRating.quality_rating.is_not(None)))
-        .group_by(SubmitRating.submit_id)
-        .subquery()
-    )
-
-    summary_fully_rated_subquery = (
-        select(
-            SubmitRating.submit_id.label("submit_id"),
-            func.count(SubmitRating.id).label("summary_fully_rated"),
-        )
-        .where(SubmitRating.rater_id == current_rater.id)
-        .where(SubmitRating.relevance_rating.is_not(None), SubmitRating.quality_rating.is_not(None))
-        .group_by(SubmitRating.submit_id)
-        .subquery()
-    )
-
-    total_issues_column = func.coalesce(total_issues_subquery.c.total_issues, 0)
-    started_issues_column = func.coalesce(started_issues_subquery.c.started_issues, 0)
-    fully_rated_issues_column = func.coalesce(fully_rated_issues_subquery.c.fully_rated_issues, 0)
-    summary_started_column = func.coalesce(summary_started_subquery.c.summary_started, 0)
-    summary_fully_rated_column = func.coalesce(summary_fully_rated_subquery.c.summary_fully_rated, 0)
-
-    rating_state_column = case(
-        (
-            (fully_rated_issues_column >= total_issues_column) & (summary_fully_rated_column > 0),
-            "rated",
-        ),
-        (
-            (started_issues_column > 0)
-            | (summary_started_column > 0)
-            | (
-                    (total_issues_column > 0)
-                    & (fully_rated_issues_column >= total_issues_column)
-                    & (summary_fully_rated_column == 0)
-            ),
-            "partially_rated",
-        ),
-        else_="not_rated",
-    ).label("rating_state")
+    rating_state_column = func.coalesce(SubmitRaterProgress.rating_state, "not_rated").label("rating_state")
 
     statement: Select = (
         select(
             Submit,
-            total_issues_column.label("total_issues"),
+            Submit.total_issues.label("total_issues"),
             rating_state_column,
             SourceTag.tag.label("source_tag"),
         )
-        .outerjoin(total_issues_subquery, total_issues_subquery.c.submit_id == Submit.id)
-        .outerjoin(started_issues_subquery, started_issues_subquery.c.submit_id == Submit.id)
-        .outerjoin(fully_rated_issues_subquery, fully_rated_issues_subquery.c.submit_id == Submit.id)
-        .outerjoin(summary_started_subquery, summary_started_subquery.c.submit_id == Submit.id)
-        .outerjoin(summary_fully_rated_subquery, summary_fully_rated_subquery.c.submit_id == Submit.id)
+        .outerjoin(
+            SubmitRaterProgress,
+            and_(SubmitRaterProgress.submit_id == Submit.id, SubmitRaterProgress.rater_id == current_rater.id),
+        )
         .outerjoin(SourceTag, SourceTag.source_path == Submit.source_path)
     )
 
-    if not current_rater.admin:
-        statement = statement.where(or_(Submit.published.is_(True), Submit.created_by_id == current_rater.id))
-
-    if model is not None and model.strip():
-        statement = statement.where(Submit.model.ilike(f"%{model.strip()}%"))
+    conditions = []
 
-    if source_path is not None and source_path.strip():
-        statement = statement.where(Submit.source_path.ilike(f"%{source_path.strip()}%"))
+    if not current_rater.admin:
+        conditions.append(or_(Submit.published.is_(True), Submit.created_by_id == current_rater.id))
 
-    if prompt_path is not None and prompt_path.strip():
-        statement = statement.where(Submit.prompt_path.ilike(f"%{prompt_path.strip()}%"))
+    for column_name, value in (("model", model), ("source_path", source_path), ("prompt_path", prompt_path)):
+        if value is not None and value.strip():
+            conditions.append(submit_search_condition(session, column_name, value.strip(), match))
 
     if source_tag is not None and source_tag.strip():
-        statement = statement.where(SourceTag.tag == source_tag.strip())
+        conditions.append(SourceTag.tag == source_tag.strip())
 
     if only_unrated:
-        statement = statement.where(rating_state_column != "rated")
+        conditions.append(
+            or_(SubmitRaterProgress.rating_state.is_(None), SubmitRaterProgress.rating_state != "rated")
+        )
 
-    total_count = session.execute(select(func.count()).select_from(statement.order_by(None).subquery())).scalar_one()
+    def count_submits() -> int:
+        # Only join what the filters need, the listing columns don't matter for the total.
+        count_statement: Select = select(func.count(Submit.id)).select_from(Submit)
+        if only_unrated:
+            count_statement = count_statement.outerjoin(
+                SubmitRaterProgress,
+                and_(SubmitRaterProgress.submit_id == Submit.id, SubmitRaterProgress.rater_id == current_rater.id),
+            )
+        if source_tag is not None and source_tag.strip():
+            count_statement = count_statement.join(SourceTag, SourceTag.source_path == Submit.source_path)
+
+        return session.execute(count_statement.where(*conditions)).scalar_one()
+
+    total_count: int | None = None
+    if total_mode == "exact":
+        total_count = count_submits()
+    elif total_mode == "cached":
+        count_key = ("submits", current_rater.id, current_rater.admin, only_unrated, model, source_path, prompt_path,
+                     source_tag, match)
+        total_count = cached_count(count_key, count_submits)
+
+    statement = statement.where(*conditions).order_by(Submit.created_at.desc(), Submit.id.desc())
+    if cursor:
+        statement = statement.where(keyset_after(Submit.created_at, Submit.id, cursor))
+    else:
+        statement = statement.offset((page - 1) * page_size)
 
-    offset = (page - 1) * page_size
-    rows = session.execute(statement.order_by(Submit.created_at.desc()).limit(page_size).offset(offset)).all()
+    rows = session.execute(statement.limit(page_size + 1)).all()
+    next_cursor: str | None = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1][0].created_at, rows[-1][0].id)
 
     submits: list[SubmitListItemResponse] = []
     for submit, total_issues, rating_state, source_tag in rows:
@@ -305,7 +260,13 @@ def get_submits(
             )
         )
 
-    return SubmitListResponse(items=submits, total=total_count, page=page, page_size=page_size)
+    return SubmitListResponse(
+        items=submits,
+        total=total_count,
+        page=page,
+        page_size=page_size,
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/{submit_id}")
@@ -314,77 +275,16 @@ def get_submit(
         session: Session = Depends(get_database),
         current_rater: Rater = Depends(get_current_rater),
 ) -> SubmitResponse:
-    total_issues_subquery = (
-        select(func.count(Issue.id))
-        .where(Issue.submit_id == submit_id)
-        .where(Issue.severity != "summary")
-        .scalar_subquery()
-    )
-
-    started_issues_subquery = (
-        select(func.count(func.distinct(IssueRating.issue_id)))
-        .join(Issue, Issue.id == IssueRating.issue_id)
-        .where(Issue.submit_id == submit_id)
-        .where(IssueRating.rater_id == current_rater.id)
-        .where(IssueRating.issue_id.is_not(None))
-        .where(or_(IssueRating.relevance_rating.is_not(None), IssueRating.quality_rating.is_not(None)))
-        .scalar_subquery()
-    )
-
-    fully_rated_issues_subquery = (
-        select(func.count(func.distinct(IssueRating.issue_id)))
-        .join(Issue, Issue.id == IssueRating.issue_id)
-        .where(Issue.submit_id == submit_id)
-        .where(IssueRating.rater_id == current_rater.id)
-        .where(IssueRating.issue_id.is_not(None))
-        .where(IssueRating.relevance_rating.is_not(None))
-        .where(IssueRating.quality_rating.is_not(None))
-        .scalar_subquery()
-    )
-
-    summary_started_subquery = (
-        select(func.count(SubmitRating.id))
-        .where(SubmitRating.submit_id == submit_id)
-        .where(SubmitRating.rater_id == current_rater.id)
-        .where(or_(SubmitRating.relevance_rating.is_not(None), SubmitRating.quality_rating.is_not(None)))
-        .scalar_subquery()
-    )
-
-    summary_fully_rated_subquery = (
-        select(func.count(SubmitRating.id))
-        .where(SubmitRating.submit_id == submit_id)
-        .where(SubmitRating.rater_id == current_rater.id)
-        .where(SubmitRating.relevance_rating.is_not(None))
-        .where(SubmitRating.quality_rating.is_not(None))
-        .scalar_subquery()
-    )
-
-    total_issues_column = func.coalesce(total_issues_subquery, 0)
-    started_issues_column = func.coalesce(started_issues_subquery, 0)
-    fully_rated_issues_column = func.coalesce(fully_rated_issues_subquery, 0)
-    summary_started_column = func.coalesce(summary_started_subquery, 0)
-    summary_fully_rated_column = func.coalesce(summary_fully_rated_subquery, 0)
-
-    rating_state_column = case(
-        (
-            (fully_rated_issues_column >= total_issues_column) & (summary_fully_rated_column > 0),
-            "rated",
-        ),
-        (
-            (started_issues_column > 0)
-            | (summary_started_column > 0)
-            | (
-                    (total_issues_column > 0)
-                    & (fully_rated_issues_column >= total_issues_column)
-                    & (summary_fully_rated_column == 0)
-            ),
-            "partially_rated",
-        ),
-        else_="not_rated",
-    ).label("rating_state")
-
     statement: Select = (
-        select(Submit, rating_state_column, SourceTag.tag.label("source_tag"))
+        select(
+            Submit,
+            func.coalesce(SubmitRaterProgress.rating_state, "not_rated").label("rating_state"),
+            SourceTag.tag.label("source_tag"),
+        )
+        .outerjoin(
+            SubmitRaterProgress,
+            and_(SubmitRaterProgress.submit_id == Submit.id, SubmitRaterProgress.rater_id == current_rater.id),
+        )
         .outerjoin(SourceTag, SourceTag.source_path == Submit.source_path)
         .where(Submit.id == submit_id)
     )
@@ -400,7 +300,7 @@ def get_submit(
     if not submit.published and not current_rater.admin and submit.created_by_id != current_rater.id:
         raise HTTPException(status_code=404, detail="Submit not found")
 
-    files: dict = find_source_files_or_extract(submit.source_path)
+    files: dict = load_source_files(submit.source_path)
 
     return SubmitResponse(
         id=submit.id,
@@ -409,6 +309,7 @@ def get_submit(
         openai_server=submit.openai_server,
         source_path=submit.source_path,
         prompt_path=submit.prompt_path,
+        prompt_hash=submit.prompt_hash,
         source_tag=source_tag,
         files=files,
         created_at=submit.created_at,
@@ -593,6 +494,7 @@ def set_submit_publish_state(
 
     submit.published = request.published
     session.commit()
+    bump_dashboard_version()
 
     return SubmitPublishResponse(
         id=submit.id,
@@ -611,8 +513,8 @@ def delete_submit(
     if submit is None:
         raise HTTPException(status_code=404, detail="Submit not found")
 
-    session.query(AnalysisJob).filter(AnalysisJob.submit_id == submit_id).update({AnalysisJob.submit_id: None})
-    session.delete(submit)
+    delete_submits(session, [submit_id])
     session.commit()
+    bump_dashboard_version()
 
     return SubmitDeleteResponse(id=submit_id, deleted=True)
@@ -1,10 +1,17 @@
+import hashlib
+
 from fastapi import Header, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.api.auth_cache import CachedRater, rater_cache
 from app.database.db import get_database
 from app.database.models import Rater
 
 
+def hash_api_key(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
 def get_current_rater(
         authorization_header: str | None = Header(default=None, alias="Authorization"),
         api_key_query: str | None = Query(default=None, alias="api_key"),
@@ -31,10 +38,17 @@ def get_current_rater(
             detail="Missing API key",
         )
 
+    key_hash = hash_api_key(api_key_value)
+    cached_rater = rater_cache.get(key_hash)
+    if cached_rater is not None:
+        # Routes only read id, name and admin from the current rater; this instance is never added to a session.
+        return Rater(id=cached_rater.id, name=cached_rater.name, admin=cached_rater.admin)
+
+    cache_generation = rater_cache.generation
     rater: Rater | None = (
         session
         .query(Rater)
-        .filter(Rater.key == api_key_value)
+        .filter(Rater.key_hash == key_hash)
         .one_or_none()
     )
 
@@ -44,6 +58,7 @@ def get_current_rater(
             detail="Invalid API key",
         )
 
+    rater_cache.put(key_hash, CachedRater(id=rater.id, name=rater.name, admin=rater.admin), cache_generation)
     return rater
 
 
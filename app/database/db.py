@@ -1,21 +1,51 @@
 from collections.abc import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import ColumnElement, Engine, create_engine, event, func
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.settings import settings
 
 DATABASE_URL: str = settings.database_url
+# SQLAlchemy's defaults: enough for the API's and a single job's sessions.
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
-    pool_pre_ping=True,
-)
+
+def create_database_engine(pool_size: int = DEFAULT_POOL_SIZE, max_overflow: int = DEFAULT_MAX_OVERFLOW) -> Engine:
+    database_engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+
+    if DATABASE_URL.startswith("sqlite"):
+        # SQLite ignores foreign keys, including ON DELETE CASCADE, unless enabled on every connection.
+        @event.listens_for(database_engine, "connect")
+        def enable_sqlite_foreign_keys(dbapi_connection, _) -> None:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    return database_engine
+
+
+engine = create_database_engine()
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 
+def resize_connection_pool(pool_size: int) -> None:
+    """Replace the engine with one whose pool holds `pool_size` connections. Call before opening any session."""
+    global engine
+
+    engine.dispose()
+    engine = create_database_engine(pool_size=pool_size)
+    SessionLocal.configure(bind=engine)
+
+
 def get_database() -> Generator[Session, None, None]:
     session: Session = SessionLocal()
 
@@ -23,3 +53,13 @@ def get_database() -> Generator[Session, None, None]:
         yield session
     finally:
         session.close()
+
+
+def dialect_insert(session: Session):
+    """`insert` for the session's database, with `on_conflict_do_update` / `on_conflict_do_nothing` support."""
+    return postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+
+def greatest(session: Session, *values: ColumnElement) -> ColumnElement:
+    """Largest of `values`: GREATEST on Postgres (ignores NULLs), scalar MAX on SQLite (NULL if any is NULL)."""
+    return func.greatest(*values) if session.get_bind().dialect.name == "postgresql" else func.max(*values)
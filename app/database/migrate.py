@@ -0,0 +1,283 @@
+"""Versioned schema migrations.
+
+Migrations live in `app/database/migrations` as `NNNN_name.sql`, or `NNNN_name.<dialect>.sql` when SQLite and
+Postgres need different DDL. Each file has a `-- migrate:up` and a `-- migrate:down` section and runs in its
+own transaction. Applied versions are recorded in the `schema_migrations` table.
+
+    python -m app.database.migrate upgrade [version]
+    python -m app.database.migrate downgrade [version|base]
+    python -m app.database.migrate current
+    python -m app.database.migrate stamp <version>
+"""
+import argparse
+import hashlib
+import logging
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+
+from sqlalchemy import Connection, Engine, create_engine, event, inspect, text
+
+from app.logging_config import configure_logging
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_ROOT: Path = Path(__file__).resolve().parent / "migrations"
+MIGRATION_FILE_PATTERN = re.compile(r"^(?P<version>\d{4})_(?P<name>\w+?)(?:\.(?P<dialect>sqlite|postgresql))?\.sql$")
+SECTION_PATTERN = re.compile(r"^--\s*migrate:(up|down)\s*$", re.MULTILINE)
+
+BASE_VERSION = "base"
+BASELINE_VERSION = "0001"
+
+
+class MigrationError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    name: str
+    path: Path
+    up_sql: str
+    down_sql: str
+
+
+def parse_migration_file(path: Path) -> tuple[str, str]:
+    sections: dict[str, str] = {}
+    parts = SECTION_PATTERN.split(path.read_text(encoding="utf-8"))
+
+    # parts = [header, "up", up_sql, "down", down_sql]
+    for index in range(1, len(parts) - 1, 2):
+        sections[parts[index]] = parts[index + 1].strip()
+
+    if not sections.get("up"):
+        raise MigrationError(f"Migration '{path.name}' has no '-- migrate:up' section")
+
+    return sections["up"], sections.get("down", "")
+
+
+def discover_migrations(dialect_name: str) -> list[Migration]:
+    """Return migrations for `dialect_name` in version order, preferring dialect-specific files over generic ones."""
+    candidates: dict[str, dict[str | None, tuple[str, Path]]] = {}
+
+    for path in MIGRATIONS_ROOT.glob("*.sql"):
+        match = MIGRATION_FILE_PATTERN.match(path.name)
+        if match is None:
+            raise MigrationError(f"Unexpected migration file name '{path.name}'")
+
+        candidates.setdefault(match["version"], {})[match["dialect"]] = (match["name"], path)
+
+    migrations: list[Migration] = []
+    for version in sorted(candidates):
+        variants = candidates[version]
+        selected = variants.get(dialect_name) or variants.get(None)
+        if selected is None:
+            raise MigrationError(f"Migration {version} has no variant for dialect '{dialect_name}'")
+
+        name, path = selected
+        up_sql, down_sql = parse_migration_file(path)
+        migrations.append(Migration(version=version, name=name, path=path, up_sql=up_sql, down_sql=down_sql))
+
+    return migrations
+
+
+def split_sql_statements(sql: str) -> list[str]:
+    """Split a script into statements. Trigger bodies (`BEGIN ... END;`) stay in one piece."""
+    statements: list[str] = []
+    buffer: list[str] = []
+
+    for line in sql.splitlines():
+        if not buffer and (not line.strip() or line.lstrip().startswith("--")):
+            continue
+
+        buffer.append(line)
+        candidate = "\n".join(buffer)
+        if sqlite3.complete_statement(candidate):
+            statements.append(candidate.strip().rstrip(";"))
+            buffer = []
+
+    if buffer and "\n".join(buffer).strip():
+        raise MigrationError("Migration script ends with an incomplete statement")
+
+    return statements
+
+
+def sqlite_sha256(value: str | None) -> str | None:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest() if value is not None else None
+
+
+def create_migration_engine(database_url: str = settings.database_url) -> Engine:
+    engine = create_engine(database_url)
+
+    if engine.dialect.name == "sqlite":
+        # pysqlite only opens transactions before DML; take over so a failing migration also rolls back its DDL.
+        @event.listens_for(engine, "connect")
+        def disable_pysqlite_transactions(dbapi_connection, _) -> None:
+            dbapi_connection.isolation_level = None
+            # SQLite has no built-in digest functions; data migrations that hash values use this one.
+            dbapi_connection.create_function("sha256", 1, sqlite_sha256, deterministic=True)
+
+        @event.listens_for(engine, "begin")
+        def begin_sqlite_transaction(connection: Connection) -> None:
+            connection.exec_driver_sql("BEGIN")
+
+    return engine
+
+
+def ensure_migrations_table(connection: Connection) -> None:
+    connection.execute(text(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(16) NOT NULL PRIMARY KEY,
+            name VARCHAR(256) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    ))
+
+
+def applied_versions(connection: Connection) -> list[str]:
+    return list(connection.execute(text("SELECT version FROM schema_migrations ORDER BY version")).scalars())
+
+
+def current_version(engine: Engine) -> str | None:
+    with engine.begin() as connection:
+        ensure_migrations_table(connection)
+        versions = applied_versions(connection)
+
+    return versions[-1] if versions else None
+
+
+def find_migration(migrations: list[Migration], version: str) -> Migration:
+    for migration in migrations:
+        if migration.version == version:
+            return migration
+
+    raise MigrationError(f"Unknown migration version '{version}'")
+
+
+def upgrade(engine: Engine, target: str | None = None) -> list[Migration]:
+    migrations = discover_migrations(engine.dialect.name)
+    if target is not None:
+        find_migration(migrations, target)
+
+    with engine.begin() as connection:
+        ensure_migrations_table(connection)
+        done = set(applied_versions(connection))
+
+        if not done and inspect(connection).has_table("submit"):
+            raise MigrationError(
+                "Database schema predates versioned migrations. Apply any missing scripts from "
+                f"{MIGRATIONS_ROOT / 'legacy'}, then run `stamp {BASELINE_VERSION}` and `upgrade` again."
+            )
+
+    applied: list[Migration] = []
+    for migration in migrations:
+        if target is not None and migration.version > target:
+            break
+        if migration.version in done:
+            continue
+
+        logger.info("Applying migration %s_%s", migration.version, migration.name)
+        with engine.begin() as connection:
+            for statement in split_sql_statements(migration.up_sql):
+                connection.exec_driver_sql(statement)
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                {"version": migration.version, "name": migration.name},
+            )
+        applied.append(migration)
+
+    return applied
+
+
+def downgrade(engine: Engine, target: str | None = None) -> list[Migration]:
+    """Revert migrations newer than `target`; without a target only the latest one, `base` reverts everything."""
+    migrations = discover_migrations(engine.dialect.name)
+    if target is not None and target != BASE_VERSION:
+        find_migration(migrations, target)
+
+    with engine.begin() as connection:
+        ensure_migrations_table(connection)
+        done = applied_versions(connection)
+
+    if not done:
+        return []
+
+    if target is None:
+        to_revert = [done[-1]]
+    elif target == BASE_VERSION:
+        to_revert = list(done)
+    else:
+        to_revert = [version for version in done if version > target]
+
+    reverted: list[Migration] = []
+    for version in reversed(to_revert):
+        migration = find_migration(migrations, version)
+        if not migration.down_sql:
+            raise MigrationError(f"Migration {migration.version}_{migration.name} is not reversible")
+
+        logger.info("Reverting migration %s_%s", migration.version, migration.name)
+        with engine.begin() as connection:
+            for statement in split_sql_statements(migration.down_sql):
+                connection.exec_driver_sql(statement)
+            connection.execute(text("DELETE FROM schema_migrations WHERE version = :version"), {"version": version})
+        reverted.append(migration)
+
+    return reverted
+
+
+def stamp(engine: Engine, version: str) -> None:
+    """Record every migration up to `version` as applied without running it (for databases created another way)."""
+    migrations = discover_migrations(engine.dialect.name)
+    if version != BASE_VERSION:
+        find_migration(migrations, version)
+
+    with engine.begin() as connection:
+        ensure_migrations_table(connection)
+        connection.execute(text("DELETE FROM schema_migrations"))
+
+        for migration in migrations:
+            if version == BASE_VERSION or migration.version > version:
+                break
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                {"version": migration.version, "name": migration.name},
+            )
+
+
+def main(argv: list[str] | None = None) -> None:
+    configure_logging()
+
+    parser = argparse.ArgumentParser(prog="python -m app.database.migrate", description="Manage the database schema")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("upgrade", help="apply pending migrations").add_argument("version", nargs="?")
+    subparsers.add_parser("downgrade", help="revert migrations").add_argument("version", nargs="?")
+    subparsers.add_parser("current", help="print the applied version")
+    subparsers.add_parser("stamp", help="mark migrations as applied").add_argument("version")
+    arguments = parser.parse_args(argv)
+
+    engine = create_migration_engine()
+    try:
+        if arguments.command == "upgrade":
+            applied = upgrade(engine, arguments.version)
+            logger.info("Applied %d migration(s), schema at %s", len(applied), current_version(engine))
+        elif arguments.command == "downgrade":
+            reverted = downgrade(engine, arguments.version)
+            logger.info("Reverted %d migration(s), schema at %s", len(reverted), current_version(engine) or BASE_VERSION)
+        elif arguments.command == "current":
+            print(current_version(engine) or BASE_VERSION)
+        elif arguments.command == "stamp":
+            stamp(engine, arguments.version)
+            logger.info("Stamped schema at %s", arguments.version)
+    except MigrationError as exc:
+        parser.exit(1, f"error: {exc}\n")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
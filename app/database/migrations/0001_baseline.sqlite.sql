@@ -0,0 +1,183 @@
+-- Schema as previously created by Base.metadata.create_all, the starting point for versioned migrations.
+
+-- migrate:up
+CREATE TABLE prompt_version (
+    id INTEGER NOT NULL,
+    prompt_path VARCHAR(512) NOT NULL,
+    content_hash VARCHAR(64) NOT NULL,
+    content TEXT NOT NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_prompt_version UNIQUE (prompt_path, content_hash)
+);
+CREATE INDEX ix_prompt_version_content_hash ON prompt_version (content_hash);
+
+CREATE TABLE rater (
+    id INTEGER NOT NULL,
+    name VARCHAR(128) NOT NULL,
+    "key" VARCHAR(256) NOT NULL,
+    admin BOOLEAN NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE ("key")
+);
+
+CREATE TABLE source_catalog (
+    path VARCHAR(512) NOT NULL,
+    parent_path VARCHAR(512) NOT NULL,
+    name VARCHAR(256) NOT NULL,
+    sort_key VARCHAR(1024) NOT NULL,
+    has_source BOOLEAN NOT NULL,
+    has_children BOOLEAN NOT NULL,
+    size BIGINT,
+    tag VARCHAR(128),
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (path)
+);
+CREATE INDEX ix_source_catalog_parent_sort ON source_catalog (parent_path, sort_key);
+CREATE INDEX ix_source_catalog_source_sort ON source_catalog (has_source, sort_key);
+CREATE INDEX ix_source_catalog_tag_sort ON source_catalog (tag, sort_key);
+
+CREATE TABLE source_tag (
+    id INTEGER NOT NULL,
+    source_path VARCHAR(512) NOT NULL,
+    tag VARCHAR(128) NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (source_path)
+);
+
+CREATE TABLE rater_login_event (
+    rater_id INTEGER NOT NULL,
+    last_login_at DATETIME NOT NULL,
+    PRIMARY KEY (rater_id),
+    FOREIGN KEY(rater_id) REFERENCES rater (id) ON DELETE CASCADE
+);
+
+CREATE TABLE submit (
+    id INTEGER NOT NULL,
+    model VARCHAR(128) NOT NULL,
+    analysis_mode VARCHAR(32) NOT NULL,
+    openai_server VARCHAR(128) NOT NULL,
+    source_path VARCHAR(512) NOT NULL,
+    prompt_path VARCHAR(512) NOT NULL,
+    prompt_hash VARCHAR(64),
+    created_by_id INTEGER,
+    published BOOLEAN NOT NULL,
+    total_issues INTEGER NOT NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(created_by_id) REFERENCES rater (id)
+);
+
+CREATE TABLE ai_submit_rating (
+    id INTEGER NOT NULL,
+    submit_id INTEGER NOT NULL,
+    relevance_rating INTEGER,
+    quality_rating INTEGER,
+    comment TEXT,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_ai_submit UNIQUE (submit_id),
+    FOREIGN KEY(submit_id) REFERENCES submit (id) ON DELETE CASCADE
+);
+
+CREATE TABLE analysis_job (
+    id INTEGER NOT NULL,
+    job_id VARCHAR(128) NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    job_type VARCHAR(32) NOT NULL,
+    source_path VARCHAR(512),
+    prompt_path VARCHAR(512),
+    prompt_hash VARCHAR(64),
+    model VARCHAR(128),
+    analysis_mode VARCHAR(32) NOT NULL,
+    openai_server VARCHAR(128) NOT NULL,
+    submit_id INTEGER,
+    error TEXT,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (job_id),
+    FOREIGN KEY(submit_id) REFERENCES submit (id)
+);
+
+CREATE TABLE issue (
+    id INTEGER NOT NULL,
+    submit_id INTEGER NOT NULL,
+    file VARCHAR(512),
+    severity VARCHAR(32) NOT NULL,
+    line INTEGER,
+    explanation TEXT NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(submit_id) REFERENCES submit (id) ON DELETE CASCADE
+);
+
+CREATE TABLE submit_rater_progress (
+    submit_id INTEGER NOT NULL,
+    rater_id INTEGER NOT NULL,
+    total_issues INTEGER NOT NULL,
+    started_issues INTEGER NOT NULL,
+    fully_rated_issues INTEGER NOT NULL,
+    summary_started BOOLEAN NOT NULL,
+    summary_fully_rated BOOLEAN NOT NULL,
+    rating_state VARCHAR(32) NOT NULL,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (submit_id, rater_id),
+    FOREIGN KEY(submit_id) REFERENCES submit (id) ON DELETE CASCADE,
+    FOREIGN KEY(rater_id) REFERENCES rater (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_submit_rater_progress_rater_state ON submit_rater_progress (rater_id, rating_state);
+
+CREATE TABLE submit_rating (
+    id INTEGER NOT NULL,
+    submit_id INTEGER NOT NULL,
+    rater_id INTEGER NOT NULL,
+    relevance_rating INTEGER,
+    quality_rating INTEGER,
+    comment TEXT,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_submit_rater UNIQUE (submit_id, rater_id),
+    FOREIGN KEY(submit_id) REFERENCES submit (id) ON DELETE CASCADE,
+    FOREIGN KEY(rater_id) REFERENCES rater (id)
+);
+
+CREATE TABLE ai_issue_rating (
+    id INTEGER NOT NULL,
+    issue_id INTEGER NOT NULL,
+    relevance_rating INTEGER,
+    quality_rating INTEGER,
+    comment TEXT,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_ai_issue UNIQUE (issue_id),
+    FOREIGN KEY(issue_id) REFERENCES issue (id) ON DELETE CASCADE
+);
+
+CREATE TABLE issue_rating (
+    id INTEGER NOT NULL,
+    issue_id INTEGER,
+    rater_id INTEGER NOT NULL,
+    relevance_rating INTEGER,
+    quality_rating INTEGER,
+    comment TEXT,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_issue_rater UNIQUE (issue_id, rater_id),
+    FOREIGN KEY(issue_id) REFERENCES issue (id),
+    FOREIGN KEY(rater_id) REFERENCES rater (id)
+);
+
+-- migrate:down
+DROP TABLE IF EXISTS issue_rating;
+DROP TABLE IF EXISTS ai_issue_rating;
+DROP TABLE IF EXISTS submit_rating;
+DROP TABLE IF EXISTS submit_rater_progress;
+DROP TABLE IF EXISTS issue;
+DROP TABLE IF EXISTS analysis_job;
+DROP TABLE IF EXISTS ai_submit_rating;
+DROP TABLE IF EXISTS submit;
+DROP TABLE IF EXISTS rater_login_event;
+DROP TABLE IF EXISTS source_tag;
+DROP TABLE IF EXISTS source_catalog;
+DROP TABLE IF EXISTS rater;
+DROP TABLE IF EXISTS prompt_version;
@@ -0,0 +1,13 @@
+-- Trigram indexes for the submit list filters (model, source path, prompt path), used by ILIKE directly.
+
+-- migrate:up
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_submit_model_trgm ON submit USING gin (model gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_submit_source_path_trgm ON submit USING gin (source_path gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_submit_prompt_path_trgm ON submit USING gin (prompt_path gin_trgm_ops);
+
+-- migrate:down
+DROP INDEX IF EXISTS ix_submit_prompt_path_trgm;
+DROP INDEX IF EXISTS ix_submit_source_path_trgm;
+DROP INDEX IF EXISTS ix_submit_model_trgm;
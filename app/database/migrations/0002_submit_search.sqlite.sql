@@ -0,0 +1,32 @@
+-- FTS5 trigram shadow table for the submit list filters (model, source path, prompt path).
+
+-- migrate:up
+CREATE VIRTUAL TABLE IF NOT EXISTS submit_search USING fts5(
+    model, source_path, prompt_path,
+    tokenize = 'trigram', content = 'submit', content_rowid = 'id'
+);
+
+CREATE TRIGGER IF NOT EXISTS submit_search_ai AFTER INSERT ON submit BEGIN
+    INSERT INTO submit_search (rowid, model, source_path, prompt_path)
+    VALUES (new.id, new.model, new.source_path, new.prompt_path);
+END;
+
+CREATE TRIGGER IF NOT EXISTS submit_search_ad AFTER DELETE ON submit BEGIN
+    INSERT INTO submit_search (submit_search, rowid, model, source_path, prompt_path)
+    VALUES ('delete', old.id, old.model, old.source_path, old.prompt_path);
+END;
+
+CREATE TRIGGER IF NOT EXISTS submit_search_au AFTER UPDATE OF model, source_path, prompt_path ON submit BEGIN
+    INSERT INTO submit_search (submit_search, rowid, model, source_path, prompt_path)
+    VALUES ('delete', old.id, old.model, old.source_path, old.prompt_path);
+    INSERT INTO submit_search (rowid, model, source_path, prompt_path)
+    VALUES (new.id, new.model, new.source_path, new.prompt_path);
+END;
+
+INSERT INTO submit_search (submit_search) VALUES ('rebuild');
+
+-- migrate:down
+DROP TRIGGER IF EXISTS submit_search_au;
+DROP TRIGGER IF EXISTS submit_search_ad;
+DROP TRIGGER IF EXISTS submit_search_ai;
+DROP TABLE IF EXISTS submit_search;
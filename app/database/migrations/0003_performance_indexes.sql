@@ -0,0 +1,34 @@
+-- Indexes for hot foreign keys and list filters. Query plans they serve are documented in docs/query-plans.md.
+-- issue_rating.issue_id, submit_rating.submit_id and ai_*_rating lookups are already covered by their unique constraints.
+
+-- migrate:up
+CREATE INDEX IF NOT EXISTS ix_issue_submit_severity ON issue (submit_id, severity);
+
+CREATE INDEX IF NOT EXISTS ix_issue_rating_rater_issue ON issue_rating (rater_id, issue_id);
+CREATE INDEX IF NOT EXISTS ix_submit_rating_rater ON submit_rating (rater_id);
+
+CREATE INDEX IF NOT EXISTS ix_submit_created ON submit (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_submit_model_created ON submit (model, created_at);
+CREATE INDEX IF NOT EXISTS ix_submit_source_path_created ON submit (source_path, created_at);
+CREATE INDEX IF NOT EXISTS ix_submit_prompt_path_created ON submit (prompt_path, created_at);
+CREATE INDEX IF NOT EXISTS ix_submit_created_by ON submit (created_by_id);
+
+CREATE INDEX IF NOT EXISTS ix_analysis_job_status_updated ON analysis_job (status, updated_at);
+CREATE INDEX IF NOT EXISTS ix_analysis_job_updated ON analysis_job (updated_at, id);
+CREATE INDEX IF NOT EXISTS ix_analysis_job_submit ON analysis_job (submit_id);
+
+-- migrate:down
+DROP INDEX IF EXISTS ix_analysis_job_submit;
+DROP INDEX IF EXISTS ix_analysis_job_updated;
+DROP INDEX IF EXISTS ix_analysis_job_status_updated;
+
+DROP INDEX IF EXISTS ix_submit_created_by;
+DROP INDEX IF EXISTS ix_submit_prompt_path_created;
+DROP INDEX IF EXISTS ix_submit_source_path_created;
+DROP INDEX IF EXISTS ix_submit_model_created;
+DROP INDEX IF EXISTS ix_submit_created;
+
+DROP INDEX IF EXISTS ix_submit_rating_rater;
+DROP INDEX IF EXISTS ix_issue_rating_rater_issue;
+
+DROP INDEX IF EXISTS ix_issue_submit_severity;
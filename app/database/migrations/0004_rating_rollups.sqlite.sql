@@ -0,0 +1,75 @@
+-- Daily and weekly sums of summary ratings for the dashboard time series, backfilled from existing ratings.
+-- `python -m app.utils.rating_rollups rebuild` recomputes the same data.
+
+-- migrate:up
+CREATE TABLE rating_rollup (
+    bucket_size VARCHAR(8) NOT NULL,
+    bucket_start DATE NOT NULL,
+    rating_source VARCHAR(16) NOT NULL,
+    prompt_path VARCHAR(512) NOT NULL,
+    model VARCHAR(128) NOT NULL,
+    source_path VARCHAR(512) NOT NULL,
+    relevance_sum INTEGER NOT NULL,
+    relevance_count INTEGER NOT NULL,
+    quality_sum INTEGER NOT NULL,
+    quality_count INTEGER NOT NULL,
+    ratings_count INTEGER NOT NULL,
+    last_rated_at DATETIME,
+    PRIMARY KEY (bucket_size, bucket_start, rating_source, prompt_path, model, source_path)
+);
+CREATE INDEX ix_rating_rollup_source_bucket ON rating_rollup (bucket_size, rating_source, bucket_start);
+
+INSERT INTO rating_rollup (
+    bucket_size, bucket_start, rating_source, prompt_path, model, source_path,
+    relevance_sum, relevance_count, quality_sum, quality_count, ratings_count, last_rated_at
+)
+SELECT
+    'day', date(rating.created_at), 'teacher', submit.prompt_path, submit.model, submit.source_path,
+    COALESCE(SUM(rating.relevance_rating), 0), COUNT(rating.relevance_rating),
+    COALESCE(SUM(rating.quality_rating), 0), COUNT(rating.quality_rating),
+    COUNT(*), MAX(rating.created_at)
+FROM submit_rating AS rating
+JOIN submit ON submit.id = rating.submit_id
+GROUP BY date(rating.created_at), submit.prompt_path, submit.model, submit.source_path;
+
+INSERT INTO rating_rollup (
+    bucket_size, bucket_start, rating_source, prompt_path, model, source_path,
+    relevance_sum, relevance_count, quality_sum, quality_count, ratings_count, last_rated_at
+)
+SELECT
+    'day', date(rating.created_at), 'ai', submit.prompt_path, submit.model, submit.source_path,
+    COALESCE(SUM(rating.relevance_rating), 0), COUNT(rating.relevance_rating),
+    COALESCE(SUM(rating.quality_rating), 0), COUNT(rating.quality_rating),
+    COUNT(*), MAX(rating.created_at)
+FROM ai_submit_rating AS rating
+JOIN submit ON submit.id = rating.submit_id
+GROUP BY date(rating.created_at), submit.prompt_path, submit.model, submit.source_path;
+
+INSERT INTO rating_rollup (
+    bucket_size, bucket_start, rating_source, prompt_path, model, source_path,
+    relevance_sum, relevance_count, quality_sum, quality_count, ratings_count, last_rated_at
+)
+SELECT
+    'week', date(rating.created_at, 'weekday 0', '-6 days'), 'teacher', submit.prompt_path, submit.model, submit.source_path,
+    COALESCE(SUM(rating.relevance_rating), 0), COUNT(rating.relevance_rating),
+    COALESCE(SUM(rating.quality_rating), 0), COUNT(rating.quality_rating),
+    COUNT(*), MAX(rating.created_at)
+FROM submit_rating AS rating
+JOIN submit ON submit.id = rating.submit_id
+GROUP BY date(rating.created_at, 'weekday 0', '-6 days'), submit.prompt_path, submit.model, submit.source_path;
+
+INSERT INTO rating_rollup (
+    bucket_size, bucket_start, rating_source, prompt_path, model, source_path,
+    relevance_sum, relevance_count, quality_sum, quality_count, ratings_count, last_rated_at
+)
+SELECT
+    'week', date(rating.created_at, 'weekday 0', '-6 days'), 'ai', submit.prompt_path, submit.model, submit.source_path,
+    COALESCE(SUM(rating.relevance_rating), 0), COUNT(rating.relevance_rating),
+    COALESCE(SUM(rating.quality_rating), 0), COUNT(rating.quality_rating),
+    COUNT(*), MAX(rating.created_at)
+FROM ai_submit_rating AS rating
+JOIN submit ON submit.id = rating.submit_id
+GROUP BY date(rating.created_at, 'weekday 0', '-6 days'), submit.prompt_path, submit.model, submit.source_path;
+
+-- migrate:down
+DROP TABLE IF EXISTS rating_rollup;
@@ -0,0 +1,15 @@
+-- Hashed API keys so authentication looks raters up by an indexed digest.
+
+-- migrate:up
+ALTER TABLE rater ADD COLUMN key_hash VARCHAR(64);
+
+UPDATE rater SET key_hash = encode(sha256(convert_to("key", 'UTF8')), 'hex');
+
+ALTER TABLE rater ALTER COLUMN key_hash SET NOT NULL;
+
+CREATE UNIQUE INDEX ix_rater_key_hash ON rater (key_hash);
+
+-- migrate:down
+DROP INDEX IF EXISTS ix_rater_key_hash;
+
+ALTER TABLE rater DROP COLUMN key_hash;
@@ -0,0 +1,13 @@
+-- Hashed API keys so authentication looks raters up by an indexed digest. `sha256` is registered by the runner.
+
+-- migrate:up
+ALTER TABLE rater ADD COLUMN key_hash VARCHAR(64) NOT NULL DEFAULT '';
+
+UPDATE rater SET key_hash = sha256("key");
+
+CREATE UNIQUE INDEX ix_rater_key_hash ON rater (key_hash);
+
+-- migrate:down
+DROP INDEX IF EXISTS ix_rater_key_hash;
+
+ALTER TABLE rater DROP COLUMN key_hash;
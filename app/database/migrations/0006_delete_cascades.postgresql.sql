@@ -0,0 +1,36 @@
+-- Database-level cascades so submits, issues and raters can be deleted with one set-based statement, and progress
+-- counters for long-running background jobs.
+
+-- migrate:up
+ALTER TABLE issue_rating DROP CONSTRAINT issue_rating_issue_id_fkey;
+ALTER TABLE issue_rating
+    ADD CONSTRAINT issue_rating_issue_id_fkey FOREIGN KEY (issue_id) REFERENCES issue (id) ON DELETE CASCADE;
+ALTER TABLE issue_rating DROP CONSTRAINT issue_rating_rater_id_fkey;
+ALTER TABLE issue_rating
+    ADD CONSTRAINT issue_rating_rater_id_fkey FOREIGN KEY (rater_id) REFERENCES rater (id) ON DELETE CASCADE;
+
+ALTER TABLE submit_rating DROP CONSTRAINT submit_rating_rater_id_fkey;
+ALTER TABLE submit_rating
+    ADD CONSTRAINT submit_rating_rater_id_fkey FOREIGN KEY (rater_id) REFERENCES rater (id) ON DELETE CASCADE;
+
+ALTER TABLE analysis_job DROP CONSTRAINT analysis_job_submit_id_fkey;
+ALTER TABLE analysis_job
+    ADD CONSTRAINT analysis_job_submit_id_fkey FOREIGN KEY (submit_id) REFERENCES submit (id) ON DELETE SET NULL;
+
+ALTER TABLE analysis_job ADD COLUMN progress_current INTEGER;
+ALTER TABLE analysis_job ADD COLUMN progress_total INTEGER;
+
+-- migrate:down
+ALTER TABLE analysis_job DROP COLUMN progress_total;
+ALTER TABLE analysis_job DROP COLUMN progress_current;
+
+ALTER TABLE analysis_job DROP CONSTRAINT analysis_job_submit_id_fkey;
+ALTER TABLE analysis_job ADD CONSTRAINT analysis_job_submit_id_fkey FOREIGN KEY (submit_id) REFERENCES submit (id);
+
+ALTER TABLE submit_rating DROP CONSTRAINT submit_rating_rater_id_fkey;
+ALTER TABLE submit_rating ADD CONSTRAINT submit_rating_rater_id_fkey FOREIGN KEY (rater_id) REFERENCES rater (id);
+
+ALTER TABLE issue_rating DROP CONSTRAINT issue_rating_rater_id_fkey;
+ALTER TABLE issue_rating ADD CONSTRAINT issue_rating_rater_id_fkey FOREIGN KEY (rater_id) REFERENCES rater (id);
+ALTER TABLE issue_rating DROP CONSTRAINT issue_rating_issue_id_fkey;
+ALTER TABLE issue_rating ADD CONSTRAINT issue_rating_issue_id_fkey FOREIGN KEY (issue_id) REFERENCES issue (id);
@@ -0,0 +1,159 @@
+-- Database-level cascades so submits, issues and raters can be deleted with one set-based statement, and progress
+-- counters for long-running background jobs. SQLite cannot alter foreign keys, so the affected tables are rebuilt.
+-- The runner keeps foreign key enforcement off while migrating.
+
+-- migrate:up
+CREATE TABLE issue_rating_new (
+    id INTEGER NOT NULL,
+    issue_id INTEGER,
+    rater_id INTEGER NOT NULL,
+    relevance_rating INTEGER,
+    quality_rating INTEGER,
+    comment TEXT,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_issue_rater UNIQUE (issue_id, rater_id),
+    FOREIGN KEY(issue_id) REFERENCES issue (id) ON DELETE CASCADE,
+    FOREIGN KEY(rater_id) REFERENCES rater (id) ON DELETE CASCADE
+);
+INSERT INTO issue_rating_new (id, issue_id, rater_id, relevance_rating, quality_rating, comment, created_at)
+SELECT id, issue_id, rater_id, relevance_rating, quality_rating, comment, created_at FROM issue_rating;
+DROP TABLE issue_rating;
+ALTER TABLE issue_rating_new RENAME TO issue_rating;
+CREATE INDEX ix_issue_rating_rater_issue ON issue_rating (rater_id, issue_id);
+
+CREATE TABLE submit_rating_new (
+    id INTEGER NOT NULL,
+    submit_id INTEGER NOT NULL,
+    rater_id INTEGER NOT NULL,
+    relevance_rating INTEGER,
+    quality_rating INTEGER,
+    comment TEXT,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_submit_rater UNIQUE (submit_id, rater_id),
+    FOREIGN KEY(submit_id) REFERENCES submit (id) ON DELETE CASCADE,
+    FOREIGN KEY(rater_id) REFERENCES rater (id) ON DELETE CASCADE
+);
+INSERT INTO submit_rating_new (id, submit_id, rater_id, relevance_rating, quality_rating, comment, created_at)
+SELECT id, submit_id, rater_id, relevance_rating, quality_rating, comment, created_at FROM submit_rating;
+DROP TABLE submit_rating;
+ALTER TABLE submit_rating_new RENAME TO submit_rating;
+CREATE INDEX ix_submit_rating_rater ON submit_rating (rater_id);
+
+CREATE TABLE analysis_job_new (
+    id INTEGER NOT NULL,
+    job_id VARCHAR(128) NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    job_type VARCHAR(32) NOT NULL,
+    source_path VARCHAR(512),
+    prompt_path VARCHAR(512),
+    prompt_hash VARCHAR(64),
+    model VARCHAR(128),
+    analysis_mode VARCHAR(32) NOT NULL,
+    openai_server VARCHAR(128) NOT NULL,
+    submit_id INTEGER,
+    error TEXT,
+    progress_current INTEGER,
+    progress_total INTEGER,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (job_id),
+    FOREIGN KEY(submit_id) REFERENCES submit (id) ON DELETE SET NULL
+);
+INSERT INTO analysis_job_new (
+    id, job_id, status, job_type, source_path, prompt_path, prompt_hash, model, analysis_mode, openai_server,
+    submit_id, error, created_at, updated_at
+)
+SELECT
+    id, job_id, status, job_type, source_path, prompt_path, prompt_hash, model, analysis_mode, openai_server,
+    submit_id, error, created_at, updated_at
+FROM analysis_job;
+DROP TABLE analysis_job;
+ALTER TABLE analysis_job_new RENAME TO analysis_job;
+CREATE INDEX ix_analysis_job_status_updated ON analysis_job (status, updated_at);
+CREATE INDEX ix_analysis_job_updated ON analysis_job (updated_at, id);
+CREATE INDEX ix_analysis_job_submit ON analysis_job (submit_id);
+
+-- Remove rows orphaned while enforcement was off, so the data satisfies the constraints the API now enforces.
+DELETE FROM issue WHERE submit_id NOT IN (SELECT id FROM submit);
+DELETE FROM issue_rating WHERE issue_id IS NOT NULL AND issue_id NOT IN (SELECT id FROM issue);
+DELETE FROM ai_issue_rating WHERE issue_id NOT IN (SELECT id FROM issue);
+DELETE FROM issue_rating WHERE rater_id NOT IN (SELECT id FROM rater);
+DELETE FROM submit_rating WHERE submit_id NOT IN (SELECT id FROM submit) OR rater_id NOT IN (SELECT id FROM rater);
+DELETE FROM ai_submit_rating WHERE submit_id NOT IN (SELECT id FROM submit);
+DELETE FROM submit_rater_progress WHERE submit_id NOT IN (SELECT id FROM submit);
+UPDATE analysis_job SET submit_id = NULL WHERE submit_id IS NOT NULL AND submit_id NOT IN (SELECT id FROM submit);
+
+-- migrate:down
+CREATE TABLE analysis_job_old (
+    id INTEGER NOT NULL,
+    job_id VARCHAR(128) NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    job_type VARCHAR(32) NOT NULL,
+    source_path VARCHAR(512),
+    prompt_path VARCHAR(512),
+    prompt_hash VARCHAR(64),
+    model VARCHAR(128),
+    analysis_mode VARCHAR(32) NOT NULL,
+    openai_server VARCHAR(128) NOT NULL,
+    submit_id INTEGER,
+    error TEXT,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (job_id),
+    FOREIGN KEY(submit_id) REFERENCES submit (id)
+);
+INSERT INTO analysis_job_old (
+    id, job_id, status, job_type, source_path, prompt_path, prompt_hash, model, analysis_mode, openai_server,
+    submit_id, error, created_at, updated_at
+)
+SELECT
+    id, job_id, status, job_type, source_path, prompt_path, prompt_hash, model, analysis_mode, openai_server,
+    submit_id, error, created_at, updated_at
+FROM analysis_job;
+DROP TABLE analysis_job;
+ALTER TABLE analysis_job_old RENAME TO analysis_job;
+CREATE INDEX ix_analysis_job_status_updated ON analysis_job (status, updated_at);
+CREATE INDEX ix_analysis_job_updated ON analysis_job (updated_at, id);
+CREATE INDEX ix_analysis_job_submit ON analysis_job (submit_id);
+
+CREATE TABLE submit_rating_old (
+    id INTEGER NOT NULL,
+    submit_id INTEGER NOT NULL,
+    rater_id INTEGER NOT NULL,
+    relevance_rating INTEGER,
+    quality_rating INTEGER,
+    comment TEXT,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_submit_rater UNIQUE (submit_id, rater_id),
+    FOREIGN KEY(submit_id) REFERENCES submit (id) ON DELETE CASCADE,
+    FOREIGN KEY(rater_id) REFERENCES rater (id)
+);
+INSERT INTO submit_rating_old (id, submit_id, rater_id, relevance_rating, quality_rating, comment, created_at)
+SELECT id, submit_id, rater_id, relevance_rating, quality_rating, comment, created_at FROM submit_rating;
+DROP TABLE submit_rating;
+ALTER TABLE submit_rating_old RENAME TO submit_rating;
+CREATE INDEX ix_submit_rating_rater ON submit_rating (rater_id);
+
+CREATE TABLE issue_rating_old (
+    id INTEGER NOT NULL,
+    issue_id INTEGER,
+    rater_id INTEGER NOT NULL,
+    relevance_rating INTEGER,
+    quality_rating INTEGER,
+    comment TEXT,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_issue_rater UNIQUE (issue_id, rater_id),
+    FOREIGN KEY(issue_id) REFERENCES issue (id),
+    FOREIGN KEY(rater_id) REFERENCES rater (id)
+);
+INSERT INTO issue_rating_old (id, issue_id, rater_id, relevance_rating, quality_rating, comment, created_at)
+SELECT id, issue_id, rater_id, relevance_rating, quality_rating, comment, created_at FROM issue_rating;
+DROP TABLE issue_rating;
+ALTER TABLE issue_rating_old RENAME TO issue_rating;
+CREATE INDEX ix_issue_rating_rater_issue ON issue_rating (rater_id, issue_id);
@@ -0,0 +1,7 @@
+-- Current pipeline stage of running analysis jobs (draft, critique, review, critiquer, persisting).
+
+-- migrate:up
+ALTER TABLE analysis_job ADD COLUMN stage VARCHAR(32);
+
+-- migrate:down
+ALTER TABLE analysis_job DROP COLUMN stage;
@@ -0,0 +1,12 @@
+-- Parameters restarts need to re-run a job as it was enqueued: whether the critiquer runs and who started it.
+
+-- migrate:up
+ALTER TABLE analysis_job ADD COLUMN IF NOT EXISTS run_critiquer BOOLEAN NOT NULL DEFAULT TRUE;
+ALTER TABLE analysis_job ADD COLUMN IF NOT EXISTS created_by_id INTEGER;
+ALTER TABLE analysis_job ADD CONSTRAINT analysis_job_created_by_id_fkey
+    FOREIGN KEY (created_by_id) REFERENCES rater (id) ON DELETE SET NULL;
+
+-- migrate:down
+ALTER TABLE analysis_job DROP CONSTRAINT IF EXISTS analysis_job_created_by_id_fkey;
+ALTER TABLE analysis_job DROP COLUMN IF EXISTS created_by_id;
+ALTER TABLE analysis_job DROP COLUMN IF EXISTS run_critiquer;
@@ -0,0 +1,43 @@
+-- Parameters restarts need to re-run a job as it was enqueued: whether the critiquer runs and who started it.
+
+-- migrate:up
+ALTER TABLE analysis_job ADD COLUMN run_critiquer BOOLEAN NOT NULL DEFAULT 1;
+ALTER TABLE analysis_job ADD COLUMN created_by_id INTEGER REFERENCES rater (id) ON DELETE SET NULL;
+
+-- migrate:down
+-- SQLite cannot drop a column that takes part in a foreign key, so the table is rebuilt.
+CREATE TABLE analysis_job_old (
+    id INTEGER NOT NULL,
+    job_id VARCHAR(128) NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    job_type VARCHAR(32) NOT NULL,
+    source_path VARCHAR(512),
+    prompt_path VARCHAR(512),
+    prompt_hash VARCHAR(64),
+    model VARCHAR(128),
+    analysis_mode VARCHAR(32) NOT NULL,
+    openai_server VARCHAR(128) NOT NULL,
+    submit_id INTEGER,
+    error TEXT,
+    progress_current INTEGER,
+    progress_total INTEGER,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    stage VARCHAR(32),
+    PRIMARY KEY (id),
+    UNIQUE (job_id),
+    FOREIGN KEY(submit_id) REFERENCES submit (id) ON DELETE SET NULL
+);
+INSERT INTO analysis_job_old (
+    id, job_id, status, job_type, source_path, prompt_path, prompt_hash, model, analysis_mode, openai_server,
+    submit_id, error, progress_current, progress_total, created_at, updated_at, stage
+)
+SELECT
+    id, job_id, status, job_type, source_path, prompt_path, prompt_hash, model, analysis_mode, openai_server,
+    submit_id, error, progress_current, progress_total, created_at, updated_at, stage
+FROM analysis_job;
+DROP TABLE analysis_job;
+ALTER TABLE analysis_job_old RENAME TO analysis_job;
+CREATE INDEX ix_analysis_job_status_updated ON analysis_job (status, updated_at);
+CREATE INDEX ix_analysis_job_updated ON analysis_job (updated_at, id);
+CREATE INDEX ix_analysis_job_submit ON analysis_job (submit_id);
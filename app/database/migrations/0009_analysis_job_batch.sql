@@ -0,0 +1,9 @@
+-- Jobs created by one batch request share a batch id, so the batch can be tracked as one unit.
+
+-- migrate:up
+ALTER TABLE analysis_job ADD COLUMN batch_id VARCHAR(64);
+CREATE INDEX IF NOT EXISTS ix_analysis_job_batch ON analysis_job (batch_id);
+
+-- migrate:down
+DROP INDEX IF EXISTS ix_analysis_job_batch;
+ALTER TABLE analysis_job DROP COLUMN batch_id;
@@ -0,0 +1,35 @@
+-- Experiments: a grid of sources, prompts, models, servers and analysis modes run as one batch of jobs.
+-- experiment_submit holds the existing submits an experiment reused instead of re-running their cell.
+
+-- migrate:up
+CREATE TABLE experiment (
+    id INTEGER NOT NULL,
+    name VARCHAR(256) NOT NULL,
+    batch_id VARCHAR(64) NOT NULL,
+    grid TEXT NOT NULL,
+    total_cells INTEGER NOT NULL,
+    reused_cells INTEGER NOT NULL,
+    created_by_id INTEGER,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_experiment_batch UNIQUE (batch_id),
+    FOREIGN KEY(created_by_id) REFERENCES rater (id) ON DELETE SET NULL
+);
+
+CREATE TABLE experiment_submit (
+    experiment_id INTEGER NOT NULL,
+    submit_id INTEGER NOT NULL,
+    PRIMARY KEY (experiment_id, submit_id),
+    FOREIGN KEY(experiment_id) REFERENCES experiment (id) ON DELETE CASCADE,
+    FOREIGN KEY(submit_id) REFERENCES submit (id) ON DELETE CASCADE
+);
+CREATE INDEX ix_experiment_submit_submit ON experiment_submit (submit_id);
+
+ALTER TABLE analysis_job ADD COLUMN input_tokens INTEGER;
+ALTER TABLE analysis_job ADD COLUMN output_tokens INTEGER;
+
+-- migrate:down
+ALTER TABLE analysis_job DROP COLUMN output_tokens;
+ALTER TABLE analysis_job DROP COLUMN input_tokens;
+DROP TABLE experiment_submit;
+DROP TABLE experiment;
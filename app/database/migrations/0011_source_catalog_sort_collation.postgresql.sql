@@ -0,0 +1,9 @@
+-- Sort keys encode the natural path order byte by byte (a \x01 separator and 0/1 prefixes), so they must be
+-- compared bytewise. Under a linguistic collation punctuation and control characters are ignored and the order
+-- breaks; with the column itself in "C", ORDER BY sort_key keeps using the (..., sort_key) indexes.
+
+-- migrate:up
+ALTER TABLE source_catalog ALTER COLUMN sort_key TYPE VARCHAR(1024) COLLATE "C";
+
+-- migrate:down
+ALTER TABLE source_catalog ALTER COLUMN sort_key TYPE VARCHAR(1024) COLLATE "default";
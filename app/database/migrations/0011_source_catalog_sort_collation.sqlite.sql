@@ -0,0 +1,8 @@
+-- SQLite already compares text bytewise (BINARY), which is the order sort keys are built for; see the Postgres
+-- variant of this migration.
+
+-- migrate:up
+SELECT 1;
+
+-- migrate:down
+SELECT 1;
@@ -0,0 +1,18 @@
+-- Persistent index of the SOURCES_ROOT tree, kept in sync by uploads, renames and the file-system watcher.
+-- The API rebuilds the catalog content on startup, so no backfill is needed here.
+
+CREATE TABLE IF NOT EXISTS source_catalog (
+    path VARCHAR(512) PRIMARY KEY,
+    parent_path VARCHAR(512) NOT NULL,
+    name VARCHAR(256) NOT NULL,
+    sort_key VARCHAR(1024) NOT NULL,
+    has_source BOOLEAN NOT NULL DEFAULT FALSE,
+    has_children BOOLEAN NOT NULL DEFAULT FALSE,
+    size BIGINT NULL,
+    tag VARCHAR(128) NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_source_catalog_parent_sort ON source_catalog (parent_path, sort_key);
+CREATE INDEX IF NOT EXISTS ix_source_catalog_source_sort ON source_catalog (has_source, sort_key);
+CREATE INDEX IF NOT EXISTS ix_source_catalog_tag_sort ON source_catalog (tag, sort_key);
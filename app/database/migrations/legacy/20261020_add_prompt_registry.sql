@@ -0,0 +1,15 @@
+-- Versioned prompt registry. Jobs and submits record the content hash of the prompt they ran with.
+
+CREATE TABLE IF NOT EXISTS prompt_version (
+    id SERIAL PRIMARY KEY,
+    prompt_path VARCHAR(512) NOT NULL,
+    content_hash VARCHAR(64) NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_prompt_version UNIQUE (prompt_path, content_hash)
+);
+
+CREATE INDEX IF NOT EXISTS ix_prompt_version_content_hash ON prompt_version (content_hash);
+
+ALTER TABLE submit ADD COLUMN prompt_hash VARCHAR(64) NULL;
+ALTER TABLE analysis_job ADD COLUMN prompt_hash VARCHAR(64) NULL;
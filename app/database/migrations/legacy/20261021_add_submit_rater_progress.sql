@@ -0,0 +1,81 @@
+-- Materialized per-(submit, rater) rating progress, maintained by the rating write paths.
+
+ALTER TABLE submit ADD COLUMN total_issues INTEGER NOT NULL DEFAULT 0;
+
+UPDATE submit SET total_issues = (
+    SELECT COUNT(issue.id) FROM issue WHERE issue.submit_id = submit.id AND issue.severity <> 'summary'
+);
+
+CREATE TABLE IF NOT EXISTS submit_rater_progress (
+    submit_id INTEGER NOT NULL REFERENCES submit(id) ON DELETE CASCADE,
+    rater_id INTEGER NOT NULL REFERENCES rater(id) ON DELETE CASCADE,
+    total_issues INTEGER NOT NULL DEFAULT 0,
+    started_issues INTEGER NOT NULL DEFAULT 0,
+    fully_rated_issues INTEGER NOT NULL DEFAULT 0,
+    summary_started BOOLEAN NOT NULL DEFAULT FALSE,
+    summary_fully_rated BOOLEAN NOT NULL DEFAULT FALSE,
+    rating_state VARCHAR(32) NOT NULL DEFAULT 'not_rated',
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (submit_id, rater_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_submit_rater_progress_rater_state ON submit_rater_progress (rater_id, rating_state);
+
+-- Backfill from existing ratings.
+INSERT INTO submit_rater_progress (
+    submit_id, rater_id, total_issues, started_issues, fully_rated_issues,
+    summary_started, summary_fully_rated, rating_state, updated_at
+)
+SELECT
+    counts.submit_id,
+    counts.rater_id,
+    counts.total_issues,
+    counts.started_issues,
+    counts.fully_rated_issues,
+    counts.summary_started > 0,
+    counts.summary_fully_rated > 0,
+    CASE
+        WHEN counts.fully_rated_issues >= counts.total_issues AND counts.summary_fully_rated > 0 THEN 'rated'
+        WHEN counts.started_issues > 0
+            OR counts.summary_started > 0
+            OR (counts.total_issues > 0 AND counts.fully_rated_issues >= counts.total_issues) THEN 'partially_rated'
+        ELSE 'not_rated'
+    END,
+    CURRENT_TIMESTAMP
+FROM (
+    SELECT
+        pairs.submit_id,
+        pairs.rater_id,
+        submit.total_issues,
+        (
+            SELECT COUNT(DISTINCT issue_rating.issue_id)
+            FROM issue_rating JOIN issue ON issue.id = issue_rating.issue_id
+            WHERE issue.submit_id = pairs.submit_id AND issue_rating.rater_id = pairs.rater_id
+              AND (issue_rating.relevance_rating IS NOT NULL OR issue_rating.quality_rating IS NOT NULL)
+        ) AS started_issues,
+        (
+            SELECT COUNT(DISTINCT issue_rating.issue_id)
+            FROM issue_rating JOIN issue ON issue.id = issue_rating.issue_id
+            WHERE issue.submit_id = pairs.submit_id AND issue_rating.rater_id = pairs.rater_id
+              AND issue_rating.relevance_rating IS NOT NULL AND issue_rating.quality_rating IS NOT NULL
+        ) AS fully_rated_issues,
+        (
+            SELECT COUNT(submit_rating.id) FROM submit_rating
+            WHERE submit_rating.submit_id = pairs.submit_id AND submit_rating.rater_id = pairs.rater_id
+              AND (submit_rating.relevance_rating IS NOT NULL OR submit_rating.quality_rating IS NOT NULL)
+        ) AS summary_started,
+        (
+            SELECT COUNT(submit_rating.id) FROM submit_rating
+            WHERE submit_rating.submit_id = pairs.submit_id AND submit_rating.rater_id = pairs.rater_id
+              AND submit_rating.relevance_rating IS NOT NULL AND submit_rating.quality_rating IS NOT NULL
+        ) AS summary_fully_rated
+    FROM (
+        SELECT issue.submit_id, issue_rating.rater_id
+        FROM issue_rating JOIN issue ON issue.id = issue_rating.issue_id
+        UNION
+        SELECT submit_rating.submit_id, submit_rating.rater_id FROM submit_rating
+    ) AS pairs
+    JOIN submit ON submit.id = pairs.submit_id
+) AS counts
+WHERE 1 = 1
+ON CONFLICT (submit_id, rater_id) DO NOTHING;
@@ -0,0 +1,14 @@
+-- Search indexes for the submit list filters (model, source path, prompt path).
+-- On SQLite the FTS5 trigram shadow table `submit_search` and its sync triggers are created at startup
+-- by app.database.search.install_submit_search.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS ix_submit_model_trgm ON submit USING gin (model gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_submit_source_path_trgm ON submit USING gin (source_path gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_submit_prompt_path_trgm ON submit USING gin (prompt_path gin_trgm_ops);
+
+-- Exact matches for values picked from dropdowns, in list order.
+CREATE INDEX IF NOT EXISTS ix_submit_model_created ON submit (model, created_at);
+CREATE INDEX IF NOT EXISTS ix_submit_source_path_created ON submit (source_path, created_at);
+CREATE INDEX IF NOT EXISTS ix_submit_prompt_path_created ON submit (prompt_path, created_at);
@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -10,6 +10,13 @@ class Base(DeclarativeBase):
 
 class Submit(Base):
     __tablename__ = "submit"
+    __table_args__ = (
+        Index("ix_submit_created", "created_at", "id"),
+        Index("ix_submit_model_created", "model", "created_at"),
+        Index("ix_submit_source_path_created", "source_path", "created_at"),
+        Index("ix_submit_prompt_path_created", "prompt_path", "created_at"),
+        Index("ix_submit_created_by", "created_by_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     model: Mapped[str] = mapped_column(String(128), nullable=False)
@@ -17,16 +24,29 @@ class Submit(Base):
     openai_server: Mapped[str] = mapped_column(String(128), nullable=False, default="server-1")
     source_path: Mapped[str] = mapped_column(String(512), nullable=False)
     prompt_path: Mapped[str] = mapped_column(String(512), nullable=False)
+    prompt_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_by_id: Mapped[int | None] = mapped_column(ForeignKey("rater.id"), nullable=True)
     published: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now())
+    total_issues: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
 
-    issues: Mapped[list["Issue"]] = relationship(back_populates="submit", cascade="all, delete-orphan")
+    issues: Mapped[list["Issue"]] = relationship(
+        back_populates="submit",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    rater_progress: Mapped[list["SubmitRaterProgress"]] = relationship(
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
     created_by: Mapped["Rater"] = relationship()
 
 
 class Issue(Base):
     __tablename__ = "issue"
+    __table_args__ = (
+        Index("ix_issue_submit_severity", "submit_id", "severity"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     submit_id: Mapped[int] = mapped_column(ForeignKey("submit.id", ondelete="CASCADE"), nullable=False)
@@ -36,23 +56,48 @@ class Issue(Base):
     explanation: Mapped[str] = mapped_column(Text, nullable=False)
 
     submit: Mapped["Submit"] = relationship(back_populates="issues")
-    ratings: Mapped[list["IssueRating"]] = relationship(back_populates="issue", cascade="all, delete-orphan")
-    ai_ratings: Mapped[list["AIIssueRating"]] = relationship(back_populates="issue", cascade="all, delete-orphan")
+    ratings: Mapped[list["IssueRating"]] = relationship(
+        back_populates="issue",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    ai_ratings: Mapped[list["AIIssueRating"]] = relationship(
+        back_populates="issue",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 
 class Rater(Base):
     __tablename__ = "rater"
+    __table_args__ = (
+        Index("ix_rater_key_hash", "key_hash", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(128), nullable=False)
     key: Mapped[str] = mapped_column(String(256), nullable=False, unique=True)
+    key_hash: Mapped[str] = mapped_column(String(64), nullable=False)
     admin: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
-    ratings: Mapped[list["IssueRating"]] = relationship(back_populates="rater", cascade="all, delete-orphan")
-    submit_ratings: Mapped[list["SubmitRating"]] = relationship(back_populates="rater", cascade="all, delete-orphan")
+    ratings: Mapped[list["IssueRating"]] = relationship(
+        back_populates="rater",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    submit_ratings: Mapped[list["SubmitRating"]] = relationship(
+        back_populates="rater",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    submit_progress: Mapped[list["SubmitRaterProgress"]] = relationship(
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
     login_event: Mapped["RaterLoginEvent | None"] = relationship(
         back_populates="rater",
         cascade="all, delete-orphan",
+        passive_deletes=True,
         uselist=False,
     )
 
@@ -61,7 +106,7 @@ class RaterLoginEvent(Base):
     __tablename__ = "rater_login_event"
 
     rater_id: Mapped[int] = mapped_column(ForeignKey("rater.id", ondelete="CASCADE"), primary_key=True)
-    last_login_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now())
+    last_login_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
 
     rater: Mapped["Rater"] = relationship(back_populates="login_event")
 
@@ -70,15 +115,16 @@ class IssueRating(Base):
     __tablename__ = "issue_rating"
     __table_args__ = (
         UniqueConstraint("issue_id", "rater_id", name="uq_issue_rater"),
+        Index("ix_issue_rating_rater_issue", "rater_id", "issue_id"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    issue_id: Mapped[int | None] = mapped_column(ForeignKey("issue.id"), nullable=True)
-    rater_id: Mapped[int] = mapped_column(ForeignKey("rater.id"), nullable=False)
+    issue_id: Mapped[int | None] = mapped_column(ForeignKey("issue.id", ondelete="CASCADE"), nullable=True)
+    rater_id: Mapped[int] = mapped_column(ForeignKey("rater.id", ondelete="CASCADE"), nullable=False)
     relevance_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     quality_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     comment: Mapped[str | None] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
 
     issue: Mapped["Issue"] = relationship(back_populates="ratings")
     rater: Mapped["Rater"] = relationship(back_populates="ratings")
@@ -88,20 +134,38 @@ class SubmitRating(Base):
     __tablename__ = "submit_rating"
     __table_args__ = (
         UniqueConstraint("submit_id", "rater_id", name="uq_submit_rater"),
+        Index("ix_submit_rating_rater", "rater_id"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     submit_id: Mapped[int] = mapped_column(ForeignKey("submit.id", ondelete="CASCADE"), nullable=False)
-    rater_id: Mapped[int] = mapped_column(ForeignKey("rater.id"), nullable=False)
+    rater_id: Mapped[int] = mapped_column(ForeignKey("rater.id", ondelete="CASCADE"), nullable=False)
     relevance_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     quality_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     comment: Mapped[str | None] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
 
     submit: Mapped["Submit"] = relationship()
     rater: Mapped["Rater"] = relationship(back_populates="submit_ratings")
 
 
+class SubmitRaterProgress(Base):
+    __tablename__ = "submit_rater_progress"
+    __table_args__ = (
+        Index("ix_submit_rater_progress_rater_state", "rater_id", "rating_state"),
+    )
+
+    submit_id: Mapped[int] = mapped_column(ForeignKey("submit.id", ondelete="CASCADE"), primary_key=True)
+    rater_id: Mapped[int] = mapped_column(ForeignKey("rater.id", ondelete="CASCADE"), primary_key=True)
+    total_issues: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    started_issues: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    fully_rated_issues: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    summary_started: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    summary_fully_rated: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    rating_state: Mapped[str] = mapped_column(String(32), nullable=False, default="not_rated")
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+
 class AIIssueRating(Base):
     __tablename__ = "ai_issue_rating"
     __table_args__ = (
@@ -113,7 +177,7 @@ class AIIssueRating(Base):
     relevance_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     quality_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     comment: Mapped[str | None] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
 
     issue: Mapped["Issue"] = relationship(back_populates="ai_ratings")
 
@@ -129,11 +193,22 @@ class AISubmitRating(Base):
     relevance_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     quality_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     comment: Mapped[str | None] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now())
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
 
     submit: Mapped["Submit"] = relationship()
 
 
+class PromptVersion(Base):
+    __tablename__ = "prompt_version"
+    __table_args__ = (
+        UniqueConstraint("prompt_path", "content_hash", name="uq_prompt_version"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    prompt_path: Mapped[str] = mapped_column(String(512), nullable=False)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
 
 
 class SourceTag(Base):
@@ -143,23 +218,110 @@ class SourceTag(Base):
     source_path: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
     tag: Mapped[str] = mapped_column(String(128), nullable=False)
 
+
+class SourceCatalogEntry(Base):
+    __tablename__ = "source_catalog"
+    __table_args__ = (
+        Index("ix_source_catalog_parent_sort", "parent_path", "sort_key"),
+        Index("ix_source_catalog_source_sort", "has_source", "sort_key"),
+        Index("ix_source_catalog_tag_sort", "tag", "sort_key"),
+    )
+
+    path: Mapped[str] = mapped_column(String(512), primary_key=True)
+    parent_path: Mapped[str] = mapped_column(String(512), nullable=False)
+    name: Mapped[str] = mapped_column(String(256), nullable=False)
+    # Compared bytewise: "C" collation on Postgres, SQLite's default BINARY elsewhere.
+    sort_key: Mapped[str] = mapped_column(
+        String(1024).with_variant(String(1024, collation="C"), "postgresql"), nullable=False
+    )
+    has_source: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    has_children: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    size: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    tag: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+
+class RatingRollup(Base):
+    __tablename__ = "rating_rollup"
+    __table_args__ = (
+        Index("ix_rating_rollup_source_bucket", "bucket_size", "rating_source", "bucket_start"),
+    )
+
+    bucket_size: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    rating_source: Mapped[str] = mapped_column(String(16), primary_key=True)
+    prompt_path: Mapped[str] = mapped_column(String(512), primary_key=True)
+    model: Mapped[str] = mapped_column(String(128), primary_key=True)
+    source_path: Mapped[str] = mapped_column(String(512), primary_key=True)
+    relevance_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    relevance_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    quality_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    quality_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    ratings_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_rated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
 class AnalysisJob(Base):
     __tablename__ = "analysis_job"
+    __table_args__ = (
+        Index("ix_analysis_job_status_updated", "status", "updated_at"),
+        Index("ix_analysis_job_updated", "updated_at", "id"),
+        Index("ix_analysis_job_submit", "submit_id"),
+        Index("ix_analysis_job_batch", "batch_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     job_id: Mapped[str] = mapped_column(String(128), nullable=False, unique=True)
     status: Mapped[str] = mapped_column(String(32), nullable=False, default="running")
+    stage: Mapped[str | None] = mapped_column(String(32), nullable=True)
     job_type: Mapped[str] = mapped_column(String(32), nullable=False)
     source_path: Mapped[str | None] = mapped_column(String(512), nullable=True)
     prompt_path: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    prompt_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     model: Mapped[str | None] = mapped_column(String(128), nullable=True)
     analysis_mode: Mapped[str] = mapped_column(String(32), nullable=False, default="chain_of_thought")
     openai_server: Mapped[str] = mapped_column(String(128), nullable=False, default="server-1")
-    submit_id: Mapped[int | None] = mapped_column(ForeignKey("submit.id"), nullable=True)
+    run_critiquer: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    created_by_id: Mapped[int | None] = mapped_column(ForeignKey("rater.id", ondelete="SET NULL"), nullable=True)
+    batch_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    submit_id: Mapped[int | None] = mapped_column(ForeignKey("submit.id", ondelete="SET NULL"), nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    progress_current: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    progress_total: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    input_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    output_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, default=datetime.now, onupdate=datetime.now
     )
 
     submit: Mapped["Submit"] = relationship()
+
+
+class Experiment(Base):
+    __tablename__ = "experiment"
+    __table_args__ = (
+        UniqueConstraint("batch_id", name="uq_experiment_batch"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(256), nullable=False)
+    batch_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    # JSON object with the `sources`, `prompt_paths`, `models`, `openai_servers` and `analysis_modes` of the grid.
+    grid: Mapped[str] = mapped_column(Text, nullable=False)
+    total_cells: Mapped[int] = mapped_column(Integer, nullable=False)
+    reused_cells: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_by_id: Mapped[int | None] = mapped_column(ForeignKey("rater.id", ondelete="SET NULL"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now)
+
+
+class ExperimentSubmit(Base):
+    __tablename__ = "experiment_submit"
+    __table_args__ = (
+        Index("ix_experiment_submit_submit", "submit_id"),
+    )
+
+    experiment_id: Mapped[int] = mapped_column(
+        ForeignKey("experiment.id", ondelete="CASCADE"), primary_key=True
+    )
+    submit_id: Mapped[int] = mapped_column(ForeignKey("submit.id", ondelete="CASCADE"), primary_key=True)
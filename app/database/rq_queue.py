@@ -1,3 +1,5 @@
+from typing import Literal
+
 from redis import Redis
 from rq import Queue
 
@@ -5,11 +7,21 @@ from app.settings import settings
 
 ANALYSIS_QUEUE = "analyzer"
 
+QueuePriority = Literal["interactive", "batch", "backfill"]
+
+# Queue of each priority, highest first. Interactive work keeps the original queue name, so jobs queued before the
+# split still run.
+ANALYSIS_QUEUES: dict[QueuePriority, str] = {
+    "interactive": ANALYSIS_QUEUE,
+    "batch": f"{ANALYSIS_QUEUE}:batch",
+    "backfill": f"{ANALYSIS_QUEUE}:backfill",
+}
+
 
 def get_redis_connection() -> Redis:
     return Redis.from_url(settings.redis_url)
 
 
-def get_analysis_queue() -> Queue:
+def get_analysis_queue(priority: QueuePriority = "interactive") -> Queue:
     redis_connection: Redis = get_redis_connection()
-    return Queue(name=ANALYSIS_QUEUE, connection=redis_connection)
+    return Queue(name=ANALYSIS_QUEUES[priority], connection=redis_connection)
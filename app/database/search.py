@@ -0,0 +1,59 @@
+from typing import Literal
+
+from sqlalchemy import column, select, table, text
+from sqlalchemy.orm import Session
+
+from app.database.models import Submit
+
+SearchMatch = Literal["contains", "prefix", "exact"]
+
+SUBMIT_SEARCH_COLUMNS = ("model", "source_path", "prompt_path")
+# Trigram indexes can only narrow down patterns with at least one full trigram.
+MIN_TRIGRAM_LENGTH = 3
+
+submit_search_table = table("submit_search", column("rowid"), column("submit_search"))
+
+_sqlite_search_enabled: bool | None = None
+
+
+def sqlite_search_enabled(session: Session) -> bool:
+    """Whether migration 0002 created the FTS5 table; SQLite builds without FTS5 fall back to plain scans."""
+    global _sqlite_search_enabled
+
+    if _sqlite_search_enabled is None:
+        _sqlite_search_enabled = session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'submit_search'")
+        ).first() is not None
+
+    return _sqlite_search_enabled
+
+
+def fts_phrase_query(column_name: str, value: str) -> str:
+    escaped_value = value.replace('"', '""')
+    return f'{column_name} : "{escaped_value}"'
+
+
+def submit_search_condition(session: Session, column_name: str, value: str, match: SearchMatch):
+    """Filter condition for one of `SUBMIT_SEARCH_COLUMNS` that can be answered from the search index."""
+    submit_column = getattr(Submit, column_name)
+
+    if match == "exact":
+        # Values picked from dropdowns hit the plain b-tree index.
+        return submit_column == value
+
+    if match == "prefix":
+        pattern_condition = submit_column.istartswith(value, autoescape=True)
+    else:
+        pattern_condition = submit_column.icontains(value, autoescape=True)
+
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "sqlite" and len(value) >= MIN_TRIGRAM_LENGTH and sqlite_search_enabled(session):
+        # The trigram index narrows candidates by substring, the ILIKE re-check keeps prefix semantics exact.
+        matching_ids = (
+            select(submit_search_table.c.rowid)
+            .where(submit_search_table.c.submit_search.op("MATCH")(fts_phrase_query(column_name, value)))
+        )
+        return Submit.id.in_(matching_ids) & pattern_condition
+
+    # Postgres answers ILIKE from the pg_trgm GIN indexes directly.
+    return pattern_condition
@@ -32,3 +32,4 @@ def configure_logging() -> None:
 
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("openai").setLevel(logging.WARNING)
+    logging.getLogger("watchfiles").setLevel(logging.WARNING)
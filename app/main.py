@@ -1,17 +1,41 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 
-from app.api.routes import sources, submits, prompts, ratings, auth, jobs, dashboard, raters, config
-from app.database.db import engine
-from app.database.models import Base
+from app.api.auth_activity import start_login_activity_flusher
+from app.api.auth_cache import start_auth_cache_listener
+from app.api.job_event_stream import start_job_event_listener
+from app.api.routes import sources, submits, prompts, ratings, auth, jobs, dashboard, raters, config, experiments
 from app.logging_config import configure_logging
 from app.settings import settings
+from app.utils.source_catalog import start_source_catalog
 
 configure_logging()
 
-Base.metadata.create_all(bind=engine)
+# Upper bound for writing the last buffered logins on shutdown.
+LOGIN_ACTIVITY_FLUSH_TIMEOUT_SECONDS = 10.0
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    source_catalog_stop_event = start_source_catalog(watch_changes=settings.source_catalog_watch)
+    auth_cache_stop_event = start_auth_cache_listener()
+    login_activity_stop_event, login_activity_thread = start_login_activity_flusher()
+    job_event_stop_event = start_job_event_listener()
+    yield
+    job_event_stop_event.set()
+    login_activity_stop_event.set()
+    # Joined off the event loop, so other apps' shutdown and in-flight responses are not blocked on the final flush.
+    await asyncio.to_thread(login_activity_thread.join, LOGIN_ACTIVITY_FLUSH_TIMEOUT_SECONDS)
+    auth_cache_stop_event.set()
+    source_catalog_stop_event.set()
+
 
-app = FastAPI(title="Code Analyzer Rating API")
+app = FastAPI(title="Code Analyzer Rating API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,7 +43,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
 
 app.include_router(sources.router)
 app.include_router(submits.router)
@@ -30,3 +56,4 @@ app.include_router(jobs.router)
 app.include_router(dashboard.router)
 app.include_router(raters.router)
 app.include_router(config.router)
+app.include_router(experiments.router)
@@ -23,6 +23,29 @@ class Settings:
     critiquer_model: str | None
     critiquer_openai_server: str | None
 
+    source_catalog_watch: bool
+
+    dashboard_cache_ttl_seconds: int
+
+    auth_cache_ttl_seconds: int
+    auth_cache_max_entries: int
+    login_activity_flush_seconds: float
+
+    job_log_max_lines: int
+    job_log_retention_seconds: int
+
+    job_artifacts_enabled: bool
+    job_artifacts_sample_rate: float
+
+    queue_weights: dict[str, int]
+
+    worker_mode: str
+    worker_async_concurrency: int
+    worker_min_processes: int
+    worker_max_processes: int
+    worker_scale_interval_seconds: float
+    worker_shutdown_timeout_seconds: float
+
     @staticmethod
     def load() -> "Settings":
         data_dir_raw: str = os.getenv("DATA_DIR", "data").strip()
@@ -40,6 +63,13 @@ class Settings:
         critiquer_model_raw: str = os.getenv("CRITIQUER_MODEL", "").strip()
         critiquer_openai_server_raw: str = os.getenv("CRITIQUER_OPENAI_SERVER", "").strip()
 
+        queue_weights_raw: str = os.getenv("QUEUE_WEIGHTS", "interactive=20,batch=4,backfill=1").strip()
+        queue_weights: dict[str, int] = {}
+        for entry in queue_weights_raw.split(","):
+            priority, _, weight = entry.partition("=")
+            if priority.strip():
+                queue_weights[priority.strip()] = max(int(weight.strip() or "1"), 1)
+
         return Settings(
             app_name=os.getenv("APP_NAME", "analyzer-backend").strip(),
             app_env=os.getenv("APP_ENV", "dev").strip(),
@@ -51,6 +81,29 @@ class Settings:
             cors_origins=cors_origins,
             critiquer_model=critiquer_model_raw or None,
             critiquer_openai_server=critiquer_openai_server_raw or None,
+
+            source_catalog_watch=os.getenv("SOURCE_CATALOG_WATCH", "true").strip().lower() in ("1", "true", "yes"),
+
+            dashboard_cache_ttl_seconds=int(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "600").strip()),
+
+            auth_cache_ttl_seconds=int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60").strip()),
+            auth_cache_max_entries=int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "1024").strip()),
+            login_activity_flush_seconds=float(os.getenv("LOGIN_ACTIVITY_FLUSH_SECONDS", "30").strip()),
+
+            job_log_max_lines=int(os.getenv("JOB_LOG_MAX_LINES", "10000").strip()),
+            job_log_retention_seconds=int(os.getenv("JOB_LOG_RETENTION_SECONDS", "3600").strip()),
+
+            job_artifacts_enabled=os.getenv("JOB_ARTIFACTS_ENABLED", "false").strip().lower() in ("1", "true", "yes"),
+            job_artifacts_sample_rate=float(os.getenv("JOB_ARTIFACTS_SAMPLE_RATE", "1.0").strip()),
+
+            queue_weights=queue_weights,
+
+            worker_mode=os.getenv("WORKER_MODE", "process").strip().lower(),
+            worker_async_concurrency=max(int(os.getenv("WORKER_ASYNC_CONCURRENCY", "32").strip()), 1),
+            worker_min_processes=max(int(os.getenv("WORKER_MIN_PROCESSES", "1").strip()), 1),
+            worker_max_processes=max(int(os.getenv("WORKER_MAX_PROCESSES", "4").strip()), 1),
+            worker_scale_interval_seconds=float(os.getenv("WORKER_SCALE_INTERVAL_SECONDS", "10").strip()),
+            worker_shutdown_timeout_seconds=float(os.getenv("WORKER_SHUTDOWN_TIMEOUT_SECONDS", "1800").strip()),
         )
 
 
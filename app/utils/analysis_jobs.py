@@ -0,0 +1,173 @@
+"""Creating analysis jobs.
+
+Every route that starts an analysis goes through `enqueue_analysis_jobs`. The `analysis_job` rows are inserted with
+one statement and committed first, then all RQ jobs are pushed with `enqueue_many` in a single Redis pipeline, so a
+worker never picks up a job whose row does not exist yet and a batch of 500 sources costs one round trip to each
+store. Jobs created together share a batch id that can be tracked as one unit, and go to the queue of the priority
+their route asks for. A spec whose analysis is already queued or running for the same rater, with the same options, is
+attached to that job instead of creating another (see `app.utils.job_coalescing`).
+"""
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from redis.exceptions import RedisError
+from rq import Queue
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.analyzer.servers import get_default_openai_server_id
+from app.database.models import AnalysisJob
+from app.database.rq_queue import QueuePriority, get_analysis_queue
+from app.utils.job_coalescing import analysis_lock_key, claim_job_locks, release_job_locks
+from app.utils.job_events import publish_created_jobs
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_JOB_FUNCTION = "app.analyzer.analyze_job.run_submit_analysis"
+ANALYSIS_JOB_TIMEOUT = 1800
+# Batch requests up to this size are small enough to be served as interactive work.
+INTERACTIVE_BATCH_MAX_JOBS = 5
+
+
+@dataclass(frozen=True)
+class AnalysisJobSpec:
+    source_path: str
+    prompt_path: str
+    prompt_hash: str | None
+    model: str
+    analysis_mode: str
+    openai_server: str
+    run_critiquer: bool = True
+    resume_from_job_id: str | None = None
+
+
+def new_batch_id() -> str:
+    return uuid.uuid4().hex
+
+
+def enqueue_analysis_jobs(
+        session: Session,
+        specs: list[AnalysisJobSpec],
+        job_type: str,
+        rater_id: int,
+        batch_id: str | None = None,
+        priority: QueuePriority = "interactive",
+) -> list[str]:
+    """Create one job per spec, owned by `rater_id`, and return their job ids in the order of `specs`.
+
+    Specs whose analysis is already in flight get the id of that job and create nothing. Commits `session`. If Redis
+    rejects the jobs, their rows are marked failed and the error is raised.
+    """
+    if not specs:
+        session.commit()
+        return []
+
+    analysis_queue = get_analysis_queue(priority)
+    default_openai_server = get_default_openai_server_id()
+    spec_job_ids = [str(uuid.uuid4()) for _ in specs]
+    lock_keys = [
+        analysis_lock_key(
+            spec.source_path,
+            spec.prompt_path,
+            spec.prompt_hash,
+            spec.model,
+            spec.analysis_mode,
+            spec.openai_server or default_openai_server,
+            spec.run_critiquer,
+            rater_id,
+        )
+        for spec in specs
+    ]
+    holders = claim_job_locks(analysis_queue.connection, lock_keys, spec_job_ids)
+    result_job_ids = [holder or job_id for holder, job_id in zip(holders, spec_job_ids)]
+
+    attached_count = sum(holder is not None for holder in holders)
+    if attached_count:
+        logger.info("Attached %d of %d analyses to jobs already in flight", attached_count, len(specs))
+
+    new_specs = [spec for spec, holder in zip(specs, holders) if holder is None]
+    job_ids = [job_id for job_id, holder in zip(spec_job_ids, holders) if holder is None]
+    new_lock_keys = [lock_key for lock_key, holder in zip(lock_keys, holders) if holder is None]
+    if not new_specs:
+        session.commit()
+        return result_job_ids
+
+    now = datetime.now()
+    rows: list[dict[str, Any]] = [
+        {
+            "job_id": job_id,
+            "status": "running",
+            "job_type": job_type,
+            "source_path": spec.source_path,
+            "prompt_path": spec.prompt_path,
+            "prompt_hash": spec.prompt_hash,
+            "model": spec.model,
+            "analysis_mode": spec.analysis_mode,
+            "openai_server": spec.openai_server,
+            "run_critiquer": spec.run_critiquer,
+            "created_by_id": rater_id,
+            "batch_id": batch_id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for spec, job_id in zip(new_specs, job_ids)
+    ]
+    try:
+        row_ids = session.execute(
+            insert(AnalysisJob).returning(AnalysisJob.id, sort_by_parameter_order=True),
+            rows,
+        ).scalars().all()
+        session.commit()
+    except Exception:
+        release_job_locks(analysis_queue.connection, new_lock_keys, job_ids)
+        raise
+
+    job_datas = [
+        Queue.prepare_data(
+            ANALYSIS_JOB_FUNCTION,
+            args=(spec.source_path, spec.prompt_path, spec.model, rater_id),
+            kwargs=analysis_job_kwargs(spec),
+            timeout=ANALYSIS_JOB_TIMEOUT,
+            job_id=job_id,
+        )
+        for spec, job_id in zip(new_specs, job_ids)
+    ]
+
+    try:
+        with analysis_queue.connection.pipeline() as pipeline:
+            analysis_queue.enqueue_many(job_datas, pipeline=pipeline)
+            pipeline.execute()
+    except RedisError:
+        logger.exception("Failed to enqueue %d analysis jobs", len(job_ids))
+        session.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.job_id.in_(job_ids))
+            .values(status="failed", error="Failed to enqueue the job", updated_at=datetime.now())
+        )
+        session.commit()
+        release_job_locks(analysis_queue.connection, new_lock_keys, job_ids)
+        raise
+
+    publish_created_jobs([{**row, "id": row_id} for row, row_id in zip(rows, row_ids)])
+    return result_job_ids
+
+
+def batch_priority(job_count: int) -> QueuePriority:
+    return "interactive" if job_count <= INTERACTIVE_BATCH_MAX_JOBS else "batch"
+
+
+def analysis_job_kwargs(spec: AnalysisJobSpec) -> dict[str, Any]:
+    kwargs: dict[str, Any] = {
+        "published": False,
+        "analysis_mode": spec.analysis_mode,
+        "openai_server": spec.openai_server,
+        "run_critiquer": spec.run_critiquer,
+        "prompt_hash": spec.prompt_hash,
+    }
+    if spec.resume_from_job_id:
+        kwargs["resume_from_job_id"] = spec.resume_from_job_id
+
+    return kwargs
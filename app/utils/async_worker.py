@@ -0,0 +1,108 @@
+"""Asyncio worker that runs many analysis jobs at once in one process.
+
+Analysis jobs spend nearly all their time waiting on LLM servers, so a process can serve many of them. The asyncio
+worker takes jobs from the same weighted queues as the RQ worker and runs up to `WORKER_ASYNC_CONCURRENCY` at a time,
+each through `asyncio.to_thread`: the analyzer, its OpenAI client and the database sessions are synchronous. Every
+concurrency slot is an in-process RQ worker, so jobs go through the usual started, finished and failed registries,
+and a slot's job timeout is enforced with a timer instead of SIGALRM, which only works on the main thread.
+"""
+import asyncio
+import logging
+import signal
+from concurrent.futures import ThreadPoolExecutor
+
+from redis import Redis
+from rq import Queue, SimpleWorker
+from rq.job import Job
+from rq.timeouts import TimerDeathPenalty
+
+from app.database.db import resize_connection_pool
+from app.database.rq_queue import ANALYSIS_QUEUES
+from app.utils.job_queues import WeightedWorker
+
+logger = logging.getLogger(__name__)
+
+# How long the dispatcher blocks on Redis for the next job before checking for shutdown.
+DEQUEUE_TIMEOUT_SECONDS = 1
+# An analysis holds two sessions at once: one for its results and one for its job row.
+DATABASE_CONNECTIONS_PER_JOB = 2
+
+
+class JobSlotWorker(WeightedWorker, SimpleWorker):
+    """Runs one job at a time in the calling thread."""
+
+    death_penalty_class = TimerDeathPenalty
+
+
+async def run_job(slot: JobSlotWorker, job: Job, queue: Queue, idle_slots: asyncio.Queue) -> None:
+    try:
+        await asyncio.to_thread(slot.execute_job, job, queue)
+    except Exception:
+        logger.exception("Worker slot %s failed to run job '%s'", slot.name, job.id)
+    finally:
+        idle_slots.put_nowait(slot)
+
+
+async def dispatch_jobs(
+        dispatcher: WeightedWorker,
+        slots: list[JobSlotWorker],
+        stop_event: asyncio.Event,
+) -> None:
+    idle_slots: asyncio.Queue[JobSlotWorker] = asyncio.Queue()
+    for slot in slots:
+        idle_slots.put_nowait(slot)
+
+    running: set[asyncio.Task] = set()
+    while not stop_event.is_set():
+        slot = await idle_slots.get()
+        if stop_event.is_set():
+            break
+
+        result = await asyncio.to_thread(
+            dispatcher.dequeue_job_and_maintain_ttl,
+            DEQUEUE_TIMEOUT_SECONDS,
+            DEQUEUE_TIMEOUT_SECONDS,
+        )
+        if result is None:
+            idle_slots.put_nowait(slot)
+            continue
+
+        job, queue = result
+        task = asyncio.create_task(run_job(slot, job, queue, idle_slots))
+        running.add(task)
+        task.add_done_callback(running.discard)
+
+    if running:
+        logger.info("Waiting for %d running jobs to finish", len(running))
+        await asyncio.gather(*running)
+
+
+async def work_async(redis_connection: Redis, concurrency: int) -> None:
+    # The default pool would make jobs beyond its size wait for a connection and fail with a pool timeout.
+    resize_connection_pool(concurrency * DATABASE_CONNECTIONS_PER_JOB)
+
+    queue_names = list(ANALYSIS_QUEUES.values())
+    dispatcher = WeightedWorker(queue_names, connection=redis_connection)
+    slots = [
+        JobSlotWorker(queue_names, connection=redis_connection, name=f"{dispatcher.name}-{index}")
+        for index in range(concurrency)
+    ]
+
+    loop = asyncio.get_running_loop()
+    # One thread per slot plus one for the dispatcher's blocking dequeue.
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency + 1, thread_name_prefix="analysis-job"))
+
+    stop_event = asyncio.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop_event.set)
+
+    for worker in (dispatcher, *slots):
+        worker.register_birth()
+    logger.info("Asyncio worker %s started with %d slots", dispatcher.name, concurrency)
+
+    try:
+        await dispatch_jobs(dispatcher, slots, stop_event)
+    finally:
+        for worker in (dispatcher, *slots):
+            worker.register_death()
+        logger.info("Asyncio worker %s stopped", dispatcher.name)
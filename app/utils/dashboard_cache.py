@@ -0,0 +1,91 @@
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Callable
+
+from redis import Redis
+from redis.exceptions import LockError, RedisError
+
+from app.database.rq_queue import get_redis_connection
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_VERSION_KEY = "dashboard:version"
+DASHBOARD_STATS_KEY_PREFIX = "dashboard:stats"
+
+# How long a request that lost the recompute race waits for the winner before computing on its own.
+DASHBOARD_LOCK_WAIT_SECONDS = 15.0
+DASHBOARD_LOCK_POLL_SECONDS = 0.1
+DASHBOARD_LOCK_TIMEOUT_SECONDS = 60
+
+
+def bump_dashboard_version() -> None:
+    """Invalidate every cached dashboard response. Call after committing a write that changes dashboard numbers."""
+    try:
+        get_redis_connection().incr(DASHBOARD_VERSION_KEY)
+    except RedisError as exc:
+        logger.warning("Failed to invalidate dashboard cache: %s", exc)
+
+
+def dashboard_cache_key(version: int, parameters: dict) -> str:
+    parameters_hash = hashlib.sha1(json.dumps(parameters, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{DASHBOARD_STATS_KEY_PREFIX}:{version}:{parameters_hash}"
+
+
+def read_cached_entry(redis_connection: Redis, cache_key: str) -> tuple[dict, float] | None:
+    cached_raw = redis_connection.get(cache_key)
+    if cached_raw is None:
+        return None
+
+    cached = json.loads(cached_raw)
+    return cached["payload"], cached["computed_at"]
+
+
+def get_or_compute_dashboard(parameters: dict, compute: Callable[[], dict]) -> tuple[dict, float]:
+    """Return `(payload, computed_at)` for `parameters`, recomputing at most once per version across API processes."""
+    try:
+        redis_connection = get_redis_connection()
+        version = int(redis_connection.get(DASHBOARD_VERSION_KEY) or 0)
+        cache_key = dashboard_cache_key(version, parameters)
+
+        cached = read_cached_entry(redis_connection, cache_key)
+        if cached is not None:
+            return cached
+
+        lock = redis_connection.lock(f"{cache_key}:lock", timeout=DASHBOARD_LOCK_TIMEOUT_SECONDS)
+        if not lock.acquire(blocking=False):
+            deadline = time.monotonic() + DASHBOARD_LOCK_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(DASHBOARD_LOCK_POLL_SECONDS)
+                cached = read_cached_entry(redis_connection, cache_key)
+                if cached is not None:
+                    return cached
+                if not redis_connection.exists(f"{cache_key}:lock"):
+                    break
+
+            computed_at = time.time()
+            return compute(), computed_at
+    except RedisError as exc:
+        logger.warning("Dashboard cache unavailable, computing without it: %s", exc)
+        computed_at = time.time()
+        return compute(), computed_at
+
+    try:
+        computed_at = time.time()
+        payload = compute()
+        redis_connection.set(
+            cache_key,
+            json.dumps({"payload": payload, "computed_at": computed_at}),
+            ex=settings.dashboard_cache_ttl_seconds,
+        )
+        return payload, computed_at
+    except RedisError as exc:
+        logger.warning("Failed to store dashboard cache entry: %s", exc)
+        return payload, computed_at
+    finally:
+        try:
+            lock.release()
+        except (LockError, RedisError):
+            pass
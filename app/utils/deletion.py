@@ -0,0 +1,135 @@
+"""Set-based deletion of submits and everything that hangs off them.
+
+Issues, issue ratings, AI ratings and rater progress go away through `ON DELETE CASCADE`, and analysis jobs keep
+their row with `submit_id` set to NULL, so deleting a batch of submits is one `DELETE` after the rating rollups are
+retracted. Deletions that would touch many submits run as a background job that reports progress on its
+`analysis_job` row and as job events.
+"""
+import logging
+from collections.abc import Callable
+
+from rq import get_current_job
+from sqlalchemy import ColumnElement, delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.database.db import SessionLocal
+from app.database.models import AnalysisJob, PromptVersion, Submit
+from app.utils.dashboard_cache import bump_dashboard_version
+from app.utils.files import PROMPTS_ROOT, safe_join
+from app.utils.job_events import update_job
+from app.utils.prompt_registry import invalidate_prompt_cache
+from app.utils.rating_rollups import retract_submit_ratings
+
+logger = logging.getLogger(__name__)
+
+DELETE_BATCH_SIZE = 500
+# Requests deleting at least this many submits hand the work to the worker instead of blocking.
+BACKGROUND_DELETE_MIN_SUBMITS = 1000
+PROMPT_DELETE_JOB_TYPE = "prompt_delete"
+
+
+def delete_submits(session: Session, submit_ids: list[int]) -> int:
+    """Delete submits by id in the caller's transaction. Returns the number of deleted submits."""
+    if not submit_ids:
+        return 0
+
+    retract_submit_ratings(session, submit_ids)
+    return session.execute(delete(Submit).where(Submit.id.in_(submit_ids))).rowcount
+
+
+def count_submits(session: Session, *conditions: ColumnElement[bool]) -> int:
+    return session.execute(select(func.count(Submit.id)).where(*conditions)).scalar_one()
+
+
+def delete_submits_where(
+        session: Session,
+        *conditions: ColumnElement[bool],
+        commit_batches: bool = False,
+        on_batch: Callable[[int], None] | None = None,
+) -> int:
+    """Delete matching submits in batches of `DELETE_BATCH_SIZE`.
+
+    With `commit_batches`, every batch is committed on its own so long deletions release locks between batches;
+    `on_batch(deleted_so_far)` runs before each commit.
+    """
+    deleted_count = 0
+
+    while True:
+        submit_ids = list(session.scalars(select(Submit.id).where(*conditions).limit(DELETE_BATCH_SIZE)))
+        if not submit_ids:
+            return deleted_count
+
+        deleted_count += delete_submits(session, submit_ids)
+        if on_batch is not None:
+            on_batch(deleted_count)
+        if commit_batches:
+            session.commit()
+            bump_dashboard_version()
+
+
+def delete_prompt_records(session: Session, prompt_path: str) -> int:
+    """Delete a prompt's submits, analysis jobs and versions in the caller's transaction."""
+    deleted_count = delete_submits_where(session, Submit.prompt_path == prompt_path)
+    session.execute(
+        delete(AnalysisJob)
+        .where(AnalysisJob.prompt_path == prompt_path)
+        .where(AnalysisJob.job_type != PROMPT_DELETE_JOB_TYPE)
+    )
+    session.execute(delete(PromptVersion).where(PromptVersion.prompt_path == prompt_path))
+    return deleted_count
+
+
+def delete_prompt_file(prompt_path: str) -> None:
+    safe_join(PROMPTS_ROOT, f"{prompt_path}.txt").unlink(missing_ok=True)
+    invalidate_prompt_cache(prompt_path)
+
+
+def run_prompt_deletion(prompt_path: str) -> None:
+    """Background job: delete a prompt's submits batch by batch, then its jobs and versions, and last its file."""
+    session: Session = SessionLocal()
+
+    job = get_current_job()
+    job_id = job.id if job else None
+
+    def record_progress(deleted_count: int) -> None:
+        # Commits the batch together with its progress. The API commits the job row right after enqueueing, so the
+        # first batches may not find it.
+        update_job(session, job_id, progress_current=deleted_count)
+
+    try:
+        deleted_count = delete_submits_where(
+            session,
+            Submit.prompt_path == prompt_path,
+            commit_batches=True,
+            on_batch=record_progress,
+        )
+        delete_prompt_records(session, prompt_path)
+
+        progress_total = session.execute(
+            select(AnalysisJob.progress_total).where(AnalysisJob.job_id == job_id)
+        ).scalar_one_or_none()
+        update_job(
+            session,
+            job_id,
+            status="succeeded",
+            progress_current=deleted_count,
+            progress_total=max(progress_total or 0, deleted_count),
+        )
+        # The prompt stays listed, and its file in place, until everything recorded for it is gone.
+        delete_prompt_file(prompt_path)
+        bump_dashboard_version()
+
+        logger.info("Deleted %d submits of prompt '%s'", deleted_count, prompt_path)
+    except Exception as exc:
+        logger.exception("Failed to delete submits of prompt '%s'", prompt_path)
+        session.rollback()
+
+        try:
+            update_job(session, job_id, status="failed", error=str(exc) or "Prompt deletion failed")
+        except SQLAlchemyError:
+            logger.exception("Failed to record failure of job '%s'", job_id)
+            session.rollback()
+        raise
+    finally:
+        session.close()
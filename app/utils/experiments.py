@@ -0,0 +1,198 @@
+"""Experiments: grids of sources × prompts × models × servers × analysis modes.
+
+Creating an experiment expands its grid into cells. A cell that already has a submit made from the current version of
+its prompt is reused instead of run again; the other cells are enqueued as one batch, ordered by server and model so
+that jobs sharing a model sit next to each other in the queue and run together. Progress and token totals are read
+from the batch's jobs.
+"""
+import json
+from dataclasses import asdict, dataclass, field
+from itertools import product
+
+from sqlalchemy import Select, func, insert, select, union
+from sqlalchemy.orm import Session
+
+from app.database.models import AnalysisJob, Experiment, ExperimentSubmit, Submit
+from app.database.rq_queue import QueuePriority
+from app.utils.analysis_jobs import AnalysisJobSpec, enqueue_analysis_jobs, new_batch_id
+
+EXPERIMENT_JOB_TYPE = "experiment"
+
+CellKey = tuple[str, str, str, str, str]
+
+
+@dataclass(frozen=True)
+class ExperimentGrid:
+    sources: list[str]
+    prompt_paths: list[str]
+    models: list[str]
+    openai_servers: list[str]
+    analysis_modes: list[str]
+
+    @property
+    def cell_count(self) -> int:
+        return (
+            len(self.sources)
+            * len(self.prompt_paths)
+            * len(self.models)
+            * len(self.openai_servers)
+            * len(self.analysis_modes)
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, value: str) -> "ExperimentGrid":
+        return cls(**json.loads(value))
+
+
+@dataclass
+class ExperimentProgress:
+    status_counts: dict[str, int] = field(default_factory=dict)
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+def cell_key(source_path: str, prompt_path: str, model: str, analysis_mode: str, openai_server: str) -> CellKey:
+    return source_path, prompt_path, model, analysis_mode, openai_server
+
+
+def expand_experiment_grid(
+        grid: ExperimentGrid,
+        prompt_hashes: dict[str, str],
+        run_critiquer: bool = True,
+) -> list[AnalysisJobSpec]:
+    """One spec per cell, ordered by server, model, mode, prompt and source."""
+    return [
+        AnalysisJobSpec(
+            source_path=source_path,
+            prompt_path=prompt_path,
+            prompt_hash=prompt_hashes[prompt_path],
+            model=model,
+            analysis_mode=analysis_mode,
+            openai_server=openai_server,
+            run_critiquer=run_critiquer,
+        )
+        for openai_server, model, analysis_mode, prompt_path, source_path in product(
+            grid.openai_servers, grid.models, grid.analysis_modes, grid.prompt_paths, grid.sources
+        )
+    ]
+
+
+def find_reusable_submits(session: Session, specs: list[AnalysisJobSpec]) -> dict[CellKey, int]:
+    """Latest submit of each cell that was made from the spec's prompt version."""
+    wanted = {
+        cell_key(spec.source_path, spec.prompt_path, spec.model, spec.analysis_mode, spec.openai_server):
+            spec.prompt_hash
+        for spec in specs
+    }
+    rows = session.execute(
+        select(
+            Submit.id,
+            Submit.source_path,
+            Submit.prompt_path,
+            Submit.model,
+            Submit.analysis_mode,
+            Submit.openai_server,
+            Submit.prompt_hash,
+        )
+        .where(
+            Submit.prompt_path.in_({spec.prompt_path for spec in specs}),
+            Submit.model.in_({spec.model for spec in specs}),
+        )
+        .order_by(Submit.created_at, Submit.id)
+    )
+
+    reusable: dict[CellKey, int] = {}
+    for submit_id, source_path, prompt_path, model, analysis_mode, openai_server, prompt_hash in rows:
+        key = cell_key(source_path, prompt_path, model, analysis_mode, openai_server)
+        if key in wanted and prompt_hash is not None and wanted[key] == prompt_hash:
+            reusable[key] = submit_id
+
+    return reusable
+
+
+def create_experiment(
+        session: Session,
+        name: str,
+        grid: ExperimentGrid,
+        prompt_hashes: dict[str, str],
+        rater_id: int,
+        run_critiquer: bool = True,
+        priority: QueuePriority = "batch",
+) -> Experiment:
+    """Record the experiment, link the submits it reuses and enqueue its other cells. Commits `session`."""
+    specs = expand_experiment_grid(grid, prompt_hashes, run_critiquer)
+    reusable = find_reusable_submits(session, specs)
+    pending_specs = [
+        spec
+        for spec in specs
+        if cell_key(spec.source_path, spec.prompt_path, spec.model, spec.analysis_mode, spec.openai_server)
+        not in reusable
+    ]
+
+    experiment = Experiment(
+        name=name,
+        batch_id=new_batch_id(),
+        grid=grid.to_json(),
+        total_cells=len(specs),
+        reused_cells=len(reusable),
+        created_by_id=rater_id,
+    )
+    session.add(experiment)
+    session.flush()
+
+    if reusable:
+        session.execute(
+            insert(ExperimentSubmit),
+            [{"experiment_id": experiment.id, "submit_id": submit_id} for submit_id in reusable.values()],
+        )
+
+    # Commits the experiment together with its jobs.
+    enqueue_analysis_jobs(
+        session,
+        pending_specs,
+        job_type=EXPERIMENT_JOB_TYPE,
+        rater_id=rater_id,
+        batch_id=experiment.batch_id,
+        priority=priority,
+    )
+    return experiment
+
+
+def load_experiment_progress(session: Session, batch_ids: list[str]) -> dict[str, ExperimentProgress]:
+    """Job status counts and token totals of each batch, with one grouped query."""
+    progress = {batch_id: ExperimentProgress() for batch_id in batch_ids}
+    if not batch_ids:
+        return progress
+
+    rows = session.execute(
+        select(
+            AnalysisJob.batch_id,
+            AnalysisJob.status,
+            func.count(AnalysisJob.id),
+            func.coalesce(func.sum(AnalysisJob.input_tokens), 0),
+            func.coalesce(func.sum(AnalysisJob.output_tokens), 0),
+        )
+        .where(AnalysisJob.batch_id.in_(batch_ids))
+        .group_by(AnalysisJob.batch_id, AnalysisJob.status)
+    )
+    for batch_id, status, job_count, input_tokens, output_tokens in rows:
+        batch_progress = progress[batch_id]
+        batch_progress.status_counts[status] = job_count
+        batch_progress.input_tokens += input_tokens
+        batch_progress.output_tokens += output_tokens
+
+    return progress
+
+
+def experiment_submit_ids(experiment_id: int) -> Select:
+    """Submits of an experiment: those its jobs produced and those it reused."""
+    produced = (
+        select(AnalysisJob.submit_id)
+        .join(Experiment, Experiment.batch_id == AnalysisJob.batch_id)
+        .where(Experiment.id == experiment_id, AnalysisJob.submit_id.is_not(None))
+    )
+    reused = select(ExperimentSubmit.submit_id).where(ExperimentSubmit.experiment_id == experiment_id)
+    return select(union(produced, reused).subquery().c.submit_id)
@@ -1,11 +1,29 @@
-import zipfile
+import gzip
+import hashlib
 import json
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
 
 DATA_ROOT: Path = Path("data").resolve()
 PROMPTS_ROOT: Path = (DATA_ROOT / "prompts").resolve()
 SOURCES_ROOT: Path = (DATA_ROOT / "sources").resolve()
 JOBS_ROOT: Path = (DATA_ROOT / "jobs").resolve()
+SOURCE_BUNDLES_ROOT: Path = (DATA_ROOT / "cache" / "bundles").resolve()
+
+# Source path -> (stat signature, content hash). Lets repeated viewers skip re-hashing an unchanged archive.
+SOURCE_HASH_CACHE_MAX_ENTRIES = 4096
+_source_hash_cache: OrderedDict[str, tuple[tuple, str]] = OrderedDict()
+_source_hash_cache_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class SourceBundle:
+    content_hash: str
+    path: Path
 
 
 def safe_join(root: Path, relative_path: str) -> Path:
@@ -54,6 +72,101 @@ def find_source_files_or_extract(submit_source_path: str) -> dict[str, str]:
     return files
 
 
+def source_content_signature(source_root: Path) -> tuple:
+    signature: list[tuple[str, int, int]] = []
+
+    for name in ("src.zip", "comments.json"):
+        path: Path = source_root / name
+        if path.exists() and path.is_file():
+            stat = path.stat()
+            signature.append((name, stat.st_mtime_ns, stat.st_size))
+
+    extracted_source_root: Path = source_root / "src"
+    if not (source_root / "src.zip").exists() and extracted_source_root.exists():
+        for path in sorted(extracted_source_root.rglob("*")):
+            if path.is_file():
+                stat = path.stat()
+                signature.append((path.relative_to(source_root).as_posix(), stat.st_mtime_ns, stat.st_size))
+
+    return tuple(signature)
+
+
+def source_content_hash(submit_source_path: str) -> str:
+    source_root: Path = safe_join(SOURCES_ROOT, submit_source_path)
+    signature: tuple = source_content_signature(source_root)
+
+    with _source_hash_cache_lock:
+        cached = _source_hash_cache.get(submit_source_path)
+        if cached is not None and cached[0] == signature:
+            _source_hash_cache.move_to_end(submit_source_path)
+            return cached[1]
+
+    digest = hashlib.sha256()
+    digest.update(submit_source_path.encode("utf-8"))
+
+    for name, _, _ in signature:
+        digest.update(b"\0" + name.encode("utf-8") + b"\0")
+        with (source_root / name).open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+    content_hash: str = digest.hexdigest()
+    with _source_hash_cache_lock:
+        _source_hash_cache[submit_source_path] = (signature, content_hash)
+        _source_hash_cache.move_to_end(submit_source_path)
+        while len(_source_hash_cache) > SOURCE_HASH_CACHE_MAX_ENTRIES:
+            _source_hash_cache.popitem(last=False)
+    return content_hash
+
+
+def files_content_hash(files: dict[str, str]) -> str:
+    digest = hashlib.sha256()
+    for name, content in sorted(files.items()):
+        digest.update(b"\0" + name.encode("utf-8") + b"\0")
+        digest.update(content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def source_bundle_directory(submit_source_path: str) -> Path:
+    """Each source keeps its bundles in its own directory, so a rebuilt bundle can replace the previous one."""
+    return SOURCE_BUNDLES_ROOT / hashlib.sha256(submit_source_path.encode("utf-8")).hexdigest()
+
+
+def load_source_bundle(submit_source_path: str) -> SourceBundle:
+    """Return the gzip-compressed `SourceFilesResponse` body for a source, building it on first use."""
+    content_hash: str = source_content_hash(submit_source_path)
+    bundle_directory: Path = source_bundle_directory(submit_source_path)
+    bundle_path: Path = bundle_directory / f"{content_hash}.json.gz"
+
+    if not bundle_path.exists():
+        payload = {
+            "source_path": submit_source_path,
+            "files": find_source_files_or_extract(submit_source_path),
+            "comments": find_source_comments(submit_source_path),
+        }
+        raw_payload: bytes = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        bundle_directory.mkdir(parents=True, exist_ok=True)
+        temporary_path: Path = bundle_path.with_name(f"{bundle_path.name}.{os.getpid()}.tmp")
+        temporary_path.write_bytes(gzip.compress(raw_payload, compresslevel=9))
+        temporary_path.replace(bundle_path)
+
+        # Bundles of earlier contents of the source are never served again.
+        for previous_bundle_path in bundle_directory.glob("*.json.gz"):
+            if previous_bundle_path != bundle_path:
+                previous_bundle_path.unlink(missing_ok=True)
+
+    return SourceBundle(content_hash=content_hash, path=bundle_path)
+
+
+def read_source_bundle(bundle: SourceBundle) -> dict:
+    return json.loads(gzip.decompress(bundle.path.read_bytes()))
+
+
+def load_source_files(submit_source_path: str) -> dict[str, str]:
+    return read_source_bundle(load_source_bundle(submit_source_path))["files"]
+
+
 def find_source_comments(submit_source_path: str) -> list[dict[str, str | int | None]]:
     source_root: Path = safe_join(SOURCES_ROOT, submit_source_path)
     comments_path: Path = source_root / "comments.json"
@@ -94,37 +207,24 @@ def find_source_comments(submit_source_path: str) -> list[dict[str, str | int |
 
 
 
-def save_job_error_log(job_id: str, error_log: str) -> Path:
-    jobs_root: Path = JOBS_ROOT
-    jobs_root.mkdir(parents=True, exist_ok=True)
-
+def job_log_path(job_id: str) -> Path:
     safe_job_id = Path(job_id).name
     if safe_job_id != job_id:
         raise ValueError("Invalid job id")
 
-    log_file_path = safe_join(jobs_root, f"{safe_job_id}.txt")
+    return safe_join(JOBS_ROOT, f"{safe_job_id}.txt")
+
+
+def save_job_error_log(job_id: str, error_log: str) -> Path:
+    log_file_path = job_log_path(job_id)
+    log_file_path.parent.mkdir(parents=True, exist_ok=True)
     log_file_path.write_text(error_log, encoding="utf-8")
     return log_file_path
 
 
 def load_job_error_log(job_id: str) -> str | None:
-    jobs_root: Path = JOBS_ROOT
-
-    safe_job_id = Path(job_id).name
-    if safe_job_id != job_id:
-        raise ValueError("Invalid job id")
-
-    log_file_path = safe_join(jobs_root, f"{safe_job_id}.txt")
+    log_file_path = job_log_path(job_id)
     if not log_file_path.exists() or not log_file_path.is_file():
         return None
 
     return log_file_path.read_text(encoding="utf-8", errors="replace")
-
-
-def find_prompt_file(prompt_path: str) -> str:
-    prompt_path: Path = safe_join(PROMPTS_ROOT, f"{prompt_path}.txt")
-
-    if not prompt_path.exists() or not prompt_path.is_file():
-        raise FileNotFoundError(f"Prompt file at '{prompt_path}' not found")
-
-    return prompt_path.read_text(encoding="utf-8", errors="replace")
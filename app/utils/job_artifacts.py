@@ -0,0 +1,89 @@
+"""Per-job artifacts: the prompts sent to the models and their raw responses.
+
+Each LLM call of a recorded job is saved as `data/jobs/<job id>/artifacts/<name>.json.gz`. Recording is switched on
+with `JOB_ARTIFACTS_ENABLED` and sampled per job with `JOB_ARTIFACTS_SAMPLE_RATE`, so a job is either recorded
+completely or not at all. Logs only carry artifact names.
+"""
+import gzip
+import json
+import logging
+import random
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from app.settings import settings
+from app.utils.files import JOBS_ROOT, safe_join
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_SUFFIX = ".json.gz"
+ARTIFACT_NAME_PATTERN = re.compile(r"^[a-z0-9_-]{1,64}$")
+
+
+@dataclass(frozen=True)
+class JobArtifact:
+    name: str
+    size: int
+    created_at: datetime
+
+
+def job_artifacts_dir(job_id: str) -> Path:
+    safe_job_id = Path(job_id).name
+    if safe_job_id != job_id:
+        raise ValueError("Invalid job id")
+
+    return safe_join(JOBS_ROOT, f"{safe_job_id}/artifacts")
+
+
+def job_artifact_path(job_id: str, name: str) -> Path:
+    if not ARTIFACT_NAME_PATTERN.match(name):
+        raise ValueError("Invalid artifact name")
+
+    return job_artifacts_dir(job_id) / f"{name}{ARTIFACT_SUFFIX}"
+
+
+class JobArtifactStore:
+    def __init__(self, job_id: str | None) -> None:
+        self.job_id = job_id
+        self.enabled = (
+            job_id is not None
+            and settings.job_artifacts_enabled
+            and random.random() < settings.job_artifacts_sample_rate
+        )
+
+    def save(self, name: str, payload: dict[str, Any]) -> str | None:
+        """Store a payload and return its reference for logging; None when this job is not recorded."""
+        if not self.enabled:
+            return None
+
+        try:
+            artifact_path = job_artifact_path(self.job_id, name)
+            artifact_path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(artifact_path, "wt", encoding="utf-8", compresslevel=6) as artifact_file:
+                json.dump(payload, artifact_file, ensure_ascii=False)
+        except (OSError, ValueError, TypeError):
+            logger.exception("Failed to store artifact '%s' of job '%s'", name, self.job_id)
+            return None
+
+        return f"{self.job_id}/{name}"
+
+
+def list_job_artifacts(job_id: str) -> list[JobArtifact]:
+    artifacts_dir = job_artifacts_dir(job_id)
+    if not artifacts_dir.is_dir():
+        return []
+
+    artifacts: list[JobArtifact] = []
+    for artifact_path in sorted(artifacts_dir.glob(f"*{ARTIFACT_SUFFIX}")):
+        stat = artifact_path.stat()
+        artifacts.append(JobArtifact(
+            name=artifact_path.name.removesuffix(ARTIFACT_SUFFIX),
+            size=stat.st_size,
+            created_at=datetime.fromtimestamp(stat.st_mtime),
+        ))
+
+    artifacts.sort(key=lambda artifact: artifact.created_at)
+    return artifacts
@@ -0,0 +1,119 @@
+"""Stage checkpoints of analysis jobs.
+
+Each completed stage's typed result is saved as `data/jobs/<job id>/checkpoints/<stage>.json`, together with the
+inputs it was computed from. A restarted job first copies the checkpoints of the job it restarts and then skips every
+stage whose checkpoint matches its own inputs, so a late failure does not repeat the earlier LLM calls. Checkpoints
+are removed once the job has stored its results.
+"""
+import json
+import logging
+import os
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, TypeVar
+
+from serde import from_dict, to_dict
+
+from app.utils.files import JOBS_ROOT, safe_join
+
+logger = logging.getLogger(__name__)
+
+ResultType = TypeVar("ResultType")
+
+
+def job_checkpoints_dir(job_id: str) -> Path:
+    safe_job_id = Path(job_id).name
+    if safe_job_id != job_id:
+        raise ValueError("Invalid job id")
+
+    return safe_join(JOBS_ROOT, f"{safe_job_id}/checkpoints")
+
+
+class JobCheckpoints:
+    def __init__(self, job_id: str | None, inputs: dict[str, Any]) -> None:
+        self.job_id = job_id
+        self.inputs = inputs
+
+    def load(self, stage: str, result_type: type[ResultType]) -> ResultType | None:
+        if not self.job_id:
+            return None
+
+        checkpoint_path = job_checkpoints_dir(self.job_id) / f"{stage}.json"
+        try:
+            checkpoint = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable '%s' checkpoint of job '%s'", stage, self.job_id, exc_info=True)
+            return None
+
+        if checkpoint.get("inputs") != self.inputs:
+            logger.info("Ignoring '%s' checkpoint of job '%s' made from other inputs", stage, self.job_id)
+            return None
+
+        try:
+            return from_dict(result_type, checkpoint["result"])
+        except Exception:
+            logger.warning("Ignoring invalid '%s' checkpoint of job '%s'", stage, self.job_id, exc_info=True)
+            return None
+
+    def save(self, stage: str, result: Any) -> None:
+        if not self.job_id:
+            return
+
+        try:
+            checkpoints_dir = job_checkpoints_dir(self.job_id)
+            checkpoints_dir.mkdir(parents=True, exist_ok=True)
+            temporary_path = checkpoints_dir / f".{stage}.json.tmp"
+            temporary_path.write_text(
+                json.dumps({"inputs": self.inputs, "result": to_dict(result)}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            os.replace(temporary_path, checkpoints_dir / f"{stage}.json")
+        except (OSError, ValueError, TypeError):
+            # A missing checkpoint only costs a re-run on restart.
+            logger.warning("Failed to save '%s' checkpoint of job '%s'", stage, self.job_id, exc_info=True)
+
+    def inherit(self, previous_job_id: str) -> None:
+        """Copy the checkpoints of the job this one restarts."""
+        if not self.job_id:
+            return
+
+        try:
+            previous_dir = job_checkpoints_dir(previous_job_id)
+            if not previous_dir.is_dir():
+                return
+
+            checkpoints_dir = job_checkpoints_dir(self.job_id)
+            checkpoints_dir.mkdir(parents=True, exist_ok=True)
+            for checkpoint_path in previous_dir.glob("*.json"):
+                shutil.copyfile(checkpoint_path, checkpoints_dir / checkpoint_path.name)
+        except (OSError, ValueError):
+            logger.warning("Failed to copy checkpoints of job '%s'", previous_job_id, exc_info=True)
+
+    def clear(self) -> None:
+        if not self.job_id:
+            return
+
+        try:
+            shutil.rmtree(job_checkpoints_dir(self.job_id), ignore_errors=True)
+        except ValueError:
+            pass
+
+
+def resume_or_run(
+        checkpoints: JobCheckpoints,
+        stage: str,
+        result_type: type[ResultType],
+        run: Callable[[], ResultType],
+) -> ResultType:
+    """Return the stage's checkpointed result, or run the stage and checkpoint what it returns."""
+    result = checkpoints.load(stage, result_type)
+    if result is not None:
+        logger.info("Resuming from the '%s' checkpoint", stage)
+        return result
+
+    result = run()
+    checkpoints.save(stage, result)
+    return result
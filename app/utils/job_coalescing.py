@@ -0,0 +1,108 @@
+"""Coalescing of identical analysis jobs.
+
+An analysis is identified by the content of its inputs (source, prompt version, model, analysis mode and server),
+by whether it runs the critiquer, and by the rater who owns the submit it produces, since submits of other raters stay
+hidden until they are published. When a job is enqueued it takes a Redis lock on that key holding its job id. A request for an analysis whose lock is
+held by a job that is still queued or running gets that job's id instead of starting a second LLM pipeline, so two
+jobs never race to replace the same submit. The job releases the lock when it ends; locks of jobs that died without
+releasing them are taken over once RQ no longer lists the job as in flight, or expire after `JOB_LOCK_TTL_SECONDS`.
+"""
+import hashlib
+import json
+import logging
+
+from redis import Redis
+from redis.exceptions import RedisError, WatchError
+from rq.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JOB_LOCK_KEY_PREFIX = "jobs:inflight:"
+# Long enough to cover a job waiting in a busy backfill queue and then running to its timeout.
+JOB_LOCK_TTL_SECONDS = 6 * 3600
+# A lock this recent belongs to a job whose request may still be inserting its row and pushing it to RQ.
+JOB_LOCK_CLAIM_GRACE_SECONDS = 60
+IN_FLIGHT_STATUSES = {JobStatus.QUEUED, JobStatus.STARTED, JobStatus.DEFERRED, JobStatus.SCHEDULED}
+
+
+def analysis_lock_key(
+        source_path: str,
+        prompt_path: str,
+        prompt_hash: str | None,
+        model: str,
+        analysis_mode: str,
+        openai_server: str,
+        run_critiquer: bool,
+        rater_id: int | None,
+) -> str:
+    """Lock key of an analysis; `openai_server` must already be resolved to a server id."""
+    content = json.dumps(
+        [source_path, prompt_hash or prompt_path, model, analysis_mode, openai_server, run_critiquer, rater_id]
+    )
+    return f"{JOB_LOCK_KEY_PREFIX}{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+
+
+def in_flight_job_ids(redis_connection: Redis, job_ids: list[str]) -> set[str]:
+    jobs = Job.fetch_many(job_ids, connection=redis_connection) if job_ids else []
+    return {job.id for job in jobs if job is not None and job.get_status(refresh=False) in IN_FLIGHT_STATUSES}
+
+
+def claim_job_locks(redis_connection: Redis, lock_keys: list[str], job_ids: list[str]) -> list[str | None]:
+    """Take each key for the job id at the same position.
+
+    Returns, per key, None when the job now holds the lock, or the id of the in-flight job that holds it. Keys held
+    by jobs that are no longer in flight are taken over.
+    """
+    with redis_connection.pipeline(transaction=False) as pipeline:
+        for lock_key, job_id in zip(lock_keys, job_ids):
+            pipeline.set(lock_key, job_id, nx=True, ex=JOB_LOCK_TTL_SECONDS, get=True)
+        holders = [holder.decode() if holder is not None else None for holder in pipeline.execute()]
+
+    # Keys repeated within the request are held by a job of this same request, which is about to be enqueued.
+    claimed = {job_id for job_id, holder in zip(job_ids, holders) if holder is None}
+    in_flight = claimed | in_flight_job_ids(
+        redis_connection, sorted({holder for holder in holders if holder is not None and holder not in claimed})
+    )
+
+    stale = [index for index, holder in enumerate(holders) if holder is not None and holder not in in_flight]
+    if stale:
+        with redis_connection.pipeline(transaction=False) as pipeline:
+            for index in stale:
+                pipeline.ttl(lock_keys[index])
+            lock_ttls = pipeline.execute()
+        stale = [
+            index
+            for index, lock_ttl in zip(stale, lock_ttls)
+            if lock_ttl < JOB_LOCK_TTL_SECONDS - JOB_LOCK_CLAIM_GRACE_SECONDS
+        ]
+
+    if stale:
+        new_holders: dict[str, str] = {}
+        with redis_connection.pipeline(transaction=False) as pipeline:
+            for index in stale:
+                if lock_keys[index] in new_holders:
+                    holders[index] = new_holders[lock_keys[index]]
+                    continue
+                new_holders[lock_keys[index]] = job_ids[index]
+                pipeline.set(lock_keys[index], job_ids[index], ex=JOB_LOCK_TTL_SECONDS)
+                holders[index] = None
+            pipeline.execute()
+
+    return holders
+
+
+def release_job_locks(redis_connection: Redis, lock_keys: list[str], job_ids: list[str]) -> None:
+    """Delete each key that is still held by the job id at the same position."""
+    for lock_key, job_id in zip(lock_keys, job_ids):
+        with redis_connection.pipeline() as pipeline:
+            try:
+                pipeline.watch(lock_key)
+                if pipeline.get(lock_key) == job_id.encode():
+                    pipeline.multi()
+                    pipeline.delete(lock_key)
+                    pipeline.execute()
+            except WatchError:
+                # Someone else took the key in the meantime, so it is no longer ours to delete.
+                continue
+            except RedisError as exc:
+                logger.warning("Failed to release the lock of job '%s': %s", job_id, exc)
@@ -0,0 +1,87 @@
+"""Job lifecycle and stage events.
+
+Workers record every status, stage or progress change of a job with one `UPDATE` of its `analysis_job` row and then
+publish the changed fields on the `jobs:events` Redis channel. API processes relay the channel to browsers over
+server-sent events, so the jobs page does not poll. Publishing is best effort: the row stays the source of truth and
+clients reload it whenever they (re)connect.
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Any
+
+from redis.exceptions import RedisError
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.database.models import AnalysisJob
+from app.database.rq_queue import get_redis_connection
+
+logger = logging.getLogger(__name__)
+
+JOB_EVENTS_CHANNEL = "jobs:events"
+# Columns that `created` events carry, so clients can list a new job without fetching it.
+CREATED_JOB_FIELDS = (
+    "id",
+    "status",
+    "stage",
+    "job_type",
+    "source_path",
+    "prompt_path",
+    "prompt_hash",
+    "model",
+    "analysis_mode",
+    "openai_server",
+    "run_critiquer",
+    "batch_id",
+    "submit_id",
+    "error",
+    "progress_current",
+    "progress_total",
+    "created_at",
+    "updated_at",
+)
+
+
+def publish_job_event(job_id: str, values: dict[str, Any]) -> None:
+    payload = {"job_id": job_id, **values}
+
+    try:
+        get_redis_connection().publish(JOB_EVENTS_CHANNEL, json.dumps(payload, default=datetime.isoformat))
+    except RedisError as exc:
+        logger.warning("Failed to publish event for job '%s': %s", job_id, exc)
+
+
+def update_job(session: Session, job_id: str | None, **values: Any) -> None:
+    """Apply `values` to the job's row, commit, and publish them as an event.
+
+    The commit also covers anything else pending in `session`. Without a job id (a job function called outside RQ)
+    this only commits.
+    """
+    if not job_id:
+        session.commit()
+        return
+
+    values["updated_at"] = datetime.now()
+    session.execute(update(AnalysisJob).where(AnalysisJob.job_id == job_id).values(**values))
+    session.commit()
+
+    publish_job_event(job_id, values)
+
+
+def publish_created_job(job: AnalysisJob) -> None:
+    """Announce a committed job row with every field a client needs to list it."""
+    publish_created_jobs([{"job_id": job.job_id, **{column: getattr(job, column) for column in CREATED_JOB_FIELDS}}])
+
+
+def publish_created_jobs(rows: list[dict[str, Any]]) -> None:
+    """Announce committed job rows, given as column values including `job_id`, with one pipelined round trip."""
+    try:
+        with get_redis_connection().pipeline(transaction=False) as pipeline:
+            for row in rows:
+                payload = {"job_id": row["job_id"], **{column: row.get(column) for column in CREATED_JOB_FIELDS}}
+                payload["created"] = True
+                pipeline.publish(JOB_EVENTS_CHANNEL, json.dumps(payload, default=datetime.isoformat))
+            pipeline.execute()
+    except RedisError as exc:
+        logger.warning("Failed to publish events for %d created jobs: %s", len(rows), exc)
@@ -0,0 +1,149 @@
+"""Live job logs.
+
+While a job runs, its log records are appended to a capped Redis Stream (`jobs:log:<job id>`) that the API tails
+and follows. When the job finishes, the stream is copied to `data/jobs/<job id>.txt` and kept in Redis only for
+`JOB_LOG_RETENTION_SECONDS`, so followers can still read the end of it. The worker never holds more than
+`JOB_LOG_MAX_LINES` records: the stream is trimmed to that length, and records that could not be sent to Redis are
+kept in a bounded buffer and appended to the file. Only records logged by the job's own thread are captured, so jobs
+running side by side in the asyncio worker keep separate logs.
+"""
+import logging
+import threading
+from collections import deque
+from collections.abc import Iterator
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+from app.database.rq_queue import get_redis_connection
+from app.settings import settings
+from app.utils.files import job_log_path
+
+logger = logging.getLogger(__name__)
+
+JOB_LOG_STREAM_PREFIX = "jobs:log:"
+JOB_LOG_READ_CHUNK = 1000
+# Field of the entry that marks the end of a job's log.
+JOB_LOG_END_FIELD = b"end"
+
+
+def job_log_stream_key(job_id: str) -> str:
+    return f"{JOB_LOG_STREAM_PREFIX}{job_id}"
+
+
+class RedisStreamLogHandler(logging.Handler):
+    def __init__(self, job_id: str, redis_connection: Redis) -> None:
+        super().__init__()
+        self.job_id = job_id
+        self.stream_key = job_log_stream_key(job_id)
+        self.redis_connection = redis_connection
+        self.thread_id = threading.get_ident()
+        self.record_count = 0
+        self.unsent_lines: deque[str] = deque(maxlen=settings.job_log_max_lines)
+        # After the first failed write, the rest of the log goes to `unsent_lines` without waiting on Redis again.
+        self.stream_available = True
+        # Redis client code may log; those records must not be sent back through this handler.
+        self.local = threading.local()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.thread != self.thread_id or getattr(self.local, "emitting", False):
+            return
+
+        self.local.emitting = True
+        try:
+            line = self.format(record)
+            self.record_count += 1
+            if not self.stream_available:
+                self.unsent_lines.append(line)
+                return
+
+            try:
+                self.redis_connection.xadd(
+                    self.stream_key,
+                    {"line": line},
+                    maxlen=settings.job_log_max_lines,
+                    approximate=True,
+                )
+            except RedisError:
+                self.stream_available = False
+                self.unsent_lines.append(line)
+        except Exception:
+            self.handleError(record)
+        finally:
+            self.local.emitting = False
+
+
+def configure_job_log_capture(job_id: str | None) -> RedisStreamLogHandler | None:
+    if not job_id:
+        return None
+
+    handler = RedisStreamLogHandler(job_id, get_redis_connection())
+    handler.setLevel(logging.INFO)
+    handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(name)s - %(message)s'))
+
+    logging.getLogger().addHandler(handler)
+    return handler
+
+
+def iterate_job_log_lines(redis_connection: Redis, job_id: str) -> Iterator[str]:
+    """Yield the lines of a job's stream in order, reading it in chunks."""
+    stream_key = job_log_stream_key(job_id)
+    start = "-"
+
+    while True:
+        entries = redis_connection.xrange(stream_key, min=start, count=JOB_LOG_READ_CHUNK)
+        for _, fields in entries:
+            if b"line" in fields:
+                yield fields[b"line"].decode("utf-8", errors="replace")
+
+        if len(entries) < JOB_LOG_READ_CHUNK:
+            return
+        start = f"({entries[-1][0].decode()}"
+
+
+def finish_job_log(handler: RedisStreamLogHandler | None) -> None:
+    """Detach the handler, copy the stream to the job's log file and let the stream expire."""
+    if handler is None:
+        return
+
+    logging.getLogger().removeHandler(handler)
+    handler.close()
+
+    redis_connection = handler.redis_connection
+    try:
+        stream_length = redis_connection.xlen(handler.stream_key) if handler.stream_available else 0
+    except RedisError:
+        handler.stream_available = False
+        stream_length = 0
+
+    try:
+        log_file_path = job_log_path(handler.job_id)
+        log_file_path.parent.mkdir(parents=True, exist_ok=True)
+        with log_file_path.open("w", encoding="utf-8") as log_file:
+            # The stream is trimmed from the front, so the lines that did not fit are the earliest ones.
+            dropped_count = handler.record_count - stream_length - len(handler.unsent_lines)
+            if dropped_count > 0:
+                log_file.write(f"[{dropped_count} earlier log lines were dropped]\n")
+
+            try:
+                if handler.stream_available:
+                    for line in iterate_job_log_lines(redis_connection, handler.job_id):
+                        log_file.write(line + "\n")
+            except RedisError as exc:
+                logger.warning("Failed to read the log stream of job '%s': %s", handler.job_id, exc)
+
+            for line in handler.unsent_lines:
+                log_file.write(line + "\n")
+    except (OSError, ValueError):
+        logger.exception("Failed to store job log for job '%s'", handler.job_id)
+
+    if not handler.stream_available:
+        return
+
+    try:
+        pipeline = redis_connection.pipeline()
+        pipeline.xadd(handler.stream_key, {JOB_LOG_END_FIELD: b"1"})
+        pipeline.expire(handler.stream_key, settings.job_log_retention_seconds)
+        pipeline.execute()
+    except RedisError as exc:
+        logger.warning("Failed to close the log stream of job '%s': %s", handler.job_id, exc)
@@ -0,0 +1,125 @@
+"""Priority queues of analysis jobs.
+
+Jobs are routed to the interactive, batch or backfill queue when they are created. Workers listen on all three and,
+after every job, reorder them by weighted random sampling (`QUEUE_WEIGHTS`), so higher priorities are drained first
+most of the time while lower ones still make progress. Each dequeue records how long the job waited; the wait times
+and the queue depths are reported per queue.
+"""
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from redis import Redis
+from redis.exceptions import RedisError
+from rq import Queue, Worker
+from rq.job import Job
+
+from app.database.rq_queue import ANALYSIS_QUEUES, QueuePriority
+from app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+QUEUE_WAIT_KEY_PREFIX = "queues:wait:"
+# Wait times kept per queue for the reported average and 95th percentile.
+QUEUE_WAIT_SAMPLES = 200
+
+
+@dataclass(frozen=True)
+class QueueStats:
+    priority: QueuePriority
+    name: str
+    weight: int
+    depth: int
+    running: int
+    oldest_wait_seconds: float | None
+    average_wait_seconds: float | None
+    p95_wait_seconds: float | None
+
+
+def queue_wait_key(queue_name: str) -> str:
+    return f"{QUEUE_WAIT_KEY_PREFIX}{queue_name}"
+
+
+def queue_weight(queue_name: str) -> int:
+    for priority, name in ANALYSIS_QUEUES.items():
+        if name == queue_name:
+            return settings.queue_weights.get(priority, 1)
+    return 1
+
+
+def weighted_queue_order(queues: list[Queue]) -> list[Queue]:
+    """Sample all queues without replacement, each draw weighted by the queue's weight."""
+    remaining = list(queues)
+    ordered: list[Queue] = []
+    while remaining:
+        chosen = random.choices(remaining, weights=[queue_weight(queue.name) for queue in remaining])[0]
+        remaining.remove(chosen)
+        ordered.append(chosen)
+    return ordered
+
+
+def seconds_since(moment: datetime | None) -> float | None:
+    if moment is None:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((datetime.now(timezone.utc) - moment).total_seconds(), 0.0)
+
+
+def record_queue_wait(redis_connection: Redis, queue_name: str, job: Job) -> None:
+    wait_seconds = seconds_since(job.enqueued_at)
+    if wait_seconds is None:
+        return
+
+    try:
+        with redis_connection.pipeline(transaction=False) as pipeline:
+            pipeline.lpush(queue_wait_key(queue_name), round(wait_seconds, 3))
+            pipeline.ltrim(queue_wait_key(queue_name), 0, QUEUE_WAIT_SAMPLES - 1)
+            pipeline.execute()
+    except RedisError as exc:
+        logger.warning("Failed to record the wait time of job '%s': %s", job.id, exc)
+
+
+class WeightedWorker(Worker):
+    """RQ worker that drains its queues by weighted priority and records queue wait times."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._ordered_queues = weighted_queue_order(self.queues)
+
+    def reorder_queues(self, reference_queue: Queue) -> None:
+        self._ordered_queues = weighted_queue_order(self.queues)
+
+    def dequeue_job_and_maintain_ttl(self, timeout: int | None, max_idle_time: int | None = None):
+        result = super().dequeue_job_and_maintain_ttl(timeout, max_idle_time)
+        if result is not None:
+            job, queue = result
+            record_queue_wait(self.connection, queue.name, job)
+        return result
+
+
+def read_queue_stats(redis_connection: Redis) -> list[QueueStats]:
+    stats: list[QueueStats] = []
+    for priority, name in ANALYSIS_QUEUES.items():
+        queue = Queue(name=name, connection=redis_connection)
+
+        oldest_wait_seconds: float | None = None
+        oldest_job_ids = queue.get_job_ids(0, 1)
+        if oldest_job_ids:
+            oldest_job = queue.fetch_job(oldest_job_ids[0])
+            oldest_wait_seconds = seconds_since(oldest_job.enqueued_at) if oldest_job else None
+
+        waits = sorted(float(value) for value in redis_connection.lrange(queue_wait_key(name), 0, -1))
+        stats.append(QueueStats(
+            priority=priority,
+            name=name,
+            weight=settings.queue_weights.get(priority, 1),
+            depth=queue.count,
+            running=queue.started_job_registry.count,
+            oldest_wait_seconds=oldest_wait_seconds,
+            average_wait_seconds=sum(waits) / len(waits) if waits else None,
+            p95_wait_seconds=waits[min(int(len(waits) * 0.95), len(waits) - 1)] if waits else None,
+        ))
+
+    return stats
@@ -0,0 +1,125 @@
+import hashlib
+import threading
+from datetime import datetime
+from pathlib import Path
+from time import monotonic
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.database.db import dialect_insert
+from app.database.models import PromptVersion
+from app.utils.files import PROMPTS_ROOT, safe_join
+
+# Prompts edited directly on disk show up in listings after at most this many seconds.
+PROMPT_LIST_TTL_SECONDS = 30.0
+
+_cache_lock = threading.Lock()
+_prompt_paths_cache: tuple[float, list[str]] | None = None
+# Prompt path -> (mtime_ns, size, content_hash, content)
+_prompt_content_cache: dict[str, tuple[int, int, str, str]] = {}
+
+
+def prompt_content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def invalidate_prompt_cache(prompt_path: str | None = None) -> None:
+    global _prompt_paths_cache
+
+    with _cache_lock:
+        _prompt_paths_cache = None
+        if prompt_path is None:
+            _prompt_content_cache.clear()
+        else:
+            _prompt_content_cache.pop(prompt_path, None)
+
+
+def list_prompt_paths() -> list[str]:
+    global _prompt_paths_cache
+
+    with _cache_lock:
+        if _prompt_paths_cache is not None and monotonic() - _prompt_paths_cache[0] < PROMPT_LIST_TTL_SECONDS:
+            return list(_prompt_paths_cache[1])
+
+    prompt_paths = sorted(
+        path.relative_to(PROMPTS_ROOT).as_posix()[:-4]
+        for path in PROMPTS_ROOT.rglob("*.txt")
+    )
+
+    with _cache_lock:
+        _prompt_paths_cache = (monotonic(), prompt_paths)
+
+    return list(prompt_paths)
+
+
+def read_prompt(prompt_path: str) -> tuple[str, str]:
+    """Return `(content, content_hash)` for the current prompt file, re-reading it only when it changed on disk."""
+    prompt_file_path: Path = safe_join(PROMPTS_ROOT, f"{prompt_path}.txt")
+
+    if not prompt_file_path.exists() or not prompt_file_path.is_file():
+        invalidate_prompt_cache(prompt_path)
+        raise FileNotFoundError(f"Prompt file at '{prompt_file_path}' not found")
+
+    stat = prompt_file_path.stat()
+    with _cache_lock:
+        cached = _prompt_content_cache.get(prompt_path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[3], cached[2]
+
+    content = prompt_file_path.read_text(encoding="utf-8", errors="replace")
+    content_hash = prompt_content_hash(content)
+
+    with _cache_lock:
+        _prompt_content_cache[prompt_path] = (stat.st_mtime_ns, stat.st_size, content_hash, content)
+
+    return content, content_hash
+
+
+def register_prompt_version(session: Session, prompt_path: str, content: str) -> str:
+    content_hash = prompt_content_hash(content)
+
+    existing_version_id = session.execute(
+        select(PromptVersion.id)
+        .where(PromptVersion.prompt_path == prompt_path, PromptVersion.content_hash == content_hash)
+    ).scalar_one_or_none()
+
+    if existing_version_id is None:
+        # Another request may register the same version concurrently; whichever insert loses is a no-op.
+        session.execute(
+            dialect_insert(session)(PromptVersion)
+            .values(prompt_path=prompt_path, content_hash=content_hash, content=content, created_at=datetime.now())
+            .on_conflict_do_nothing(index_elements=["prompt_path", "content_hash"])
+        )
+        # The row exists now, whether this insert or a concurrent one created it.
+        session.execute(
+            select(PromptVersion.id)
+            .where(PromptVersion.prompt_path == prompt_path, PromptVersion.content_hash == content_hash)
+        ).scalar_one()
+
+    return content_hash
+
+
+def rename_prompt_versions(session: Session, prompt_path: str, target_prompt_path: str) -> None:
+    """Move the versions of `prompt_path` to `target_prompt_path`, merging those the target already has."""
+    target_hashes = select(PromptVersion.content_hash).where(PromptVersion.prompt_path == target_prompt_path)
+    session.execute(
+        delete(PromptVersion)
+        .where(PromptVersion.prompt_path == prompt_path, PromptVersion.content_hash.in_(target_hashes))
+    )
+    session.execute(
+        update(PromptVersion)
+        .where(PromptVersion.prompt_path == prompt_path)
+        .values(prompt_path=target_prompt_path)
+    )
+
+
+def register_current_prompt(session: Session, prompt_path: str) -> str:
+    content, _ = read_prompt(prompt_path)
+    return register_prompt_version(session, prompt_path, content)
+
+
+def load_prompt_version(session: Session, content_hash: str) -> str | None:
+    return session.execute(
+        select(PromptVersion.content).where(PromptVersion.content_hash == content_hash).limit(1)
+    ).scalar_one_or_none()
@@ -0,0 +1,257 @@
+"""Daily and weekly rating rollups for the dashboard time series.
+
+Rows sum summary ratings (teacher `SubmitRating` and critiquer `AISubmitRating`) per bucket and
+(prompt_path, model, source_path). Rating writes apply deltas in the same transaction; `rebuild` recomputes
+everything from the rating tables:
+
+    python -m app.utils.rating_rollups rebuild
+"""
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Literal
+
+from sqlalchemy import Select, delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app.database.db import SessionLocal, dialect_insert, greatest
+from app.database.models import AISubmitRating, RatingRollup, Submit, SubmitRating
+from app.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+RatingSource = Literal["teacher", "ai"]
+BucketSize = Literal["day", "week"]
+
+BUCKET_SIZES: tuple[BucketSize, ...] = ("day", "week")
+ROLLUP_DIMENSIONS = ("prompt_path", "model", "source_path")
+
+
+@dataclass
+class RollupDelta:
+    relevance_sum: int = 0
+    relevance_count: int = 0
+    quality_sum: int = 0
+    quality_count: int = 0
+    ratings_count: int = 0
+    last_rated_at: datetime | None = None
+
+    def add(self, relevance_rating: int | None, quality_rating: int | None, rated_at: datetime | None, sign: int = 1):
+        if relevance_rating is not None:
+            self.relevance_sum += sign * relevance_rating
+            self.relevance_count += sign
+        if quality_rating is not None:
+            self.quality_sum += sign * quality_rating
+            self.quality_count += sign
+        self.ratings_count += sign
+        if sign > 0 and rated_at is not None and (self.last_rated_at is None or rated_at > self.last_rated_at):
+            self.last_rated_at = rated_at
+
+
+def bucket_start(bucket_size: BucketSize, rated_at: datetime) -> date:
+    day = rated_at.date()
+    return day if bucket_size == "day" else day - timedelta(days=day.weekday())
+
+
+def upsert_rollup(
+        session: Session,
+        bucket_size: BucketSize,
+        bucket_day: date,
+        rating_source: RatingSource,
+        prompt_path: str,
+        model: str,
+        source_path: str,
+        delta: RollupDelta,
+) -> None:
+    """Add `delta` to one rollup row atomically, so concurrent rating writes never lose increments."""
+    statement = dialect_insert(session)(RatingRollup).values(
+        bucket_size=bucket_size,
+        bucket_start=bucket_day,
+        rating_source=rating_source,
+        prompt_path=prompt_path,
+        model=model,
+        source_path=source_path,
+        relevance_sum=delta.relevance_sum,
+        relevance_count=delta.relevance_count,
+        quality_sum=delta.quality_sum,
+        quality_count=delta.quality_count,
+        ratings_count=delta.ratings_count,
+        last_rated_at=delta.last_rated_at,
+    )
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[
+            RatingRollup.bucket_size,
+            RatingRollup.bucket_start,
+            RatingRollup.rating_source,
+            RatingRollup.prompt_path,
+            RatingRollup.model,
+            RatingRollup.source_path,
+        ],
+        set_={
+            "relevance_sum": RatingRollup.relevance_sum + excluded.relevance_sum,
+            "relevance_count": RatingRollup.relevance_count + excluded.relevance_count,
+            "quality_sum": RatingRollup.quality_sum + excluded.quality_sum,
+            "quality_count": RatingRollup.quality_count + excluded.quality_count,
+            "ratings_count": RatingRollup.ratings_count + excluded.ratings_count,
+            "last_rated_at": func.coalesce(
+                greatest(session, RatingRollup.last_rated_at, excluded.last_rated_at),
+                RatingRollup.last_rated_at,
+                excluded.last_rated_at,
+            ),
+        },
+    )
+    session.execute(statement)
+
+
+def apply_rating_to_rollups(
+        session: Session,
+        submit: Submit,
+        rating_source: RatingSource,
+        rated_at: datetime,
+        previous: tuple[int | None, int | None] | None,
+        current: tuple[int | None, int | None],
+) -> None:
+    """Record a created (`previous=None`) or changed summary rating. Call in the rating write's transaction."""
+    delta = RollupDelta()
+    if previous is not None:
+        delta.add(previous[0], previous[1], None, sign=-1)
+    delta.add(current[0], current[1], rated_at)
+
+    for bucket_size in BUCKET_SIZES:
+        upsert_rollup(
+            session,
+            bucket_size,
+            bucket_start(bucket_size, rated_at),
+            rating_source,
+            submit.prompt_path,
+            submit.model,
+            submit.source_path,
+            delta,
+        )
+
+
+def summary_rating_rows(rating_source: RatingSource) -> Select:
+    rating_model = SubmitRating if rating_source == "teacher" else AISubmitRating
+    return (
+        select(
+            Submit.prompt_path,
+            Submit.model,
+            Submit.source_path,
+            rating_model.relevance_rating,
+            rating_model.quality_rating,
+            rating_model.created_at,
+        )
+        .join(Submit, Submit.id == rating_model.submit_id)
+    )
+
+
+def aggregate_rating_rows(session: Session, statement: Select, rating_source: RatingSource, sign: int = 1) -> dict:
+    deltas: dict[tuple, RollupDelta] = {}
+
+    for prompt_path, model, source_path, relevance_rating, quality_rating, rated_at in session.execute(
+            statement.execution_options(yield_per=1000)
+    ):
+        for bucket_size in BUCKET_SIZES:
+            key = (bucket_size, bucket_start(bucket_size, rated_at), rating_source, prompt_path, model, source_path)
+            deltas.setdefault(key, RollupDelta()).add(relevance_rating, quality_rating, rated_at, sign=sign)
+
+    return deltas
+
+
+def retract_submit_ratings(session: Session, submit_ids: list[int]) -> None:
+    """Remove the summary ratings of submits that are about to be deleted from the rollups."""
+    if not submit_ids:
+        return
+
+    for rating_source in ("teacher", "ai"):
+        rating_model = SubmitRating if rating_source == "teacher" else AISubmitRating
+        statement = summary_rating_rows(rating_source).where(rating_model.submit_id.in_(submit_ids))
+
+        for key, delta in aggregate_rating_rows(session, statement, rating_source, sign=-1).items():
+            upsert_rollup(session, *key, delta)
+
+    session.execute(delete(RatingRollup).where(RatingRollup.ratings_count <= 0))
+
+
+def retract_rater_ratings(session: Session, rater_id: int) -> None:
+    """Remove a rater's summary ratings, which are about to be deleted, from the rollups."""
+    statement = summary_rating_rows("teacher").where(SubmitRating.rater_id == rater_id)
+    for key, delta in aggregate_rating_rows(session, statement, "teacher", sign=-1).items():
+        upsert_rollup(session, *key, delta)
+
+    session.execute(delete(RatingRollup).where(RatingRollup.ratings_count <= 0))
+
+
+def resync_rating_rollups(session: Session, dimension: str | None = None, values: list[str] | None = None) -> int:
+    """Recompute rollup rows from the rating tables: all of them, or those whose `dimension` is in `values`."""
+    rollup_delete = delete(RatingRollup)
+    if dimension is not None:
+        if dimension not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Unknown rollup dimension '{dimension}'")
+        rollup_delete = rollup_delete.where(getattr(RatingRollup, dimension).in_(values or []))
+    session.execute(rollup_delete)
+
+    rows: list[dict] = []
+    for rating_source in ("teacher", "ai"):
+        statement = summary_rating_rows(rating_source)
+        if dimension is not None:
+            statement = statement.where(getattr(Submit, dimension).in_(values or []))
+
+        for key, delta in aggregate_rating_rows(session, statement, rating_source).items():
+            bucket_size, bucket_day, _, prompt_path, model, source_path = key
+            rows.append({
+                "bucket_size": bucket_size,
+                "bucket_start": bucket_day,
+                "rating_source": rating_source,
+                "prompt_path": prompt_path,
+                "model": model,
+                "source_path": source_path,
+                "relevance_sum": delta.relevance_sum,
+                "relevance_count": delta.relevance_count,
+                "quality_sum": delta.quality_sum,
+                "quality_count": delta.quality_count,
+                "ratings_count": delta.ratings_count,
+                "last_rated_at": delta.last_rated_at,
+            })
+
+    if rows:
+        session.bulk_insert_mappings(RatingRollup, rows)
+
+    return len(rows)
+
+
+def rename_rollup_dimension(session: Session, dimension: str, old_value: str, new_value: str) -> None:
+    """Follow a prompt move or source rename; falls back to a resync if rows for the new value already exist."""
+    dimension_column = getattr(RatingRollup, dimension)
+    target_exists = session.execute(
+        select(RatingRollup.bucket_size).where(dimension_column == new_value).limit(1)
+    ).first() is not None
+
+    if target_exists:
+        resync_rating_rollups(session, dimension, [old_value, new_value])
+        return
+
+    session.execute(update(RatingRollup).where(dimension_column == old_value).values({dimension: new_value}))
+
+
+def main(argv: list[str] | None = None) -> None:
+    configure_logging()
+
+    parser = argparse.ArgumentParser(prog="python -m app.utils.rating_rollups", description="Manage rating rollups")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="recompute all rollups from the rating tables")
+    parser.parse_args(argv)
+
+    session: Session = SessionLocal()
+    try:
+        row_count = resync_rating_rollups(session)
+        session.commit()
+        logger.info("Rebuilt rating rollups with %d rows", row_count)
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+import logging
+import os
+import threading
+from pathlib import Path
+
+from redis.exceptions import LockError, RedisError
+from redis.lock import Lock
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session
+from watchfiles import watch
+
+from app.database.db import SessionLocal
+from app.database.models import SourceCatalogEntry, SourceTag
+from app.database.rq_queue import get_redis_connection
+from app.utils.files import SOURCES_ROOT
+
+logger = logging.getLogger(__name__)
+
+SORT_KEY_SEPARATOR = "\x01"
+
+# Every API process starts a catalog, but only one rebuilds it at a time and only one watches the file system.
+SOURCE_CATALOG_REBUILD_LOCK = "source-catalog:rebuild"
+SOURCE_CATALOG_REBUILD_LOCK_SECONDS = 600
+SOURCE_CATALOG_WATCHER_LOCK = "source-catalog:watcher"
+# The watching process renews its lock well within this time; a standby process takes over once it lapses.
+SOURCE_CATALOG_WATCHER_LOCK_SECONDS = 30
+
+
+def source_sort_key(source_path: str) -> str:
+    """Encode the natural path ordering (numeric names first, by value) as a plain string for index scans."""
+    parts: list[str] = []
+
+    for part in source_path.split("/"):
+        stripped_part = part.strip()
+        if stripped_part.isdigit():
+            parts.append(f"0{int(stripped_part):020d}")
+        else:
+            parts.append(f"1{stripped_part.lower()}")
+
+    return SORT_KEY_SEPARATOR.join(parts)
+
+
+def parent_source_path(source_path: str) -> str:
+    return source_path.rsplit("/", 1)[0] if "/" in source_path else ""
+
+
+def ancestor_source_paths(source_path: str) -> list[str]:
+    parts = source_path.split("/")
+    return ["/".join(parts[:index]) for index in range(1, len(parts))]
+
+
+def build_catalog_row(source_path: str, directory_names: list[str], file_names: list[str]) -> dict:
+    zip_path: Path = SOURCES_ROOT / source_path / "src.zip"
+    has_source = "src.zip" in file_names
+
+    return {
+        "path": source_path,
+        "parent_path": parent_source_path(source_path),
+        "name": source_path.rsplit("/", 1)[-1],
+        "sort_key": source_sort_key(source_path),
+        "has_source": has_source,
+        "has_children": len(directory_names) > 0,
+        "size": zip_path.stat().st_size if has_source else None,
+    }
+
+
+def scan_source_directory(source_path: str) -> dict | None:
+    directory_path: Path = SOURCES_ROOT / source_path
+    if not directory_path.is_dir():
+        return None
+
+    directory_names: list[str] = []
+    file_names: list[str] = []
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                directory_names.append(entry.name)
+            else:
+                file_names.append(entry.name)
+
+    return build_catalog_row(source_path, directory_names, file_names)
+
+
+def scan_source_tree(source_path: str = "") -> list[dict]:
+    base_path: Path = SOURCES_ROOT / source_path if source_path else SOURCES_ROOT
+    if not base_path.is_dir():
+        return []
+
+    rows: list[dict] = []
+    for directory_path, directory_names, file_names in os.walk(base_path):
+        relative_path = Path(directory_path).resolve().relative_to(SOURCES_ROOT).as_posix()
+        if relative_path == ".":
+            continue
+
+        rows.append(build_catalog_row(relative_path, directory_names, file_names))
+
+    return rows
+
+
+def attach_source_tags(session: Session, rows: list[dict]) -> list[dict]:
+    paths = [row["path"] for row in rows]
+    tags: dict[str, str] = {}
+
+    for offset in range(0, len(paths), 500):
+        chunk = paths[offset:offset + 500]
+        tags.update(session.execute(
+            select(SourceTag.source_path, SourceTag.tag).where(SourceTag.source_path.in_(chunk))
+        ).tuples().all())
+
+    for row in rows:
+        row["tag"] = tags.get(row["path"])
+
+    return rows
+
+
+def subtree_condition(source_path: str):
+    return or_(
+        SourceCatalogEntry.path == source_path,
+        SourceCatalogEntry.path.startswith(f"{source_path}/", autoescape=True),
+    )
+
+
+def rebuild_source_catalog(session: Session) -> int:
+    rows = attach_source_tags(session, scan_source_tree())
+
+    session.execute(delete(SourceCatalogEntry))
+    if rows:
+        session.bulk_insert_mappings(SourceCatalogEntry, rows)
+
+    return len(rows)
+
+
+def sync_source_catalog_path(session: Session, source_path: str) -> None:
+    """Re-scan one directory subtree (and its ancestors) after it was created, changed or removed on disk."""
+    source_path = source_path.strip("/")
+    if not source_path:
+        rebuild_source_catalog(session)
+        return
+
+    rows = attach_source_tags(session, scan_source_tree(source_path))
+
+    session.execute(delete(SourceCatalogEntry).where(subtree_condition(source_path)))
+    if rows:
+        session.bulk_insert_mappings(SourceCatalogEntry, rows)
+
+    for ancestor_path in ancestor_source_paths(source_path):
+        ancestor_row = scan_source_directory(ancestor_path)
+        existing_entry = session.get(SourceCatalogEntry, ancestor_path)
+
+        if ancestor_row is None:
+            if existing_entry is not None:
+                session.delete(existing_entry)
+            continue
+
+        if existing_entry is None:
+            session.add(SourceCatalogEntry(**attach_source_tags(session, [ancestor_row])[0]))
+        else:
+            existing_entry.has_source = ancestor_row["has_source"]
+            existing_entry.has_children = ancestor_row["has_children"]
+            existing_entry.size = ancestor_row["size"]
+
+
+def set_source_catalog_tag(session: Session, source_path: str, tag: str | None) -> None:
+    entry = session.get(SourceCatalogEntry, source_path)
+    if entry is not None:
+        entry.tag = tag
+
+
+def minimal_changed_paths(changed_paths: set[str]) -> list[str]:
+    if "" in changed_paths:
+        return [""]
+
+    ordered_paths = sorted(changed_paths)
+    covered: list[str] = []
+
+    for path in ordered_paths:
+        if any(path == parent or path.startswith(f"{parent}/") for parent in covered):
+            continue
+        covered.append(path)
+
+    return covered
+
+
+def changed_source_directory(changed_path: str) -> str | None:
+    path = Path(changed_path)
+
+    try:
+        relative_path = path.relative_to(SOURCES_ROOT)
+    except ValueError:
+        return None
+
+    # Files only affect their directory's flags; directories (or removed paths) need a subtree re-scan.
+    if path.is_file() or path.name == "src.zip":
+        relative_path = relative_path.parent
+
+    relative_source_path = relative_path.as_posix()
+    return "" if relative_source_path == "." else relative_source_path
+
+
+def release_lock(lock: Lock) -> None:
+    try:
+        lock.release()
+    except (LockError, RedisError):
+        pass
+
+
+def rebuild_source_catalog_once() -> None:
+    """Rebuild the catalog, unless another process is rebuilding it right now."""
+    lock: Lock | None = None
+    try:
+        lock = get_redis_connection().lock(SOURCE_CATALOG_REBUILD_LOCK, timeout=SOURCE_CATALOG_REBUILD_LOCK_SECONDS)
+        if not lock.acquire(blocking=False):
+            logger.info("Source catalog is being rebuilt by another process")
+            return
+    except RedisError as exc:
+        logger.warning("Source catalog lock unavailable, rebuilding without it: %s", exc)
+        lock = None
+
+    session: Session = SessionLocal()
+    try:
+        entry_count = rebuild_source_catalog(session)
+        session.commit()
+        logger.info("Source catalog rebuilt with %d entries", entry_count)
+    except Exception:
+        logger.exception("Failed to rebuild source catalog")
+        session.rollback()
+    finally:
+        session.close()
+        if lock is not None:
+            release_lock(lock)
+
+
+def watch_source_changes(stop_event: threading.Event, lock: Lock | None) -> None:
+    """Sync the catalog from file-system events for as long as this process holds the watcher lock.
+
+    Without a lock, because Redis is unavailable, it syncs until Redis is back and the processes can pick one watcher.
+    """
+    SOURCES_ROOT.mkdir(parents=True, exist_ok=True)
+
+    for changes in watch(
+            SOURCES_ROOT,
+            stop_event=stop_event,
+            raise_interrupt=False,
+            rust_timeout=SOURCE_CATALOG_WATCHER_LOCK_SECONDS * 1000 // 3,
+            yield_on_timeout=True,
+    ):
+        if lock is None:
+            try:
+                get_redis_connection().ping()
+                logger.info("Source catalog watcher lock available again")
+                return
+            except RedisError:
+                pass
+        else:
+            try:
+                lock.reacquire()
+            except (LockError, RedisError) as exc:
+                logger.warning("Lost the source catalog watcher lock, standing by: %s", exc)
+                return
+
+        changed_paths = {
+            directory
+            for directory in (changed_source_directory(path) for _, path in changes)
+            if directory is not None
+        }
+        if not changed_paths:
+            continue
+
+        session: Session = SessionLocal()
+        try:
+            for source_path in minimal_changed_paths(changed_paths):
+                sync_source_catalog_path(session, source_path)
+            session.commit()
+        except Exception:
+            logger.exception("Failed to sync source catalog for %d changed paths", len(changed_paths))
+            session.rollback()
+        finally:
+            session.close()
+
+
+def watch_source_catalog(stop_event: threading.Event) -> None:
+    """Watch the sources in whichever process holds the watcher lock; the others retry until it is free.
+
+    While Redis is unavailable every process watches, as the rebuild does without its lock.
+    """
+    missed_changes = False
+
+    while not stop_event.is_set():
+        lock: Lock | None = None
+        try:
+            lock = get_redis_connection().lock(SOURCE_CATALOG_WATCHER_LOCK, timeout=SOURCE_CATALOG_WATCHER_LOCK_SECONDS)
+            acquired = lock.acquire(blocking=False)
+        except RedisError as exc:
+            logger.warning("Source catalog watcher lock unavailable, watching without it: %s", exc)
+            lock = None
+            acquired = True
+
+        if acquired:
+            try:
+                # Changes made while another process was watching, or none was, are picked up by a rebuild.
+                if missed_changes:
+                    rebuild_source_catalog_once()
+                logger.info("Watching sources for catalog changes")
+                watch_source_changes(stop_event, lock)
+            finally:
+                if lock is not None:
+                    release_lock(lock)
+
+        missed_changes = True
+        stop_event.wait(SOURCE_CATALOG_WATCHER_LOCK_SECONDS / 2)
+
+
+def start_source_catalog(watch_changes: bool = True) -> threading.Event:
+    """Rebuild the catalog once and keep it current from file-system events until the returned event is set.
+
+    Across API processes, concurrent startup rebuilds are skipped and a single process watches the file system.
+    """
+    stop_event = threading.Event()
+
+    rebuild_source_catalog_once()
+
+    if watch_changes:
+        threading.Thread(
+            target=watch_source_catalog,
+            args=(stop_event,),
+            name="source-catalog-watcher",
+            daemon=True,
+        ).start()
+
+    return stop_event
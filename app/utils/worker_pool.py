@@ -0,0 +1,162 @@
+"""Supervised pool of analysis worker processes.
+
+The supervisor keeps between `WORKER_MIN_PROCESSES` and `WORKER_MAX_PROCESSES` RQ workers running. Every scale
+interval it sizes the pool to the queued and running jobs, capped by the concurrency the OpenAI servers accept
+(`max_concurrency` in `openai_servers.json`) minus the jobs already running elsewhere, and replaces workers that
+crashed. Workers are stopped with SIGTERM, which RQ treats as a warm shutdown: the job in progress, and so its LLM
+calls, finishes before the process exits. With `WORKER_MODE=async` each process is an asyncio worker that runs up
+to `WORKER_ASYNC_CONCURRENCY` jobs, and the pool is sized in processes of that many jobs.
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+import signal
+import threading
+import time
+from multiprocessing.process import BaseProcess
+
+from redis.exceptions import RedisError
+
+from app.analyzer.servers import OpenAIServer, get_openai_servers
+from app.database.rq_queue import ANALYSIS_QUEUES, get_redis_connection
+from app.logging_config import configure_logging
+from app.settings import settings
+from app.utils.async_worker import work_async
+from app.utils.job_queues import WeightedWorker, read_queue_stats
+
+logger = logging.getLogger(__name__)
+
+# Workers are spawned rather than forked so they do not inherit the supervisor's signal handlers or connections.
+WORKER_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def run_worker() -> None:
+    configure_logging()
+
+    redis_connection = get_redis_connection()
+    if settings.worker_mode == "async":
+        asyncio.run(work_async(redis_connection, settings.worker_async_concurrency))
+        return
+
+    worker = WeightedWorker(list(ANALYSIS_QUEUES.values()), connection=redis_connection)
+    worker.work(with_scheduler=False)
+
+
+def server_concurrency_limit(servers: list[OpenAIServer]) -> int | None:
+    """Jobs all servers accept at once, or None when any server is unlimited."""
+    if any(server.max_concurrency == 0 for server in servers):
+        return None
+    return sum(server.max_concurrency for server in servers)
+
+
+def desired_pool_size(
+        queued: int,
+        running: int,
+        pool_size: int,
+        minimum: int,
+        maximum: int,
+        concurrency_limit: int | None,
+        jobs_per_process: int = 1,
+) -> int:
+    """Workers needed for the queued and running jobs, within the bounds and the servers' headroom."""
+    jobs = queued + running
+    if concurrency_limit is not None:
+        # Jobs running beyond this pool's workers belong to other pools that share the servers.
+        running_elsewhere = max(running - pool_size * jobs_per_process, 0)
+        jobs = min(jobs, max(concurrency_limit - running_elsewhere, 0))
+    return max(min(math.ceil(jobs / jobs_per_process), maximum), minimum)
+
+
+class WorkerPool:
+    def __init__(self, minimum: int, maximum: int) -> None:
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.target = minimum
+        self.processes: list[BaseProcess] = []
+        self.stopping: list[BaseProcess] = []
+
+    def start_process(self) -> None:
+        process = WORKER_CONTEXT.Process(target=run_worker, name="analysis-worker")
+        process.start()
+        self.processes.append(process)
+        logger.info("Started worker process %s (%d running)", process.pid, len(self.processes))
+
+    def stop_process(self, process: BaseProcess) -> None:
+        self.processes.remove(process)
+        self.stopping.append(process)
+        if process.pid is not None and process.is_alive():
+            process.terminate()
+
+    def reap(self) -> None:
+        """Forget exited workers; those that were not asked to stop are restarted by the next `scale_to`."""
+        for process in [process for process in self.processes if not process.is_alive()]:
+            self.processes.remove(process)
+            logger.warning("Worker process %s exited with code %s; restarting it", process.pid, process.exitcode)
+        self.stopping = [process for process in self.stopping if process.is_alive()]
+
+    def scale_to(self, size: int) -> None:
+        size = min(max(size, self.minimum), self.maximum)
+        self.target = size
+        while len(self.processes) < size:
+            self.start_process()
+        # The newest workers are stopped first; each finishes its current job before exiting.
+        while len(self.processes) > size:
+            process = self.processes[-1]
+            logger.info("Stopping worker process %s (%d remain)", process.pid, len(self.processes) - 1)
+            self.stop_process(process)
+
+    def shutdown(self, timeout: float) -> None:
+        for process in list(self.processes):
+            self.stop_process(process)
+
+        deadline = time.monotonic() + timeout
+        for process in self.stopping:
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                logger.warning("Worker process %s did not stop in %.0fs; killing it", process.pid, timeout)
+                process.kill()
+                process.join()
+        self.stopping = []
+
+
+def target_pool_size(pool: WorkerPool) -> int | None:
+    try:
+        queue_stats = read_queue_stats(get_redis_connection())
+    except RedisError as exc:
+        logger.warning("Failed to read queue depths; keeping %d workers: %s", pool.target, exc)
+        return None
+
+    return desired_pool_size(
+        queued=sum(stats.depth for stats in queue_stats),
+        running=sum(stats.running for stats in queue_stats),
+        pool_size=len(pool.processes),
+        minimum=pool.minimum,
+        maximum=pool.maximum,
+        concurrency_limit=server_concurrency_limit(get_openai_servers()),
+        jobs_per_process=settings.worker_async_concurrency if settings.worker_mode == "async" else 1,
+    )
+
+
+def run_supervisor() -> None:
+    configure_logging()
+
+    stop_event = threading.Event()
+
+    def request_stop(signum: int, frame) -> None:
+        del frame
+        logger.info("Received %s; stopping workers after their current jobs", signal.Signals(signum).name)
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    pool = WorkerPool(settings.worker_min_processes, settings.worker_max_processes)
+    pool.scale_to(pool.minimum)
+    while not stop_event.wait(settings.worker_scale_interval_seconds):
+        pool.reap()
+        size = target_pool_size(pool)
+        pool.scale_to(pool.target if size is None else size)
+
+    pool.shutdown(settings.worker_shutdown_timeout_seconds)
+    logger.info("Worker supervisor stopped")
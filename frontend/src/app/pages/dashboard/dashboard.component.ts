@@ -1,7 +1,7 @@
 import {Component, OnDestroy, OnInit} from '@angular/core';
 import {FormsModule} from '@angular/forms';
 import {DecimalPipe} from '@angular/common';
-import {RouterLink} from '@angular/router';
+import {ActivatedRoute, RouterLink} from '@angular/router';
 import {Subject, debounceTime, takeUntil} from 'rxjs';
 import {NzCardModule} from 'ng-zorro-antd/card';
 import {NzTableModule} from 'ng-zorro-antd/table';
@@ -61,11 +61,16 @@ export class DashboardComponent implements OnInit, OnDestroy {
   public ratingEvents: DashboardRatingEventDto[] = [];
   public promptModelStats: DashboardPromptModelStatDto[] = [];
   public promptPerformance: DashboardPromptPerformanceDto[] = [];
+  public statsAgeSeconds: number = 0;
+  public experimentId: number | null = null;
 
   private readonly destroy$ = new Subject<void>();
   private readonly ratingFiltersChanged$ = new Subject<void>();
 
-  public constructor(private readonly dashboardApiService: DashboardApiService) {
+  public constructor(
+    private readonly dashboardApiService: DashboardApiService,
+    private readonly activatedRoute: ActivatedRoute
+  ) {
   }
 
   public ngOnInit(): void {
@@ -73,7 +78,14 @@ export class DashboardComponent implements OnInit, OnDestroy {
       .pipe(debounceTime(300), takeUntil(this.destroy$))
       .subscribe(() => this.applyDebouncedFilters());
 
-    this.loadStats();
+    // Experiments link here with `?experiment_id=` to compare only their submits.
+    this.activatedRoute.queryParamMap
+      .pipe(takeUntil(this.destroy$))
+      .subscribe((queryParams) => {
+        const experimentId = Number(queryParams.get('experiment_id'));
+        this.experimentId = Number.isInteger(experimentId) && experimentId > 0 ? experimentId : null;
+        this.loadStats();
+      });
   }
 
   public ngOnDestroy(): void {
@@ -83,12 +95,13 @@ export class DashboardComponent implements OnInit, OnDestroy {
 
   public loadStats(): void {
     this.isLoading = true;
-    this.dashboardApiService.getStats(null, null, null, this.selectedRatingSource).subscribe({
+    this.dashboardApiService.getStats(null, null, null, this.selectedRatingSource, this.experimentId).subscribe({
       next: (response: DashboardStatsResponseDto) => {
         this.raters = response.raters;
         this.ratingEvents = response.rating_events;
         this.promptModelStats = response.prompt_model_stats;
         this.promptPerformance = response.prompt_performance;
+        this.statsAgeSeconds = response.age_seconds;
         this.applyDebouncedFilters();
         this.isLoading = false;
       },
@@ -11,10 +11,17 @@ import {NzSpinModule} from 'ng-zorro-antd/spin';
 import {NzButtonModule} from 'ng-zorro-antd/button';
 import {NzModalModule} from 'ng-zorro-antd/modal';
 import {NzMessageService} from 'ng-zorro-antd/message';
-import {catchError, interval, Observable, of, startWith, Subject, switchMap, takeUntil} from 'rxjs';
+import {catchError, debounceTime, Observable, of, retry, Subject, Subscription, switchMap, takeUntil} from 'rxjs';
 
 import {JobsApiService} from '../../service/api/types/jobs-api.service';
-import {JobDto, JobListResponseDto} from '../../service/api/api.models';
+import {
+  JobDto,
+  JobEventDto,
+  JobListResponseDto,
+  JobStreamMessage,
+  QueueStatsDto,
+  QueueStatsListResponseDto
+} from '../../service/api/api.models';
 
 @Component({
   selector: 'app-jobs-list',
@@ -35,19 +42,26 @@ import {JobDto, JobListResponseDto} from '../../service/api/api.models';
   templateUrl: './jobs-list.component.html'
 })
 export class JobsListComponent implements OnInit, OnDestroy {
-  public readonly refreshIntervalMs: number = 5000;
+  public readonly streamRetryDelayMs: number = 5000;
+  public readonly reloadDebounceMs: number = 1000;
   public jobs: JobDto[] = [];
   public isLoading: boolean = false;
   public statusFilter: string | null = null;
   public pageIndex: number = 1;
   public pageSize: number = 20;
   public totalJobs: number = 0;
+  public queueStats: QueueStatsDto[] = [];
+
+  // Keyset cursors for pages reached by paging forward; other pages fall back to offset paging.
+  private pageCursors: Map<number, string> = new Map<number, string>();
 
   public selectedLogJob: JobDto | null = null;
   public isLogModalVisible: boolean = false;
   public selectedLogText: string = '';
+  private logSubscription: Subscription | null = null;
 
   private readonly destroy$ = new Subject<void>();
+  private readonly reload$ = new Subject<void>();
 
   public constructor(
     private readonly jobsApiService: JobsApiService,
@@ -56,17 +70,21 @@ export class JobsListComponent implements OnInit, OnDestroy {
   }
 
   public ngOnInit(): void {
-    interval(this.refreshIntervalMs)
+    this.reload$
       .pipe(
-        startWith(0),
+        debounceTime(this.reloadDebounceMs),
         switchMap(() => this.fetchJobs(false)),
         takeUntil(this.destroy$)
       )
-      .subscribe((response: JobListResponseDto) => {
-        this.jobs = response.items;
-        this.totalJobs = response.total;
-        this.isLoading = false;
-      });
+      .subscribe((response: JobListResponseDto) => this.handleJobsResponse(response));
+
+    // The stream opens with a resync, which loads the first page.
+    this.jobsApiService.streamJobEvents()
+      .pipe(
+        retry({delay: this.streamRetryDelayMs}),
+        takeUntil(this.destroy$)
+      )
+      .subscribe((message: JobStreamMessage) => this.handleStreamMessage(message));
   }
 
   public ngOnDestroy(): void {
@@ -77,11 +95,7 @@ export class JobsListComponent implements OnInit, OnDestroy {
   public applyFilters(resetPage: boolean = true): void {
     this.fetchJobs(resetPage)
       .pipe(takeUntil(this.destroy$))
-      .subscribe((response: JobListResponseDto) => {
-        this.jobs = response.items;
-        this.totalJobs = response.total;
-        this.isLoading = false;
-      });
+      .subscribe((response: JobListResponseDto) => this.handleJobsResponse(response));
   }
 
   public onPageIndexChange(pageIndex: number): void {
@@ -92,6 +106,7 @@ export class JobsListComponent implements OnInit, OnDestroy {
   public onPageSizeChange(pageSize: number): void {
     this.pageSize = pageSize;
     this.pageIndex = 1;
+    this.pageCursors.clear();
     this.applyFilters(false);
   }
 
@@ -109,8 +124,14 @@ export class JobsListComponent implements OnInit, OnDestroy {
     this.isLogModalVisible = true;
     this.selectedLogJob = job;
     this.selectedLogText = 'Loading log...';
+    this.logSubscription?.unsubscribe();
 
-    this.jobsApiService.getJobErrorLog(job.job_id)
+    if (job.status === 'running') {
+      this.followJobLog(job);
+      return;
+    }
+
+    this.logSubscription = this.jobsApiService.getJobErrorLog(job.job_id)
       .pipe(
         catchError(() => {
           return of({job_id: job.job_id, error_log: 'No error log available.'});
@@ -127,6 +148,8 @@ export class JobsListComponent implements OnInit, OnDestroy {
       return;
     }
 
+    this.logSubscription?.unsubscribe();
+    this.logSubscription = null;
     this.isLogModalVisible = false;
     this.selectedLogJob = null;
     this.selectedLogText = '';
@@ -153,17 +176,111 @@ export class JobsListComponent implements OnInit, OnDestroy {
   }
 
 
+  private followJobLog(job: JobDto): void {
+    const lines: string[] = [];
+
+    this.logSubscription = this.jobsApiService.followJobLog(job.job_id)
+      .pipe(takeUntil(this.destroy$))
+      .subscribe({
+        next: (line: string) => {
+          lines.push(line);
+          this.selectedLogText = lines.join('\n');
+        },
+        error: () => {
+          this.selectedLogText = lines.length > 0 ? lines.join('\n') : 'No log available.';
+        }
+      });
+  }
+
+  private handleStreamMessage(message: JobStreamMessage): void {
+    if (message.type === 'resync') {
+      this.applyFilters(false);
+      return;
+    }
+
+    this.applyJobEvent(message.job);
+  }
+
+  private applyJobEvent(event: JobEventDto): void {
+    const index = this.jobs.findIndex((job: JobDto) => job.job_id === event.job_id);
+
+    if (index >= 0) {
+      const {created, ...changes} = event;
+      this.jobs = this.jobs.map((job: JobDto, jobIndex: number) => jobIndex === index ? {...job, ...changes} : job);
+
+      if (this.statusFilter && changes.status && changes.status !== this.statusFilter) {
+        this.reload$.next();
+      }
+      return;
+    }
+
+    // Jobs are ordered by last update, so anything new or changed belongs on the first page.
+    if (this.pageIndex !== 1) {
+      return;
+    }
+
+    if (event.created && (!this.statusFilter || event.status === this.statusFilter)) {
+      const {created, ...job} = event;
+      this.jobs = [job as JobDto, ...this.jobs].slice(0, this.pageSize);
+      this.totalJobs += 1;
+      return;
+    }
+
+    this.reload$.next();
+  }
+
   private fetchJobs(resetPage: boolean): Observable<JobListResponseDto> {
     if (resetPage) {
       this.pageIndex = 1;
+      this.pageCursors.clear();
     }
 
     this.isLoading = true;
-    return this.jobsApiService.getJobs(this.statusFilter, this.pageIndex, this.pageSize).pipe(
+    const cursor = this.pageCursors.get(this.pageIndex) ?? null;
+    return this.jobsApiService.getJobs(this.statusFilter, this.pageIndex, this.pageSize, cursor).pipe(
       catchError(() => of({items: [], total: 0, page: this.pageIndex, page_size: this.pageSize}))
     );
   }
 
+  private handleJobsResponse(response: JobListResponseDto): void {
+    this.jobs = response.items;
+    this.totalJobs = response.total ?? this.totalJobs;
+    this.isLoading = false;
+
+    if (response.next_cursor) {
+      this.pageCursors.set(this.pageIndex + 1, response.next_cursor);
+    }
+
+    this.loadQueueStats();
+  }
+
+  private loadQueueStats(): void {
+    this.jobsApiService.getQueueStats()
+      .pipe(
+        catchError(() => of({queues: []} as QueueStatsListResponseDto)),
+        takeUntil(this.destroy$)
+      )
+      .subscribe((response: QueueStatsListResponseDto) => {
+        this.queueStats = response.queues;
+      });
+  }
+
+  public formatWait(seconds: number | null): string {
+    if (seconds === null) {
+      return '-';
+    }
+
+    if (seconds < 60) {
+      return `${Math.round(seconds)}s`;
+    }
+
+    if (seconds < 3600) {
+      return `${Math.round(seconds / 60)}m`;
+    }
+
+    return `${(seconds / 3600).toFixed(1)}h`;
+  }
+
   public statusColor(status: string): string {
     switch (status) {
       case 'succeeded':
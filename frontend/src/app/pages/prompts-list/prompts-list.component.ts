@@ -263,8 +263,10 @@ export class PromptsListComponent implements OnInit, OnDestroy {
         this.isDeletingPrompt = false;
       }))
       .subscribe({
-        next: () => {
-          this.nzMessageService.success('Prompt deleted.');
+        next: (response) => {
+          this.nzMessageService.success(
+            response.job_id ? 'Prompt deleted. Its submits are being removed in the background.' : 'Prompt deleted.'
+          );
           this.selectedPromptPath = null;
           this.selectedPromptKeys = [];
           this.content = '';
@@ -6,9 +6,11 @@ import {NzButtonModule} from 'ng-zorro-antd/button';
 import {NzTagModule} from 'ng-zorro-antd/tag';
 import {NzInputModule} from 'ng-zorro-antd/input';
 import {NzCheckboxModule} from 'ng-zorro-antd/checkbox';
+import {NzSelectModule} from 'ng-zorro-antd/select';
 import {SubmitsApiService} from '../../service/api/types/submits-api.service';
 import {
   AnalyzeSourceResponseDto,
+  SubmitFilterMatch,
   SubmitListItemDto,
   SubmitListResponseDto,
   SubmitRatingState
@@ -37,6 +39,7 @@ import {NzTooltipDirective} from 'ng-zorro-antd/tooltip';
     NzTagModule,
     NzInputModule,
     NzCheckboxModule,
+    NzSelectModule,
     NzCardComponent,
     NzTypographyModule,
     SubmitUploadModalComponent,
@@ -57,11 +60,14 @@ export class SubmitsListComponent implements OnInit, OnDestroy {
   pageIndex: number = 1;
   pageSize: number = 20;
   totalSubmits: number = 0;
+  // Keyset cursors for pages reached by paging forward; other pages fall back to offset paging.
+  private pageCursors: Map<number, string> = new Map<number, string>();
   onlyUnrated: boolean = true;
   modelFilter: string = '';
   promptFilter: string = '';
   sourceFilter: string = '';
   sourceTagFilter: string = '';
+  filterMatch: SubmitFilterMatch = 'contains';
   isRandomizedNavigation: boolean = false;
 
   isUploadModalVisible: boolean = false;
@@ -130,6 +136,7 @@ export class SubmitsListComponent implements OnInit, OnDestroy {
 
   public applyFilters(): void {
     this.pageIndex = 1;
+    this.pageCursors.clear();
 
     // Wait a tick to ensure the checkbox state changes
     setTimeout(() => {
@@ -152,6 +159,7 @@ export class SubmitsListComponent implements OnInit, OnDestroy {
   public onPageSizeChange(pageSize: number): void {
     this.pageSize = pageSize;
     this.pageIndex = 1;
+    this.pageCursors.clear();
     this.loadSubmits();
   }
 
@@ -450,7 +458,9 @@ export class SubmitsListComponent implements OnInit, OnDestroy {
         this.modelFilter,
         this.sourceFilter,
         this.promptFilter,
-        this.sourceTagFilter
+        this.sourceTagFilter,
+        this.pageCursors.get(this.pageIndex) ?? null,
+        this.filterMatch
       )
       .pipe(
         catchError(() => {
@@ -468,7 +478,10 @@ export class SubmitsListComponent implements OnInit, OnDestroy {
       )
       .subscribe((response: SubmitListResponseDto) => {
         this.submits = this.isRandomizedNavigation ? this.shuffleSubmits(response.items) : response.items;
-        this.totalSubmits = response.total;
+        this.totalSubmits = response.total ?? this.totalSubmits;
+        if (response.next_cursor) {
+          this.pageCursors.set(this.pageIndex + 1, response.next_cursor);
+        }
         this.updateMassReanalyzePromptDefault();
       });
   }
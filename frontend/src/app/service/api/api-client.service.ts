@@ -66,6 +66,18 @@ export class ApiClientService {
     });
   }
 
+  // EventSource cannot send headers, so the API key goes into the query string.
+  public buildEventSourceUrl(path: string): string {
+    const url = new URL(this.buildUrl(path), window.location.href);
+    const apiKey = this.authService.apiKey;
+
+    if (apiKey && apiKey.trim().length > 0) {
+      url.searchParams.set('api_key', apiKey);
+    }
+
+    return url.toString();
+  }
+
   private buildUrl(path: string): string {
     const normalizedBaseUrl: string = this.apiBaseUrl.replace(/\/+$/, '');
     const normalizedPath: string = path.startsWith('/') ? path : `/${path}`;
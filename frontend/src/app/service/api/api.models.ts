@@ -3,6 +3,7 @@ import {SafeHtml} from '@angular/platform-browser';
 export type IssueSeverity = 'critical' | 'hight' | 'medium' | 'low';
 export type SubmitRatingState = 'not_rated' | 'partially_rated' | 'rated';
 export type AnalysisMode = 'chain_of_thought' | 'one_shot';
+export type SubmitFilterMatch = 'contains' | 'prefix' | 'exact';
 
 export interface LoginRequestDto {
   key: string;
@@ -54,6 +55,7 @@ export interface PromptUpdateRequestDto {
 export interface PromptDeleteResponseDto {
   prompt_path: string;
   deleted: boolean;
+  job_id: string | null;
 }
 
 export interface SourcePathsResponseDto {
@@ -127,6 +129,7 @@ export interface AnalyzeSourceRequestDto {
   analysis_mode?: AnalysisMode;
   openai_server: string;
   run_critiquer?: boolean;
+  batch_id?: string | null;
 }
 
 export interface AnalyzeSourceResponseDto {
@@ -138,26 +141,43 @@ export interface AnalyzeSourceResponseDto {
   analysis_mode: AnalysisMode;
   openai_server: string;
   run_critiquer?: boolean;
+  batch_id?: string | null;
 }
 
 export interface JobDto {
   id: number;
   job_id: string;
   status: string;
+  stage?: string | null;
   job_type: string;
   source_path: string | null;
   prompt_path: string | null;
   model: string | null;
   analysis_mode: AnalysisMode;
   openai_server: string;
+  run_critiquer?: boolean;
+  batch_id?: string | null;
   submit_id: number | null;
   error: string | null;
   error_log?: string | null;
+  progress_current?: number | null;
+  progress_total?: number | null;
+  input_tokens?: number | null;
+  output_tokens?: number | null;
   created_at: string;
   updated_at: string;
 }
 
 
+// Changed fields of a job; `created` events carry the whole row.
+export type JobEventDto = Partial<JobDto> & {
+  job_id: string;
+  created?: boolean;
+};
+
+export type JobStreamMessage = { type: 'job'; job: JobEventDto } | { type: 'resync' };
+
+
 export interface JobErrorLogRequestDto {
   error_log: string;
 }
@@ -167,11 +187,27 @@ export interface JobErrorLogResponseDto {
   error_log: string;
 }
 
+export interface QueueStatsDto {
+  priority: string;
+  name: string;
+  weight: number;
+  depth: number;
+  running: number;
+  oldest_wait_seconds: number | null;
+  average_wait_seconds: number | null;
+  p95_wait_seconds: number | null;
+}
+
+export interface QueueStatsListResponseDto {
+  queues: QueueStatsDto[];
+}
+
 export interface JobListResponseDto {
   items: JobDto[];
-  total: number;
+  total: number | null;
   page: number;
   page_size: number;
+  next_cursor?: string | null;
 }
 
 export interface SubmitListItemDto {
@@ -190,9 +226,10 @@ export interface SubmitListItemDto {
 
 export interface SubmitListResponseDto {
   items: SubmitListItemDto[];
-  total: number;
+  total: number | null;
   page: number;
   page_size: number;
+  next_cursor?: string | null;
 }
 
 export interface SubmitDto {
@@ -250,6 +287,15 @@ export interface RateSubmitSummaryRequestDto {
   comment?: string | null;
 }
 
+export interface BulkRateIssueRequestDto extends RateIssueRequestDto {
+  issue_id: number;
+}
+
+export interface BulkRatingRequestDto {
+  issues: BulkRateIssueRequestDto[];
+  summary?: RateSubmitSummaryRequestDto | null;
+}
+
 export interface SubmitRaterSuggestionRatingDto {
   issue_id: number;
   file: string;
@@ -359,4 +405,25 @@ export interface DashboardStatsResponseDto {
   prompt_model_stats: DashboardPromptModelStatDto[];
   source_rating_trends: DashboardSourceRatingTrendDto[];
   prompt_performance: DashboardPromptPerformanceDto[];
+  computed_at: string | null;
+  age_seconds: number;
+}
+
+export interface DashboardTimeSeriesPointDto {
+  bucket_start: string;
+  prompt_path: string | null;
+  model: string | null;
+  source_path: string | null;
+  avg_relevance_rating: number | null;
+  avg_quality_rating: number | null;
+  complex_rating: number | null;
+  ratings_count: number;
+  last_rated_at: string | null;
+}
+
+export interface DashboardTimeSeriesResponseDto {
+  bucket: "day" | "week";
+  group_by: "prompt_model" | "source" | "prompt";
+  rating_source: "teacher" | "ai";
+  points: DashboardTimeSeriesPointDto[];
 }
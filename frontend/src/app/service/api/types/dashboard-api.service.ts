@@ -1,21 +1,46 @@
 import {Injectable} from '@angular/core';
 import {Observable} from 'rxjs';
 import {ApiClientService} from '../api-client.service';
-import {DashboardStatsResponseDto} from '../api.models';
+import {DashboardStatsResponseDto, DashboardTimeSeriesResponseDto} from '../api.models';
 
 @Injectable({providedIn: 'root'})
 export class DashboardApiService {
   public constructor(private readonly apiClientService: ApiClientService) {
   }
 
-  public getStats(sourcePath: string | null, promptPath: string | null, model: string | null, ratingSource: "teacher" | "ai" = "teacher"): Observable<DashboardStatsResponseDto> {
+  public getStats(
+    sourcePath: string | null,
+    promptPath: string | null,
+    model: string | null,
+    ratingSource: "teacher" | "ai" = "teacher",
+    experimentId: number | null = null
+  ): Observable<DashboardStatsResponseDto> {
     return this.apiClientService.get<DashboardStatsResponseDto>('/dashboard/stats', {
       queryParams: {
         source_path: sourcePath && sourcePath.trim() ? sourcePath.trim() : null,
         prompt_path: promptPath && promptPath.trim() ? promptPath.trim() : null,
         model: model && model.trim() ? model.trim() : null,
+        experiment_id: experimentId,
         rating_source: ratingSource
       }
     });
   }
+
+  public getTimeSeries(
+    bucket: "day" | "week",
+    groupBy: "prompt_model" | "source" | "prompt",
+    ratingSource: "teacher" | "ai" = "teacher",
+    start: string | null = null,
+    end: string | null = null
+  ): Observable<DashboardTimeSeriesResponseDto> {
+    return this.apiClientService.get<DashboardTimeSeriesResponseDto>('/dashboard/timeseries', {
+      queryParams: {
+        bucket,
+        group_by: groupBy,
+        rating_source: ratingSource,
+        start,
+        end
+      }
+    });
+  }
 }
@@ -1,28 +1,91 @@
-import {Injectable} from '@angular/core';
+import {Injectable, NgZone} from '@angular/core';
 import {Observable} from 'rxjs';
 
 import {ApiClientService} from '../api-client.service';
-import {AnalyzeSourceResponseDto, JobDto, JobErrorLogResponseDto, JobListResponseDto} from '../api.models';
+import {
+  AnalyzeSourceResponseDto,
+  JobDto,
+  JobErrorLogResponseDto,
+  JobEventDto,
+  JobListResponseDto,
+  JobStreamMessage,
+  QueueStatsListResponseDto
+} from '../api.models';
 
 @Injectable({providedIn: 'root'})
 export class JobsApiService {
-  public constructor(private readonly apiClient: ApiClientService) {
+  public constructor(
+    private readonly apiClient: ApiClientService,
+    private readonly ngZone: NgZone
+  ) {
   }
 
   public getJobs(
     status: string | null,
     page: number,
-    pageSize: number
+    pageSize: number,
+    cursor: string | null = null
   ): Observable<JobListResponseDto> {
     return this.apiClient.get<JobListResponseDto>('/jobs', {
       queryParams: {
         status: status ?? null,
         page,
-        page_size: pageSize
+        page_size: pageSize,
+        cursor
       }
     });
   }
 
+  public getQueueStats(): Observable<QueueStatsListResponseDto> {
+    return this.apiClient.get<QueueStatsListResponseDto>('/jobs/queues');
+  }
+
+  /**
+   * Server-sent job events. Every (re)connect starts with a `resync`, since events sent while disconnected are lost.
+   * Errors only when the server refuses the stream; dropped connections are retried by the browser.
+   */
+  public streamJobEvents(): Observable<JobStreamMessage> {
+    return new Observable<JobStreamMessage>((subscriber) => {
+      const eventSource = new EventSource(this.apiClient.buildEventSourceUrl('/jobs/events'));
+
+      eventSource.onopen = () => this.ngZone.run(() => subscriber.next({type: 'resync'}));
+      eventSource.addEventListener('resync', () => this.ngZone.run(() => subscriber.next({type: 'resync'})));
+      eventSource.addEventListener('job', (event: MessageEvent<string>) => {
+        const job = JSON.parse(event.data) as JobEventDto;
+        this.ngZone.run(() => subscriber.next({type: 'job', job}));
+      });
+      eventSource.onerror = () => {
+        if (eventSource.readyState === EventSource.CLOSED) {
+          this.ngZone.run(() => subscriber.error(new Error('Job event stream closed')));
+        }
+      };
+
+      return () => eventSource.close();
+    });
+  }
+
+  /** Lines of a job's log as it runs, starting with those already logged. Completes when the job ends. */
+  public followJobLog(jobId: string): Observable<string> {
+    return new Observable<string>((subscriber) => {
+      const eventSource = new EventSource(
+        this.apiClient.buildEventSourceUrl(`/jobs/${encodeURIComponent(jobId)}/log/follow`)
+      );
+
+      eventSource.addEventListener('line', (event: MessageEvent<string>) => {
+        const line = JSON.parse(event.data) as string;
+        this.ngZone.run(() => subscriber.next(line));
+      });
+      eventSource.addEventListener('end', () => this.ngZone.run(() => subscriber.complete()));
+      eventSource.onerror = () => {
+        if (eventSource.readyState === EventSource.CLOSED) {
+          this.ngZone.run(() => subscriber.error(new Error('Job log stream closed')));
+        }
+      };
+
+      return () => eventSource.close();
+    });
+  }
+
   public getJob(jobId: string): Observable<JobDto> {
     return this.apiClient.get<JobDto>(`/jobs/${encodeURIComponent(jobId)}`);
   }
@@ -3,6 +3,7 @@ import {map, Observable} from 'rxjs';
 import {ApiClientService} from '../api-client.service';
 import {
   AnalyzeSourceResponseDto,
+  BulkRatingRequestDto,
   RateIssueRequestDto,
   RateSubmitSummaryRequestDto,
   SubmitDetailsDto,
@@ -11,6 +12,7 @@ import {
   SubmitPublishRequestDto,
   SubmitPublishResponseDto,
   SubmitDeleteResponseDto,
+  SubmitFilterMatch,
   SubmitRaterRatingsResponseDto
 } from '../api.models';
 import {SyntaxHighlighterService} from '../../syntax-highlighting.service';
@@ -32,7 +34,9 @@ export class SubmitsApiService {
     model: string | null,
     sourcePath: string | null = null,
     promptPath: string | null = null,
-    sourceTag: string | null = null
+    sourceTag: string | null = null,
+    cursor: string | null = null,
+    match: SubmitFilterMatch = 'contains'
   ): Observable<SubmitListResponseDto> {
     return this.apiClientService.get<SubmitListResponseDto>('/submits', {
       queryParams: {
@@ -42,7 +46,9 @@ export class SubmitsApiService {
         model: model && model.trim() ? model.trim() : null,
         source_path: sourcePath && sourcePath.trim() ? sourcePath.trim() : null,
         prompt_path: promptPath && promptPath.trim() ? promptPath.trim() : null,
-        source_tag: sourceTag && sourceTag.trim() ? sourceTag.trim() : null
+        source_tag: sourceTag && sourceTag.trim() ? sourceTag.trim() : null,
+        match,
+        cursor
       }
     });
   }
@@ -83,6 +89,10 @@ export class SubmitsApiService {
     return this.apiClientService.post<void, RateSubmitSummaryRequestDto>(`/ratings/submits/${submitId}`, payload);
   }
 
+  public rateSubmitBulk(submitId: number, payload: BulkRatingRequestDto): Observable<void> {
+    return this.apiClientService.post<void, BulkRatingRequestDto>(`/ratings/submits/${submitId}/bulk`, payload);
+  }
+
   public getSubmitRatingsByRater(submitId: number): Observable<SubmitRaterRatingsResponseDto> {
     return this.apiClientService.get<SubmitRaterRatingsResponseDto>(`/submits/${submitId}/ratings`);
   }
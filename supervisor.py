@@ -0,0 +1,9 @@
+from app.utils.worker_pool import run_supervisor
+
+
+def main() -> None:
+    run_supervisor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Shared fixtures: a migrated SQLite database and an in-memory Redis, both emptied after every test.
+
+Settings are read when `app` is first imported, so the environment is set up before any app import.
+"""
+import os
+import sys
+import tempfile
+from collections.abc import Callable, Iterator
+
+TEST_DATA_DIR = tempfile.mkdtemp(prefix="analyzer-tests-")
+os.environ["DATA_DIR"] = TEST_DATA_DIR
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DATA_DIR}/test.db"
+os.environ["SOURCE_CATALOG_WATCH"] = "false"
+
+import fakeredis  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.api.auth_cache import rater_cache  # noqa: E402
+from app.api.pagination import _count_cache  # noqa: E402
+from app.api.security import hash_api_key  # noqa: E402
+from app.database import db, rq_queue  # noqa: E402
+from app.database.db import SessionLocal  # noqa: E402
+from app.database.migrate import create_migration_engine, upgrade  # noqa: E402
+from app.database.models import Base, Rater  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database() -> None:
+    upgrade(create_migration_engine())
+
+
+@pytest.fixture(autouse=True)
+def clean_state(migrated_database) -> Iterator[None]:
+    yield
+    with db.engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    rater_cache.clear()
+    _count_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def redis_connection(monkeypatch: pytest.MonkeyPatch) -> fakeredis.FakeRedis:
+    """One in-memory Redis per test, returned by `get_redis_connection` in every module that imported it."""
+    connection = fakeredis.FakeRedis()
+    original = rq_queue.get_redis_connection
+    for module in list(sys.modules.values()):
+        if getattr(module, "get_redis_connection", None) is original:
+            monkeypatch.setattr(module, "get_redis_connection", lambda: connection)
+    return connection
+
+
+@pytest.fixture
+def session() -> Iterator[Session]:
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    """Client without the lifespan, so no background listeners run unless a test starts them."""
+    return TestClient(app)
+
+
+@pytest.fixture
+def create_rater(session: Session) -> Callable[..., Rater]:
+    def create(name: str, admin: bool = False) -> Rater:
+        rater = Rater(name=name, key=f"key-{name}", key_hash=hash_api_key(f"key-{name}"), admin=admin)
+        session.add(rater)
+        session.commit()
+        return rater
+
+    return create
+
+
+@pytest.fixture
+def auth_headers() -> Callable[[Rater], dict[str, str]]:
+    return lambda rater: {"Authorization": f"X-API-Key {rater.key}"}
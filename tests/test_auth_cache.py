@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import delete
+
+from app.api import auth_cache
+from app.api.auth_cache import AUTH_INVALIDATION_CHANNEL, CachedRater, RaterCache, listen_for_invalidations, rater_cache
+from app.database.models import Rater
+
+
+@pytest.fixture
+def subscribed_cache(monkeypatch: pytest.MonkeyPatch) -> RaterCache:
+    """The app's cache, enabled as if the invalidation listener were connected."""
+    monkeypatch.setattr(rater_cache, "subscribed", True)
+    return rater_cache
+
+
+def make_cache(max_entries: int = 8, ttl_seconds: float = 60) -> RaterCache:
+    cache = RaterCache(max_entries, ttl_seconds)
+    cache.subscribed = True
+    return cache
+
+
+def test_cache_is_bypassed_until_subscribed():
+    cache = RaterCache(8, 60)
+    cache.put("hash", CachedRater(id=1, name="a", admin=False), cache.generation)
+
+    assert cache.get("hash") is None
+
+
+def test_entries_expire(monkeypatch):
+    cache = make_cache(ttl_seconds=10)
+    now = time.monotonic()
+    monkeypatch.setattr(auth_cache.time, "monotonic", lambda: now)
+    cache.put("hash", CachedRater(id=1, name="a", admin=False), cache.generation)
+
+    assert cache.get("hash") == CachedRater(id=1, name="a", admin=False)
+
+    monkeypatch.setattr(auth_cache.time, "monotonic", lambda: now + 10)
+    assert cache.get("hash") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(max_entries=2)
+    for index in range(2):
+        cache.put(f"hash-{index}", CachedRater(id=index, name=str(index), admin=False), cache.generation)
+    cache.get("hash-0")
+    cache.put("hash-2", CachedRater(id=2, name="2", admin=False), cache.generation)
+
+    assert cache.get("hash-1") is None
+    assert cache.get("hash-0") is not None
+    assert cache.get("hash-2") is not None
+
+
+def test_lookup_that_raced_with_an_invalidation_is_not_stored():
+    cache = make_cache()
+    generation = cache.generation
+    cache.discard_rater(1)
+    cache.put("hash", CachedRater(id=1, name="stale", admin=True), generation)
+
+    assert cache.get("hash") is None
+
+
+def test_discard_rater_drops_all_of_its_keys():
+    cache = make_cache()
+    cache.put("old-key", CachedRater(id=1, name="a", admin=False), cache.generation)
+    cache.put("new-key", CachedRater(id=1, name="a", admin=False), cache.generation)
+    cache.put("other", CachedRater(id=2, name="b", admin=False), cache.generation)
+
+    cache.discard_rater(1)
+
+    assert cache.get("old-key") is None
+    assert cache.get("new-key") is None
+    assert cache.get("other") is not None
+
+
+def test_cached_key_authenticates_without_the_database(client, session, create_rater, auth_headers,
+                                                       subscribed_cache):
+    rater = create_rater("cached")
+    assert client.get("/auth/me", headers=auth_headers(rater)).status_code == 200
+
+    # Removed behind the app's back, so only the cache can still know the key.
+    session.execute(delete(Rater).where(Rater.id == rater.id))
+    session.commit()
+
+    assert client.get("/auth/me", headers=auth_headers(rater)).json()["name"] == "cached"
+
+
+def test_rater_update_invalidates_the_old_key(client, create_rater, auth_headers, subscribed_cache,
+                                              redis_connection):
+    admin, rater = create_rater("admin", admin=True), create_rater("rater")
+    old_headers = auth_headers(rater)
+    assert client.get("/auth/me", headers=old_headers).status_code == 200
+    pubsub = redis_connection.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(AUTH_INVALIDATION_CHANNEL)
+    pubsub.get_message(timeout=1.0)  # consumes the subscribe confirmation
+
+    response = client.put(
+        f"/raters/{rater.id}",
+        json={"name": "renamed", "key": "new-key", "admin": True},
+        headers=auth_headers(admin),
+    )
+
+    assert response.status_code == 200
+    assert client.get("/auth/me", headers=old_headers).status_code == 401
+    assert client.get("/auth/me", headers={"Authorization": "X-API-Key new-key"}).json()["admin"] is True
+    assert pubsub.get_message(timeout=1.0)["data"] == str(rater.id).encode()
+
+
+def test_listener_applies_invalidations_from_other_processes(redis_connection):
+    stop_event = threading.Event()
+    listener = threading.Thread(target=listen_for_invalidations, args=(stop_event,), daemon=True)
+    listener.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not rater_cache.subscribed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert rater_cache.enabled
+        rater_cache.put("hash", CachedRater(id=7, name="a", admin=False), rater_cache.generation)
+
+        redis_connection.publish(AUTH_INVALIDATION_CHANNEL, "7")
+        while rater_cache.get("hash") is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert rater_cache.get("hash") is None
+    finally:
+        stop_event.set()
+        listener.join()
+
+    assert not rater_cache.enabled
@@ -0,0 +1,172 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database.models import Issue, IssueRating, RatingRollup, Submit, SubmitRaterProgress, SubmitRating
+
+
+@pytest.fixture
+def rated_submit(session) -> tuple[Submit, list[Issue]]:
+    submit = Submit(model="m", source_path="src/a", prompt_path="p", published=True, total_issues=3)
+    session.add(submit)
+    session.flush()
+    issues = [
+        Issue(submit_id=submit.id, file="main.py", severity="high", line=index, explanation=f"issue {index}")
+        for index in range(3)
+    ]
+    session.add_all(issues)
+    session.commit()
+    return submit, issues
+
+
+def rating_state(session, submit_id: int, rater_id: int) -> str | None:
+    session.expire_all()
+    return session.scalar(
+        select(SubmitRaterProgress.rating_state)
+        .where(SubmitRaterProgress.submit_id == submit_id, SubmitRaterProgress.rater_id == rater_id)
+    )
+
+
+def test_rates_issues_and_summary_in_one_request(client, session, create_rater, auth_headers, rated_submit):
+    submit, issues = rated_submit
+    rater = create_rater("rater")
+
+    response = client.post(
+        f"/ratings/submits/{submit.id}/bulk",
+        json={
+            "issues": [
+                {"issue_id": issue.id, "relevance_rating": 7, "quality_rating": index + 1, "comment": " ok "}
+                for index, issue in reversed(list(enumerate(issues)))
+            ],
+            "summary": {"relevance_rating": 6, "quality_rating": 4},
+        },
+        headers=auth_headers(rater),
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [rating["issue_id"] for rating in body["issue_ratings"]] == [issue.id for issue in reversed(issues)]
+    assert [rating["quality_rating"] for rating in body["issue_ratings"]] == [3, 2, 1]
+    assert body["summary_rating"]["relevance_rating"] == 6
+    assert session.scalars(select(IssueRating.comment)).all() == ["ok"] * 3
+    assert rating_state(session, submit.id, rater.id) == "rated"
+    rollup = session.get(RatingRollup, ("day", date.today(), "teacher", "p", "m", "src/a"))
+    assert (rollup.relevance_sum, rollup.quality_sum, rollup.ratings_count) == (6, 4, 1)
+
+
+def test_rerating_updates_in_place(client, session, create_rater, auth_headers, rated_submit):
+    submit, issues = rated_submit
+    rater = create_rater("rater")
+    url = f"/ratings/submits/{submit.id}/bulk"
+
+    first = client.post(
+        url,
+        json={"issues": [{"issue_id": issues[0].id, "relevance_rating": 2}], "summary": {"relevance_rating": 3}},
+        headers=auth_headers(rater),
+    ).json()
+    second = client.post(
+        url,
+        json={
+            "issues": [{"issue_id": issues[0].id, "relevance_rating": 9, "quality_rating": 9}],
+            "summary": {"relevance_rating": 5, "quality_rating": 1},
+        },
+        headers=auth_headers(rater),
+    ).json()
+
+    assert second["issue_ratings"][0]["id"] == first["issue_ratings"][0]["id"]
+    assert second["issue_ratings"][0]["created_at"] == first["issue_ratings"][0]["created_at"]
+    assert session.scalar(select(func.count(IssueRating.id))) == 1
+    assert session.scalar(select(func.count(SubmitRating.id))) == 1
+    assert rating_state(session, submit.id, rater.id) == "partially_rated"
+    rollup = session.scalars(select(RatingRollup).where(RatingRollup.bucket_size == "week")).one()
+    assert (rollup.relevance_sum, rollup.relevance_count, rollup.quality_count, rollup.ratings_count) == (5, 1, 1, 1)
+
+
+def test_concurrent_summary_saves_count_once_in_the_rollups(client, session, create_rater, auth_headers,
+                                                             rated_submit):
+    submit, _ = rated_submit
+    headers = auth_headers(create_rater("rater"))
+
+    def save(relevance_rating: int) -> int:
+        payload = {"summary": {"relevance_rating": relevance_rating}}
+        return client.post(f"/ratings/submits/{submit.id}/bulk", json=payload, headers=headers).status_code
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        assert set(executor.map(save, range(1, 9))) == {200}
+
+    saved_rating = session.scalar(select(SubmitRating.relevance_rating))
+    rollup = session.scalars(select(RatingRollup).where(RatingRollup.bucket_size == "week")).one()
+    assert (rollup.relevance_sum, rollup.relevance_count, rollup.ratings_count) == (saved_rating, 1, 1)
+
+
+@pytest.mark.parametrize(
+    ("payload", "status_code"),
+    [
+        ({}, 400),
+        ({"issues": [{"issue_id": 0, "relevance_rating": 11}]}, 400),
+        ({"summary": {"quality_rating": 0}}, 400),
+    ],
+)
+def test_invalid_requests_are_rejected(client, create_rater, auth_headers, rated_submit, payload, status_code):
+    submit, _ = rated_submit
+
+    response = client.post(f"/ratings/submits/{submit.id}/bulk", json=payload, headers=auth_headers(create_rater("r")))
+
+    assert response.status_code == status_code
+
+
+def test_duplicate_issue_is_rejected(client, create_rater, auth_headers, rated_submit):
+    submit, issues = rated_submit
+    items = [{"issue_id": issues[0].id, "relevance_rating": 1}] * 2
+
+    response = client.post(
+        f"/ratings/submits/{submit.id}/bulk", json={"issues": items}, headers=auth_headers(create_rater("r"))
+    )
+
+    assert response.status_code == 400
+
+
+def test_issue_of_another_submit_rejects_the_whole_request(client, session, create_rater, auth_headers,
+                                                           rated_submit):
+    submit, issues = rated_submit
+    other = Submit(model="m", source_path="src/b", prompt_path="p", published=True)
+    session.add(other)
+    session.flush()
+    foreign_issue = Issue(submit_id=other.id, severity="low", explanation="elsewhere")
+    session.add(foreign_issue)
+    session.commit()
+
+    response = client.post(
+        f"/ratings/submits/{submit.id}/bulk",
+        json={
+            "issues": [
+                {"issue_id": issues[0].id, "relevance_rating": 5},
+                {"issue_id": foreign_issue.id, "relevance_rating": 5},
+            ],
+            "summary": {"relevance_rating": 5},
+        },
+        headers=auth_headers(create_rater("r")),
+    )
+
+    assert response.status_code == 404
+    assert str(foreign_issue.id) in response.json()["detail"]
+    assert session.scalar(select(func.count(IssueRating.id))) == 0
+    assert session.scalar(select(func.count(SubmitRating.id))) == 0
+    assert session.scalar(select(func.count()).select_from(RatingRollup)) == 0
+
+
+def test_unpublished_submit_of_another_rater_is_forbidden(client, session, create_rater, auth_headers):
+    owner = create_rater("owner")
+    submit = Submit(model="m", source_path="src/a", prompt_path="p", created_by_id=owner.id)
+    session.add(submit)
+    session.commit()
+
+    response = client.post(
+        f"/ratings/submits/{submit.id}/bulk",
+        json={"summary": {"relevance_rating": 5}},
+        headers=auth_headers(create_rater("other")),
+    )
+
+    assert response.status_code == 403
@@ -0,0 +1,25 @@
+import pytest
+
+from app.api.content_encoding import accepts_encoding
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "accepted"),
+    [
+        ("gzip", True),
+        ("deflate, GZIP;q=0.5", True),
+        ("br, gzip ; q=1.0", True),
+        ("gzip;q=0", False),
+        ("gzip; q=0.000", False),
+        ("gzip;q=oops", False),
+        ("*", True),
+        ("*;q=0", False),
+        ("gzip;q=0, *", False),
+        ("*;q=0, gzip", True),
+        ("x-gzip, deflate", False),
+        ("", False),
+        (None, False),
+    ],
+)
+def test_accepts_encoding(accept_encoding, accepted):
+    assert accepts_encoding(accept_encoding, "gzip") is accepted
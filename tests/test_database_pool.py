@@ -0,0 +1,17 @@
+from sqlalchemy import text
+
+from app.database import db
+from app.database.db import SessionLocal, resize_connection_pool
+
+
+def test_resized_pool_serves_every_session_at_once():
+    resize_connection_pool(40)
+    sessions = [SessionLocal() for _ in range(40)]
+    try:
+        for session in sessions:
+            session.execute(text("SELECT 1"))
+        assert db.engine.pool.checkedout() == 40
+    finally:
+        for session in sessions:
+            session.close()
+        resize_connection_pool(db.DEFAULT_POOL_SIZE)
@@ -0,0 +1,167 @@
+import sys
+from pathlib import Path
+
+import pytest
+from rq import Queue, SimpleWorker
+from sqlalchemy import func, select
+
+from app.api.routes import prompts as prompt_routes
+from app.database.models import (
+    AISubmitRating,
+    AnalysisJob,
+    Issue,
+    IssueRating,
+    PromptVersion,
+    RatingRollup,
+    Submit,
+    SubmitRating,
+)
+from app.utils import deletion, files
+from app.utils.deletion import delete_submits, delete_submits_where
+from app.utils.rating_rollups import resync_rating_rollups
+
+PROMPT_PATH = "reviews/basic"
+
+
+@pytest.fixture
+def prompts_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Prompt files in a temporary directory, for every module that imported the prompts root."""
+    root = (tmp_path / "prompts").resolve()
+    original = files.PROMPTS_ROOT
+    for module in list(sys.modules.values()):
+        if getattr(module, "PROMPTS_ROOT", None) is original:
+            monkeypatch.setattr(module, "PROMPTS_ROOT", root)
+    return root
+
+
+@pytest.fixture
+def prompt_file(prompts_root: Path, session) -> Path:
+    path = prompts_root / f"{PROMPT_PATH}.txt"
+    path.parent.mkdir(parents=True)
+    path.write_text("Find bugs.", encoding="utf-8")
+    session.add(PromptVersion(prompt_path=PROMPT_PATH, content_hash="hash", content="Find bugs."))
+    session.commit()
+    return path
+
+
+def add_rated_submits(session, rater, count: int, prompt_path: str = PROMPT_PATH) -> list[int]:
+    submits = [Submit(model="m", source_path=f"src/{index}", prompt_path=prompt_path) for index in range(count)]
+    session.add_all(submits)
+    session.flush()
+    for submit in submits:
+        issue = Issue(submit_id=submit.id, severity="high", explanation="bug")
+        session.add(issue)
+        session.flush()
+        session.add_all([
+            IssueRating(issue_id=issue.id, rater_id=rater.id, relevance_rating=3),
+            SubmitRating(submit_id=submit.id, rater_id=rater.id, relevance_rating=4),
+            AISubmitRating(submit_id=submit.id, quality_rating=5),
+            AnalysisJob(job_id=f"job-{submit.id}", job_type="analysis", prompt_path=prompt_path, submit_id=submit.id),
+        ])
+    session.flush()
+    resync_rating_rollups(session)
+    session.commit()
+    return [submit.id for submit in submits]
+
+
+def count(session, model) -> int:
+    return session.scalar(select(func.count()).select_from(model))
+
+
+def test_delete_submits_cascades_and_keeps_jobs(session, create_rater):
+    rater = create_rater("rater")
+    deleted_id, kept_id = add_rated_submits(session, rater, 2)
+
+    assert delete_submits(session, [deleted_id]) == 1
+    session.commit()
+
+    assert session.scalars(select(Submit.id)).all() == [kept_id]
+    assert count(session, Issue) == count(session, IssueRating) == count(session, SubmitRating) == 1
+    assert count(session, AISubmitRating) == 1
+    assert session.scalar(select(AnalysisJob.submit_id).where(AnalysisJob.job_id == f"job-{deleted_id}")) is None
+    assert set(session.scalars(select(RatingRollup.source_path))) == {"src/1"}
+
+
+def test_delete_submits_where_works_in_batches(session, create_rater, monkeypatch):
+    monkeypatch.setattr(deletion, "DELETE_BATCH_SIZE", 2)
+    add_rated_submits(session, create_rater("rater"), 5)
+    progress: list[int] = []
+
+    deleted_count = delete_submits_where(
+        session, Submit.prompt_path == PROMPT_PATH, commit_batches=True, on_batch=progress.append
+    )
+
+    assert deleted_count == 5
+    assert progress == [2, 4, 5]
+    assert count(session, Submit) == 0
+    assert count(session, RatingRollup) == 0
+
+
+def test_delete_submit_endpoint(client, session, create_rater, auth_headers):
+    admin = create_rater("admin", admin=True)
+    submit_id, = add_rated_submits(session, admin, 1)
+
+    assert client.delete(f"/submits/{submit_id}", headers=auth_headers(admin)).status_code == 200
+    assert client.delete(f"/submits/{submit_id}", headers=auth_headers(admin)).status_code == 404
+    assert client.delete(f"/submits/{submit_id}", headers=auth_headers(create_rater("rater"))).status_code == 403
+
+
+def test_small_prompt_deletion_runs_in_the_request(client, session, create_rater, auth_headers, prompt_file):
+    admin = create_rater("admin", admin=True)
+    add_rated_submits(session, admin, 2)
+    other_id, = add_rated_submits(session, admin, 1, prompt_path="other")
+
+    response = client.delete(f"/prompts/{PROMPT_PATH}", headers=auth_headers(admin))
+
+    assert response.json() == {"prompt_path": PROMPT_PATH, "deleted": True, "job_id": None}
+    assert not prompt_file.exists()
+    assert session.scalars(select(Submit.id)).all() == [other_id]
+    assert session.scalars(select(AnalysisJob.prompt_path)).all() == ["other"]
+    assert count(session, PromptVersion) == 0
+
+
+def test_large_prompt_deletion_runs_in_the_background(client, session, create_rater, auth_headers, prompt_file,
+                                                      redis_connection, monkeypatch):
+    queue = Queue("backfill", connection=redis_connection)
+    monkeypatch.setattr(prompt_routes, "get_analysis_queue", lambda priority: queue)
+    monkeypatch.setattr(prompt_routes, "BACKGROUND_DELETE_MIN_SUBMITS", 3)
+    monkeypatch.setattr(deletion, "DELETE_BATCH_SIZE", 2)
+    admin = create_rater("admin", admin=True)
+    add_rated_submits(session, admin, 3)
+
+    job_id = client.delete(f"/prompts/{PROMPT_PATH}", headers=auth_headers(admin)).json()["job_id"]
+
+    # Until the job runs, the prompt and everything recorded for it stay in place.
+    assert job_id is not None
+    assert prompt_file.exists()
+    assert count(session, Submit) == 3
+    assert count(session, PromptVersion) == 1
+
+    SimpleWorker([queue], connection=redis_connection).work(burst=True)
+
+    session.expire_all()
+    job = session.scalars(select(AnalysisJob).where(AnalysisJob.job_id == job_id)).one()
+    assert (job.status, job.progress_current, job.progress_total) == ("succeeded", 3, 3)
+    assert not prompt_file.exists()
+    assert count(session, Submit) == count(session, PromptVersion) == count(session, RatingRollup) == 0
+    assert session.scalars(select(AnalysisJob.job_id)).all() == [job_id]
+
+
+def test_failed_prompt_deletion_keeps_the_prompt(session, create_rater, prompt_file, redis_connection, monkeypatch):
+    def fail(*_):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(deletion, "delete_prompt_records", fail)
+    add_rated_submits(session, create_rater("rater"), 2)
+    queue = Queue("backfill", connection=redis_connection)
+    rq_job = queue.enqueue("app.utils.deletion.run_prompt_deletion", PROMPT_PATH)
+    session.add(AnalysisJob(job_id=rq_job.id, status="running", job_type="prompt_delete", prompt_path=PROMPT_PATH))
+    session.commit()
+
+    SimpleWorker([queue], connection=redis_connection).work(burst=True)
+
+    session.expire_all()
+    job = session.scalars(select(AnalysisJob).where(AnalysisJob.job_id == rq_job.id)).one()
+    assert (job.status, job.error) == ("failed", "database went away")
+    assert prompt_file.exists()
+    assert count(session, PromptVersion) == 1
@@ -0,0 +1,61 @@
+from dataclasses import replace
+
+import pytest
+from rq import Queue
+from sqlalchemy import func, select
+
+from app.database.models import AnalysisJob
+from app.utils import analysis_jobs
+from app.utils.analysis_jobs import AnalysisJobSpec, enqueue_analysis_jobs
+
+SPEC = AnalysisJobSpec(
+    source_path="src/a",
+    prompt_path="p",
+    prompt_hash="hash",
+    model="m",
+    analysis_mode="chain_of_thought",
+    openai_server="server-1",
+    run_critiquer=False,
+)
+
+
+@pytest.fixture(autouse=True)
+def analysis_queue(redis_connection, monkeypatch: pytest.MonkeyPatch) -> Queue:
+    queue = Queue("analyzer", connection=redis_connection)
+    monkeypatch.setattr(analysis_jobs, "get_analysis_queue", lambda priority="interactive": queue)
+    return queue
+
+
+def job_count(session) -> int:
+    return session.scalar(select(func.count(AnalysisJob.id)))
+
+
+def test_identical_request_attaches_to_the_job_in_flight(session, create_rater):
+    rater = create_rater("rater")
+
+    first, = enqueue_analysis_jobs(session, [SPEC], job_type="analysis", rater_id=rater.id)
+    second, = enqueue_analysis_jobs(session, [SPEC], job_type="analysis", rater_id=rater.id)
+
+    assert second == first
+    assert job_count(session) == 1
+
+
+def test_other_rater_gets_its_own_job(session, create_rater):
+    owner, other = create_rater("owner"), create_rater("other")
+
+    first, = enqueue_analysis_jobs(session, [SPEC], job_type="analysis", rater_id=owner.id)
+    second, = enqueue_analysis_jobs(session, [SPEC], job_type="analysis", rater_id=other.id)
+
+    assert second != first
+    assert session.scalar(select(AnalysisJob.created_by_id).where(AnalysisJob.job_id == second)) == other.id
+
+
+def test_other_options_get_their_own_job(session, create_rater):
+    rater = create_rater("rater")
+    with_critiquer = replace(SPEC, run_critiquer=True)
+
+    first, = enqueue_analysis_jobs(session, [SPEC], job_type="analysis", rater_id=rater.id)
+    second, = enqueue_analysis_jobs(session, [with_critiquer], job_type="analysis", rater_id=rater.id)
+
+    assert second != first
+    assert session.scalar(select(AnalysisJob.run_critiquer).where(AnalysisJob.job_id == second)) is True
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from app.api import job_event_stream
+from app.api.job_event_stream import RESYNC, JobEventBroker, job_event_broker, listen_for_job_events, stream_job_events
+from app.utils.job_events import publish_job_event
+
+
+class FakeRequest:
+    def __init__(self) -> None:
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+
+async def drain(queue: asyncio.Queue) -> list[str | None]:
+    # Lets callbacks scheduled with call_soon_threadsafe run first.
+    await asyncio.sleep(0)
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_broadcast_reaches_every_subscriber_until_it_unsubscribes():
+    async def scenario():
+        broker = JobEventBroker()
+        first, second = broker.subscribe(), broker.subscribe()
+
+        broker.broadcast("one")
+        broker.unsubscribe(second)
+        broker.broadcast("two")
+
+        return await drain(first[1]), await drain(second[1])
+
+    assert asyncio.run(scenario()) == (["one", "two"], ["one"])
+
+
+def test_broadcast_from_another_thread():
+    async def scenario():
+        broker = JobEventBroker()
+        _, queue = broker.subscribe()
+
+        thread = threading.Thread(target=broker.broadcast, args=("from-thread",))
+        thread.start()
+        thread.join()
+
+        return await asyncio.wait_for(queue.get(), timeout=1)
+
+    assert asyncio.run(scenario()) == "from-thread"
+
+
+def test_client_that_falls_behind_gets_a_resync(monkeypatch):
+    monkeypatch.setattr(job_event_stream, "JOB_EVENT_QUEUE_SIZE", 2)
+
+    async def scenario():
+        broker = JobEventBroker()
+        _, queue = broker.subscribe()
+        for index in range(3):
+            broker.broadcast(str(index))
+        broker.broadcast("after")
+        return await drain(queue)
+
+    assert asyncio.run(scenario()) == [RESYNC, "after"]
+
+
+def test_subscriber_with_a_closed_loop_is_dropped():
+    broker = JobEventBroker()
+
+    async def subscribe():
+        broker.subscribe()
+
+    asyncio.run(subscribe())
+    broker.broadcast("event")
+
+    assert broker.subscribers == set()
+
+
+def test_stream_formats_events_and_unsubscribes_on_disconnect():
+    async def scenario():
+        request = FakeRequest()
+        stream = stream_job_events(request)
+        chunks = [await anext(stream)]
+        assert len(job_event_broker.subscribers) == 1
+
+        job_event_broker.broadcast('{"job_id": "a"}')
+        chunks.append(await anext(stream))
+        job_event_broker.broadcast(RESYNC)
+        chunks.append(await anext(stream))
+
+        request.disconnected = True
+        job_event_broker.broadcast("ignored")
+        with pytest.raises(StopAsyncIteration):
+            await anext(stream)
+        return chunks
+
+    assert asyncio.run(scenario()) == [
+        "retry: 5000\n\n",
+        'event: job\ndata: {"job_id": "a"}\n\n',
+        "event: resync\ndata: {}\n\n",
+    ]
+    assert job_event_broker.subscribers == set()
+
+
+def test_stream_sends_keepalives_when_idle(monkeypatch):
+    monkeypatch.setattr(job_event_stream, "JOB_EVENT_KEEPALIVE_SECONDS", 0.01)
+
+    async def scenario():
+        stream = stream_job_events(FakeRequest())
+        await anext(stream)
+        chunk = await anext(stream)
+        await stream.aclose()
+        return chunk
+
+    assert asyncio.run(scenario()) == ": keepalive\n\n"
+
+
+def test_listener_relays_published_events():
+    async def scenario():
+        subscriber = job_event_broker.subscribe()
+        _, queue = subscriber
+        stop_event = threading.Event()
+        listener = threading.Thread(target=listen_for_job_events, args=(stop_event,), daemon=True)
+        listener.start()
+        try:
+            # The listener asks clients to reload once it is subscribed, since it may have missed events.
+            assert await asyncio.wait_for(queue.get(), timeout=5) is RESYNC
+
+            await asyncio.to_thread(publish_job_event, "job-1", {"status": "succeeded", "progress_current": 3})
+            return json.loads(await asyncio.wait_for(queue.get(), timeout=5))
+        finally:
+            stop_event.set()
+            await asyncio.to_thread(listener.join)
+            job_event_broker.unsubscribe(subscriber)
+
+    assert asyncio.run(scenario()) == {"job_id": "job-1", "status": "succeeded", "progress_current": 3}
+
+
+def test_events_endpoint_requires_an_api_key(client):
+    assert client.get("/jobs/events").status_code == 401
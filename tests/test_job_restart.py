@@ -0,0 +1,64 @@
+import pytest
+from rq import Queue
+from sqlalchemy import select
+
+from app.database.models import AnalysisJob
+from app.database.rq_queue import ANALYSIS_QUEUES
+from app.utils import analysis_jobs
+from app.utils.experiments import EXPERIMENT_JOB_TYPE
+
+
+@pytest.fixture(autouse=True)
+def analysis_queues(redis_connection, monkeypatch: pytest.MonkeyPatch) -> dict[str, Queue]:
+    queues = {priority: Queue(name, connection=redis_connection) for priority, name in ANALYSIS_QUEUES.items()}
+    monkeypatch.setattr(analysis_jobs, "get_analysis_queue", lambda priority="interactive": queues[priority])
+    return queues
+
+
+def add_failed_job(session, rater, job_id: str, job_type: str, batch_id: str | None) -> AnalysisJob:
+    job = AnalysisJob(
+        job_id=job_id,
+        status="failed",
+        job_type=job_type,
+        source_path="src/a",
+        prompt_path="p",
+        model="m",
+        created_by_id=rater.id,
+        batch_id=batch_id,
+    )
+    session.add(job)
+    session.commit()
+    return job
+
+
+def restart(client, auth_headers, rater, job_id: str) -> str:
+    response = client.post(f"/jobs/{job_id}/restart", headers=auth_headers(rater))
+    assert response.status_code == 200
+    return response.json()["job_id"]
+
+
+def test_restart_stays_in_the_batch_and_queue_of_the_original(client, session, create_rater, auth_headers,
+                                                              analysis_queues):
+    rater = create_rater("rater")
+    original = analysis_queues["backfill"].enqueue("app.analyzer.analyze_job.run_submit_analysis")
+    add_failed_job(session, rater, original.id, EXPERIMENT_JOB_TYPE, batch_id="experiment-batch")
+
+    new_job_id = restart(client, auth_headers, rater, original.id)
+
+    assert session.scalar(select(AnalysisJob.batch_id).where(AnalysisJob.job_id == new_job_id)) == "experiment-batch"
+    assert new_job_id in analysis_queues["backfill"].job_ids
+
+
+@pytest.mark.parametrize(
+    ("job_type", "batch_size", "priority"),
+    [(EXPERIMENT_JOB_TYPE, 1, "batch"), ("prompt_review", 6, "batch"), ("prompt_review", 2, "interactive")],
+)
+def test_restart_of_an_expired_job_derives_the_priority(client, session, create_rater, auth_headers,
+                                                        analysis_queues, job_type, batch_size, priority):
+    rater = create_rater("rater")
+    for index in range(batch_size):
+        add_failed_job(session, rater, f"job-{index}", job_type, batch_id="batch")
+
+    new_job_id = restart(client, auth_headers, rater, "job-0")
+
+    assert new_job_id in analysis_queues[priority].job_ids
@@ -0,0 +1,113 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine, inspect
+from sqlalchemy.exc import OperationalError
+
+from app.database import migrate
+from app.database.migrate import (
+    BASE_VERSION,
+    MigrationError,
+    create_migration_engine,
+    current_version,
+    discover_migrations,
+    downgrade,
+    upgrade,
+)
+from app.database.models import Base
+
+
+@pytest.fixture
+def fresh_engine(tmp_path: Path) -> Iterator[Engine]:
+    engine = create_migration_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+
+def table_names(engine: Engine) -> set[str]:
+    return set(inspect(engine).get_table_names()) - {"schema_migrations"}
+
+
+def test_every_version_has_a_variant_for_each_dialect():
+    sqlite_versions = [migration.version for migration in discover_migrations("sqlite")]
+    postgresql_versions = [migration.version for migration in discover_migrations("postgresql")]
+
+    assert sqlite_versions == postgresql_versions
+    assert sqlite_versions == sorted(set(sqlite_versions))
+
+
+def test_upgrade_creates_every_model_table(fresh_engine):
+    applied = upgrade(fresh_engine)
+
+    assert [migration.version for migration in applied] == [
+        migration.version for migration in discover_migrations("sqlite")
+    ]
+    assert current_version(fresh_engine) == applied[-1].version
+    assert set(Base.metadata.tables) <= table_names(fresh_engine)
+    assert upgrade(fresh_engine) == []
+
+
+def test_downgrade_to_base_and_back(fresh_engine):
+    upgrade(fresh_engine)
+    downgrade(fresh_engine, BASE_VERSION)
+
+    assert current_version(fresh_engine) is None
+    assert table_names(fresh_engine) == set()
+
+    upgrade(fresh_engine)
+    assert set(Base.metadata.tables) <= table_names(fresh_engine)
+
+
+def test_each_migration_reverts_and_reapplies(fresh_engine):
+    for migration in discover_migrations("sqlite"):
+        upgrade(fresh_engine, migration.version)
+        tables = table_names(fresh_engine)
+
+        assert [reverted.version for reverted in downgrade(fresh_engine)] == [migration.version]
+        upgrade(fresh_engine, migration.version)
+
+        assert current_version(fresh_engine) == migration.version
+        assert table_names(fresh_engine) == tables
+
+
+def test_downgrade_to_version_reverts_only_newer_migrations(fresh_engine):
+    upgrade(fresh_engine)
+    versions = [migration.version for migration in discover_migrations("sqlite")]
+
+    reverted = downgrade(fresh_engine, versions[-3])
+
+    assert [migration.version for migration in reverted] == list(reversed(versions[-2:]))
+    assert current_version(fresh_engine) == versions[-3]
+
+
+def test_unknown_target_is_rejected(fresh_engine):
+    with pytest.raises(MigrationError):
+        upgrade(fresh_engine, "9999")
+
+
+def test_upgrade_refuses_an_unversioned_schema(fresh_engine):
+    with fresh_engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE submit (id INTEGER PRIMARY KEY)")
+
+    with pytest.raises(MigrationError, match="predates versioned migrations"):
+        upgrade(fresh_engine)
+
+
+def test_failing_migration_rolls_back_its_ddl(fresh_engine, tmp_path, monkeypatch):
+    migrations_root = tmp_path / "migrations"
+    migrations_root.mkdir()
+    (migrations_root / "0001_good.sql").write_text(
+        "-- migrate:up\nCREATE TABLE good (id INTEGER);\n-- migrate:down\nDROP TABLE good;\n"
+    )
+    (migrations_root / "0002_bad.sql").write_text(
+        "-- migrate:up\nCREATE TABLE half (id INTEGER);\nINSERT INTO missing VALUES (1);\n"
+        "-- migrate:down\nDROP TABLE half;\n"
+    )
+    monkeypatch.setattr(migrate, "MIGRATIONS_ROOT", migrations_root)
+
+    with pytest.raises(OperationalError):
+        upgrade(fresh_engine)
+
+    assert current_version(fresh_engine) == "0001"
+    assert table_names(fresh_engine) == {"good"}
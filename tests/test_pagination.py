@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.pagination import decode_cursor, encode_cursor
+from app.database.models import AnalysisJob, Submit
+
+BASE_TIME = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def collect_pages(client, url: str, headers: dict[str, str]) -> list[int]:
+    ids: list[int] = []
+    cursor: str | None = None
+    while True:
+        params = {"page_size": 3, "total_mode": "none"}
+        if cursor is not None:
+            params["cursor"] = cursor
+        body = client.get(url, params=params, headers=headers).json()
+        ids.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(BASE_TIME.replace(microsecond=123456), 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (BASE_TIME.replace(microsecond=123456), 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "e30", encode_cursor(BASE_TIME, 1)[:-4]])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor)
+
+    assert exc_info.value.status_code == 400
+
+
+def test_submit_pages_cover_every_row_once_with_tied_timestamps(client, session, create_rater, auth_headers):
+    admin = create_rater("admin", admin=True)
+    # Pairs of submits share a timestamp, so the id has to break ties across page boundaries.
+    submits = [
+        Submit(model="m", source_path=f"src/{index}", prompt_path="p", created_at=BASE_TIME + timedelta(index // 2))
+        for index in range(10)
+    ]
+    session.add_all(submits)
+    session.commit()
+
+    ids = collect_pages(client, "/submits", auth_headers(admin))
+
+    newest_first = sorted(submits, key=lambda submit: (submit.created_at, submit.id), reverse=True)
+    expected = [submit.id for submit in newest_first]
+    assert ids == expected
+
+
+def test_submit_cursor_skips_rows_added_to_the_first_page(client, session, create_rater, auth_headers):
+    admin = create_rater("admin", admin=True)
+    session.add_all([
+        Submit(model="m", source_path=f"src/{index}", prompt_path="p", created_at=BASE_TIME + timedelta(index))
+        for index in range(5)
+    ])
+    session.commit()
+
+    first_page = client.get("/submits", params={"page_size": 2}, headers=auth_headers(admin)).json()
+    session.add(Submit(model="m", source_path="src/new", prompt_path="p", created_at=BASE_TIME + timedelta(10)))
+    session.commit()
+    second_page = client.get(
+        "/submits", params={"page_size": 2, "cursor": first_page["next_cursor"]}, headers=auth_headers(admin)
+    ).json()
+
+    assert first_page["total"] == 5
+    assert [item["source_path"] for item in second_page["items"]] == ["src/2", "src/1"]
+
+
+def test_job_pages_follow_updated_at(client, session, create_rater, auth_headers):
+    admin = create_rater("admin", admin=True)
+    jobs = [
+        AnalysisJob(job_id=f"job-{index}", job_type="analysis", updated_at=BASE_TIME + timedelta(minutes=index % 4))
+        for index in range(8)
+    ]
+    session.add_all(jobs)
+    session.commit()
+
+    ids = collect_pages(client, "/jobs", auth_headers(admin))
+
+    expected = [job.id for job in sorted(jobs, key=lambda job: (job.updated_at, job.id), reverse=True)]
+    assert ids == expected
+
+
+def test_total_modes(client, session, create_rater, auth_headers):
+    admin = create_rater("admin", admin=True)
+    session.add(Submit(model="m", source_path="src/a", prompt_path="p"))
+    session.commit()
+
+    def total(mode: str) -> int | None:
+        return client.get("/submits", params={"total_mode": mode}, headers=auth_headers(admin)).json()["total"]
+
+    assert total("none") is None
+    assert total("cached") == 1
+
+    session.add(Submit(model="m", source_path="src/b", prompt_path="p"))
+    session.commit()
+
+    assert total("cached") == 1
+    assert total("exact") == 2
+
+
+def test_invalid_cursor_returns_400(client, create_rater, auth_headers):
+    admin = create_rater("admin", admin=True)
+
+    response = client.get("/jobs", params={"cursor": "garbage"}, headers=auth_headers(admin))
+
+    assert response.status_code == 400
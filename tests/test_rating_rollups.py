@@ -0,0 +1,159 @@
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from app.database.models import AISubmitRating, RatingRollup, Submit, SubmitRating
+from app.utils.rating_rollups import (
+    apply_rating_to_rollups,
+    bucket_start,
+    rename_rollup_dimension,
+    resync_rating_rollups,
+    retract_rater_ratings,
+    retract_submit_ratings,
+)
+
+RATED_AT = datetime(2026, 3, 12, 15, 30)  # a Thursday
+
+
+def rollup_rows(session) -> dict[tuple, tuple]:
+    session.expire_all()
+    return {
+        (row.bucket_size, row.bucket_start, row.rating_source, row.prompt_path, row.model, row.source_path): (
+            row.relevance_sum,
+            row.relevance_count,
+            row.quality_sum,
+            row.quality_count,
+            row.ratings_count,
+        )
+        for row in session.scalars(select(RatingRollup))
+    }
+
+
+def assert_matches_resync(session) -> None:
+    live = rollup_rows(session)
+    resync_rating_rollups(session)
+    session.flush()
+    rebuilt = rollup_rows(session)
+    session.rollback()
+
+    assert live == rebuilt
+
+
+def add_submit(session, source_path: str = "src/a", prompt_path: str = "p", model: str = "m") -> Submit:
+    submit = Submit(model=model, source_path=source_path, prompt_path=prompt_path, published=True)
+    session.add(submit)
+    session.commit()
+    return submit
+
+
+def test_bucket_start():
+    assert bucket_start("day", RATED_AT) == date(2026, 3, 12)
+    assert bucket_start("week", RATED_AT) == date(2026, 3, 9)
+
+
+def test_rating_adds_to_day_and_week_buckets(session):
+    submit = add_submit(session)
+    rating = AISubmitRating(submit_id=submit.id, relevance_rating=4, quality_rating=None, created_at=RATED_AT)
+    session.add(rating)
+    apply_rating_to_rollups(session, submit, "ai", RATED_AT, None, (4, None))
+    session.commit()
+
+    assert rollup_rows(session) == {
+        ("day", date(2026, 3, 12), "ai", "p", "m", "src/a"): (4, 1, 0, 0, 1),
+        ("week", date(2026, 3, 9), "ai", "p", "m", "src/a"): (4, 1, 0, 0, 1),
+    }
+
+
+def test_changed_rating_applies_the_difference(session):
+    submit = add_submit(session)
+    session.add(AISubmitRating(submit_id=submit.id, relevance_rating=5, quality_rating=2, created_at=RATED_AT))
+    apply_rating_to_rollups(session, submit, "ai", RATED_AT, None, (2, 3))
+    apply_rating_to_rollups(session, submit, "ai", RATED_AT, (2, 3), (5, None))
+    apply_rating_to_rollups(session, submit, "ai", RATED_AT, (5, None), (5, 2))
+    session.commit()
+
+    assert rollup_rows(session)[("day", date(2026, 3, 12), "ai", "p", "m", "src/a")] == (5, 1, 2, 1, 1)
+    assert_matches_resync(session)
+
+
+def test_summary_rating_endpoint_keeps_rollups_in_sync(client, session, create_rater, auth_headers):
+    submit = add_submit(session)
+    raters = [create_rater("first"), create_rater("second")]
+
+    for rater, ratings in zip(raters, [(3, 4), (None, 1)]):
+        response = client.post(
+            f"/ratings/submits/{submit.id}",
+            json={"relevance_rating": ratings[0], "quality_rating": ratings[1]},
+            headers=auth_headers(rater),
+        )
+        assert response.status_code == 200
+    client.post(
+        f"/ratings/submits/{submit.id}",
+        json={"relevance_rating": 8, "quality_rating": None},
+        headers=auth_headers(raters[0]),
+    )
+
+    today = date.today()
+    assert rollup_rows(session)[("day", today, "teacher", "p", "m", "src/a")] == (8, 1, 1, 1, 2)
+    assert_matches_resync(session)
+
+
+def test_retracting_submits_removes_their_ratings_and_empty_rows(session, create_rater):
+    rater = create_rater("rater")
+    kept = add_submit(session, source_path="src/kept")
+    removed = add_submit(session, source_path="src/removed")
+    for submit, relevance_rating in ((kept, 3), (removed, 5)):
+        session.add(SubmitRating(
+            submit_id=submit.id, rater_id=rater.id, relevance_rating=relevance_rating, created_at=RATED_AT
+        ))
+        session.add(AISubmitRating(submit_id=submit.id, quality_rating=relevance_rating, created_at=RATED_AT))
+    session.flush()
+    resync_rating_rollups(session)
+    session.commit()
+
+    retract_submit_ratings(session, [removed.id])
+    session.execute(SubmitRating.__table__.delete().where(SubmitRating.submit_id == removed.id))
+    session.execute(AISubmitRating.__table__.delete().where(AISubmitRating.submit_id == removed.id))
+    session.commit()
+
+    rows = rollup_rows(session)
+    assert {key[5] for key in rows} == {"src/kept"}
+    assert len(rows) == 4
+    assert_matches_resync(session)
+
+
+def test_retracting_a_rater_leaves_other_raters(session, create_rater):
+    leaving, staying = create_rater("leaving"), create_rater("staying")
+    submit = add_submit(session)
+    session.add_all([
+        SubmitRating(submit_id=submit.id, rater_id=leaving.id, relevance_rating=2, created_at=RATED_AT),
+        SubmitRating(submit_id=submit.id, rater_id=staying.id, relevance_rating=6, created_at=RATED_AT),
+    ])
+    session.flush()
+    resync_rating_rollups(session)
+    session.commit()
+
+    retract_rater_ratings(session, leaving.id)
+    session.execute(SubmitRating.__table__.delete().where(SubmitRating.rater_id == leaving.id))
+    session.commit()
+
+    assert rollup_rows(session)[("week", date(2026, 3, 9), "teacher", "p", "m", "src/a")] == (6, 1, 0, 0, 1)
+    assert_matches_resync(session)
+
+
+def test_rename_merges_into_existing_rows(session):
+    old, new = add_submit(session, source_path="src/old"), add_submit(session, source_path="src/new")
+    for submit in (old, new):
+        session.add(AISubmitRating(submit_id=submit.id, relevance_rating=4, created_at=RATED_AT))
+    session.flush()
+    resync_rating_rollups(session)
+    session.commit()
+
+    session.execute(Submit.__table__.update().where(Submit.id == old.id).values(source_path="src/new"))
+    rename_rollup_dimension(session, "source_path", "src/old", "src/new")
+    session.commit()
+
+    assert rollup_rows(session) == {
+        ("day", date(2026, 3, 12), "ai", "p", "m", "src/new"): (8, 2, 0, 0, 2),
+        ("week", date(2026, 3, 9), "ai", "p", "m", "src/new"): (8, 2, 0, 0, 2),
+    }
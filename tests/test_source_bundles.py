@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from pathlib import Path
+
+import pytest
+
+from app.utils import files
+from app.utils.files import load_source_bundle, read_source_bundle, source_content_hash
+
+
+@pytest.fixture(autouse=True)
+def sources_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    root = (tmp_path / "sources").resolve()
+    monkeypatch.setattr(files, "SOURCES_ROOT", root)
+    monkeypatch.setattr(files, "SOURCE_BUNDLES_ROOT", (tmp_path / "bundles").resolve())
+    monkeypatch.setattr(files, "_source_hash_cache", OrderedDict())
+    return root
+
+
+def write_source(sources_root: Path, source_path: str, content: str) -> None:
+    path = sources_root / source_path / "src" / "main.py"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def test_rebuilt_bundle_replaces_the_previous_one(sources_root):
+    write_source(sources_root, "a", "print(1)")
+    first = load_source_bundle("a")
+
+    write_source(sources_root, "a", "print('changed')")
+    second = load_source_bundle("a")
+
+    assert second.content_hash != first.content_hash
+    assert list(second.path.parent.iterdir()) == [second.path]
+    assert read_source_bundle(second)["files"] == {"main.py": "print('changed')"}
+
+
+def test_bundles_of_other_sources_are_kept(sources_root):
+    write_source(sources_root, "a", "print(1)")
+    write_source(sources_root, "b", "print(2)")
+
+    bundles = [load_source_bundle("a"), load_source_bundle("b")]
+
+    assert all(bundle.path.exists() for bundle in bundles)
+
+
+def test_hash_cache_keeps_the_most_recently_used_sources(sources_root, monkeypatch):
+    monkeypatch.setattr(files, "SOURCE_HASH_CACHE_MAX_ENTRIES", 2)
+    for source_path in ("a", "b", "c"):
+        write_source(sources_root, source_path, source_path)
+
+    source_content_hash("a")
+    source_content_hash("b")
+    source_content_hash("a")
+    source_content_hash("c")
+
+    assert list(files._source_hash_cache) == ["a", "c"]
+
+
+@pytest.mark.parametrize(("accept_encoding", "content_encoding"), [("gzip, br", "gzip"), ("gzip;q=0, br", None)])
+def test_source_files_are_sent_compressed_only_when_gzip_is_accepted(client, sources_root, accept_encoding,
+                                                                     content_encoding):
+    write_source(sources_root, "a", "print(1)")
+
+    response = client.get("/sources/a", headers={"Accept-Encoding": accept_encoding})
+
+    assert response.headers.get("content-encoding") == content_encoding
+    assert response.json()["files"] == {"main.py": "print(1)"}
@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.utils import source_catalog
+from app.utils.source_catalog import watch_source_catalog, watch_source_changes
+
+
+class UnavailableRedis:
+    def lock(self, *_, **__):
+        raise RedisConnectionError("Redis is down")
+
+    def ping(self):
+        raise RedisConnectionError("Redis is down")
+
+
+def test_watcher_watches_without_a_lock_while_redis_is_unavailable(monkeypatch: pytest.MonkeyPatch):
+    stop_event = threading.Event()
+    watched_with: list[object] = []
+
+    def watch_once(_, lock):
+        watched_with.append(lock)
+        stop_event.set()
+
+    monkeypatch.setattr(source_catalog, "get_redis_connection", UnavailableRedis)
+    monkeypatch.setattr(source_catalog, "watch_source_changes", watch_once)
+
+    watch_source_catalog(stop_event)
+
+    assert watched_with == [None]
+
+
+def test_unlocked_watcher_stops_once_redis_is_back(monkeypatch: pytest.MonkeyPatch, tmp_path, redis_connection):
+    connections = iter([UnavailableRedis(), redis_connection])
+    monkeypatch.setattr(source_catalog, "SOURCES_ROOT", tmp_path)
+    monkeypatch.setattr(source_catalog, "watch", lambda *_, **__: iter([set(), set(), set()]))
+    monkeypatch.setattr(source_catalog, "get_redis_connection", lambda: next(connections))
+
+    watch_source_changes(threading.Event(), None)
+
+    # The first timeout finds Redis still down, the second finds it back and hands over to the locked watcher.
+    assert next(connections, None) is None